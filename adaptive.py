@@ -0,0 +1,153 @@
+import numpy as np
+from sortedcontainers import SortedList
+from heaps import BinaryHeap
+from skiplist import OnlineSL
+
+######################################################################
+# Adaptive priority queue
+######################################################################
+# Starts as an OnlineSL and migrates its contents to a binary heap when the predictions turn out to
+# be poor, or back to an OnlineSL when they become good again.
+#
+# The quality of the predictions is measured at each insertion, in comparisons:
+# - in OSL mode, by the comparisons used by the exponential search,
+# - in BH mode, the predicted ranks are still indexed, and one insertion out of probeRate runs the
+#   exponential search of the OnlineSL on the values of this index (without inserting), whose
+#   comparisons are counted.
+# An exponential moving average of this estimate is compared with 2*log2(size), the cost per
+# element (insertion and extraction) of a binary heap, with a hysteresis margin.
+#
+# Migrations are only allowed after at least patience*size operations since the previous one, and
+# the patience doubles at each migration, which bounds the number of migrations when the estimate
+# oscillates around the threshold:
+# OSL -> BH reads the skip list in order (a sorted list is a binary heap, no comparisons), and
+# BH -> OSL sorts the heap and appends the sorted values to an empty OnlineSL (O(n log n)). Their
+# cost is thus amortized over the operations since the last migration.
+
+class AdaptivePQ:
+
+    def __init__(self, margin=1, decay=0.05, minSize=16, probeRate=4):
+        self.margin = margin
+        self.decay = decay
+        self.probeRate = probeRate
+        self.probeCount = 0
+        self.minSize = minSize
+        self.mode = "OSL"
+        self.pq = OnlineSL()
+        # Predicted ranks of the values in the queue, and values by predicted rank (in BH mode)
+        self.predictedRank = {}
+        self.ranks = SortedList()
+        self.rankVal = {}
+        self.size = 0
+        self.costEstimate = 0
+        self.opsSinceMigration = 0
+        self.migrations = 0
+        self.patience = 1
+        # Comparisons of the previous structures, the migrations and the BH mode probes
+        self.baseComps = 0
+        self.countComps = 0
+
+    def isEmpty(self):
+        return (self.size == 0)
+
+    def updateEstimate(self, cost):
+        self.costEstimate = (1-self.decay)*self.costEstimate + self.decay*cost
+
+    def addRank(self, val, predictedRank):
+        if predictedRank not in self.rankVal:
+            self.ranks.add(predictedRank)
+            self.rankVal[predictedRank] = []
+        self.rankVal[predictedRank].append(val)
+
+    def removeRank(self, val, predictedRank):
+        self.rankVal[predictedRank].remove(val)
+        if len(self.rankVal[predictedRank]) == 0:
+            del self.rankVal[predictedRank]
+            self.ranks.remove(predictedRank)
+
+    def probe(self, val, predictedRank):
+        # Exponential search of val among the values indexed by predicted rank, starting from the
+        # predicted position, as the OnlineSL would do. Returns the number of comparisons.
+        index = self.ranks.bisect_left(predictedRank)
+        comps = 0
+        step = 1
+        if index > 0 and val < self.rankVal[self.ranks[index-1]][-1]:
+            while index-step > 0 and val < self.rankVal[self.ranks[index-step-1]][-1]:
+                comps += 1
+                step *= 2
+            comps += 1
+        else:
+            while index+step-1 < len(self.ranks) and self.rankVal[self.ranks[index+step-1]][-1] < val:
+                comps += 1
+                step *= 2
+            comps += 1
+        # The final binary search within the last step
+        comps += int(np.log2(step))
+        self.baseComps += comps
+        return comps
+
+    def insert(self, val, predictedRank=0):
+        if val not in self.predictedRank:
+            self.predictedRank[val] = []
+        self.predictedRank[val].append(predictedRank)
+        if self.mode == "OSL":
+            comps = self.pq.countComps
+            self.pq.insert(val, predictedRank)
+            self.updateEstimate(self.pq.countComps - comps)
+        else:
+            self.probeCount += 1
+            if self.probeCount % self.probeRate == 0:
+                self.updateEstimate(self.probe(val, predictedRank))
+            self.addRank(val, predictedRank)
+            self.pq.insert(val)
+        self.size += 1
+        self.opsSinceMigration += 1
+        self.countComps = self.baseComps + self.pq.countComps
+        self.adapt()
+
+    def extractMin(self):
+        val = self.pq.extractMin()
+        predictedRank = self.predictedRank[val].pop()
+        if len(self.predictedRank[val]) == 0:
+            del self.predictedRank[val]
+        if self.mode == "BH":
+            self.removeRank(val, predictedRank)
+        self.size -= 1
+        self.opsSinceMigration += 1
+        self.countComps = self.baseComps + self.pq.countComps
+        self.adapt()
+        return val
+
+    def adapt(self):
+        if self.size < self.minSize or self.opsSinceMigration < self.patience*self.size:
+            return
+        heapCost = 2*np.log2(self.size + 2)
+        if self.mode == "OSL" and self.costEstimate > heapCost + self.margin:
+            self.migrate("BH")
+        elif self.mode == "BH" and self.costEstimate < heapCost - self.margin:
+            self.migrate("OSL")
+
+    def migrate(self, mode):
+        self.baseComps += self.pq.countComps
+        vals = self.pq.sl.getValsHeights()[0] if mode == "BH" else sorted(self.pq.heap)
+        # Duplicated values share their list of predicted ranks
+        position = {}
+        ranks = []
+        for val in vals:
+            position[val] = position.get(val, -1) + 1
+            ranks.append(self.predictedRank[val][position[val]])
+        if mode == "BH":
+            self.pq = BinaryHeap.fromList(vals, isSorted=True)
+            for i in range(len(vals)):
+                self.addRank(vals[i], ranks[i])
+        else:
+            self.baseComps += int(len(vals) * np.log2(len(vals) + 1))
+            self.pq = OnlineSL()
+            self.pq.appendSorted(vals, ranks)
+            self.ranks.clear()
+            self.rankVal.clear()
+        self.mode = mode
+        self.migrations += 1
+        self.patience *= 2
+        self.opsSinceMigration = 0
+        self.countComps = self.baseComps + self.pq.countComps
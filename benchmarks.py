@@ -0,0 +1,614 @@
+import json
+import os
+import sys
+import resource
+import subprocess
+import tracemalloc
+import numpy as np
+from heapq import heapify, heapreplace
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from heaps import FibonacciHeap, BinaryHeap
+from skiplist import SkipList, OnlineSL
+from adaptive import AdaptivePQ
+
+######################################################################
+# Benchmark suite for the priority queues
+######################################################################
+# Each (workload, priority queue) cell is run in a fresh process and reports:
+# - nsPerOp: wall-clock time per insert/extractMin,
+# - compsPerOp: comparisons (countComps) per insert/extractMin,
+# - tracemallocBytesPerElem: peak traced Python memory per inserted element (second run),
+# - rssBytesPerElem: growth of the peak resident set size per inserted element.
+# Results are stored as JSON baselines, and a new run is compared against a baseline to flag
+# regressions. Only the comparison counts, which are deterministic for a given seed, are shared in
+# baselineFile. Timings and memory depend on the machine: they are kept in localBaselineFile, which
+# is not committed and is saved by the first run on each machine.
+
+baselineFile = "data/benchmarks.json"
+localBaselineFile = "data/benchmarks.local.json"
+sharedMetrics = ["compsPerOp"]
+
+# Tolerated relative increase before a metric is flagged as a regression. Comparison counts are
+# deterministic for a given seed, timings and memory are not.
+tolerances = {
+    "nsPerOp": 0.5,
+    "compsPerOp": 0.01,
+    "tracemallocBytesPerElem": 0.2,
+    "rssBytesPerElem": 0.5,
+}
+
+
+# Priority queues with rank predictions
+#---------------------------------------------------------------------
+# predicted[v] is the predicted rank of the value v
+
+def insertInQueue(pq, pqID, value, predicted):
+    if pqID in ["OSL", "ADA"]:
+        pq.insert(value, predicted[value])
+    elif pqID == "DC":
+        dirtyPredecessor = pq.findPredecessor(value, dirty=True)
+        cleanPredecessor = pq.exponentialSearch(dirtyPredecessor, value)
+        pq.insertNextTo(value, cleanPredecessor)
+    else:
+        pq.insert(value)
+
+def createQueue(pqID, predicted):
+    if pqID == "FH":
+        return FibonacciHeap()
+    if pqID == "BH":
+        return BinaryHeap()
+    if pqID == "SL":
+        return SkipList()
+    if pqID == "OSL":
+        return OnlineSL()
+    if pqID == "ADA":
+        return AdaptivePQ()
+    if pqID == "DC":
+        def dirtyCompare(val1, val2):
+            return predicted[val1] - predicted[val2]
+        return SkipList(dcompare=dirtyCompare)
+    raise ValueError(f"Unknown priority queue {pqID}.")
+
+def noisyRanks(n, error):
+    # The predicted rank of the value v is v plus a rounded Gaussian error of standard deviation error
+    return np.rint(np.arange(n) + error*np.random.randn(n)).astype(int).tolist()
+
+
+# Workloads
+#---------------------------------------------------------------------
+# A workload prepares its data (graph, predictions, ...) and returns a function running the
+# measured operations, which returns (number of operations, comparisons, number of inserted elements)
+
+def sortWorkload(pqID, n=10000, error=10):
+    predicted = noisyRanks(n, error)
+    values = np.random.permutation(n).tolist()
+    def run():
+        pq = createQueue(pqID, predicted)
+        for v in values:
+            insertInQueue(pq, pqID, v, predicted)
+        while not pq.isEmpty():
+            pq.extractMin()
+        return 2*n, pq.countComps, n
+    return run
+
+def mixedWorkload(pqID, n=10000, error=10, insertRatio=0.6):
+    # Random interleaving of inserts and extractions, then the queue is emptied
+    predicted = noisyRanks(n, error)
+    values = np.random.permutation(n).tolist()
+    isInsert = (np.random.rand(2*n) < insertRatio).tolist()
+    def run():
+        pq = createQueue(pqID, predicted)
+        ops = 0
+        i = 0
+        for insert in isInsert:
+            if i < n and (insert or pq.isEmpty()):
+                insertInQueue(pq, pqID, values[i], predicted)
+                i += 1
+            elif not pq.isEmpty():
+                pq.extractMin()
+            else:
+                break
+            ops += 1
+        while i < n:
+            insertInQueue(pq, pqID, values[i], predicted)
+            i += 1
+            ops += 1
+        while not pq.isEmpty():
+            pq.extractMin()
+            ops += 1
+        return ops, pq.countComps, n
+    return run
+
+def dijkstraWorkload(pqID, cityName="brussels", nsources=5, timesteps=0):
+    # OSL and DC use decay predictions with the given number of timesteps
+    from dijkstra import importCityGraph, chooseRandomSource, getDecayPredictions, dijkstraPQ
+    graph = importCityGraph(cityName)
+    queries = []
+    for s in range(nsources):
+        source, rankedNodes, numComps = chooseRandomSource(graph)
+        predictions = getDecayPredictions(rankedNodes, timesteps) if pqID in ["OSL", "DC"] else None
+        queries.append((source, predictions))
+    def run():
+        ops = comps = elements = 0
+        for source, predictions in queries:
+            distances, pq, allKeys = dijkstraPQ(graph, source, predictions, pqID=pqID, predGenID="decay", returnAllKeys=True)
+            ops += 2*(len(allKeys)+1)
+            comps += pq.countComps
+            elements += len(allKeys)+1
+        return ops, comps, elements
+    return run
+
+# Hold model: the queue holds n event times, and each event extracts the minimum time t and
+# schedules a new event at t + increment. The increments are drawn from holdIncrements[distribution]
+# (mean 1). The predicted rank of a time is its rank among all the scheduled times, plus a rounded
+# Gaussian error of standard deviation error. fused=True uses pushpop, fused=False extractMin then insert.
+holdIncrements = {
+    "exponential": lambda size: np.random.exponential(1, size),
+    "uniform": lambda size: np.random.uniform(0, 2, size),
+    "bimodal": lambda size: np.where(np.random.rand(size) < 0.9, np.random.uniform(0, 0.2, size), np.random.uniform(9.1, 9.3, size)),
+    "pareto": lambda size: np.random.pareto(2, size),
+}
+
+def holdWorkload(pqID, n=10000, events=50000, distribution="exponential", error=10, fused=True):
+    # The extracted times do not depend on the queue: the scheduled times are computed beforehand
+    initial = holdIncrements[distribution](n).tolist()
+    increments = holdIncrements[distribution](events).tolist()
+    heap = list(initial)
+    heapify(heap)
+    scheduled = []
+    for inc in increments:
+        t = heap[0] + inc
+        heapreplace(heap, t)
+        scheduled.append(t)
+    allTimes = initial + scheduled
+    ranks = noisyRanks(len(allTimes), error)
+    predicted = {t: ranks[r] for r, t in enumerate(sorted(allTimes))}
+    def run():
+        pq = createQueue(pqID, predicted)
+        for t in initial:
+            insertInQueue(pq, pqID, t, predicted)
+        for t in scheduled:
+            if not fused:
+                pq.extractMin()
+                insertInQueue(pq, pqID, t, predicted)
+            elif pqID == "OSL":
+                pq.pushpop(t, predicted[t])
+            else:
+                pq.pushpop(t)
+        return n + 2*events, pq.countComps, n
+    return run
+
+workloads = {
+    "sort": (sortWorkload, ["FH", "BH", "SL", "OSL", "DC", "ADA"]),
+    "mixed": (mixedWorkload, ["FH", "BH", "SL", "OSL", "DC", "ADA"]),
+    "dijkstra": (dijkstraWorkload, ["FH", "BH", "OSL", "DC", "ADA"]),
+    "hold": (holdWorkload, ["FH", "BH", "SL", "OSL"]),
+}
+
+
+# Measurements
+#---------------------------------------------------------------------
+
+def currentRSS():
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def measureCell(workloadID, pqID, params, seed, repeats=3):
+    # The time is the best of the repeats, every repeat uses the same seed
+    workload = workloads[workloadID][0]
+    elapsed = np.inf
+    for r in range(repeats):
+        np.random.seed(seed)
+        run = workload(pqID, **params)
+        if r == 0:
+            rssStart = currentRSS()
+        ti = perf_counter()
+        ops, comps, elements = run()
+        elapsed = min(elapsed, perf_counter() - ti)
+        if r == 0:
+            rssPeak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    # Once more with tracemalloc, which slows down allocations
+    np.random.seed(seed)
+    run = workload(pqID, **params)
+    tracemalloc.start()
+    run()
+    tracedPeak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "nsPerOp": 1e9 * elapsed / ops,
+        "compsPerOp": comps / ops,
+        "tracemallocBytesPerElem": tracedPeak / elements,
+        "rssBytesPerElem": max(0, rssPeak - rssStart) / elements,
+    }
+
+def runBenchmarks(workloadIDs=None, params={}, seed=0):
+    # params[workloadID] overrides the default parameters of a workload
+    results = {}
+    for workloadID in (workloadIDs or workloads):
+        for pqID in workloads[workloadID][1]:
+            # A fresh process per cell, so that the peak RSS is not inherited from previous cells
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                cell = pool.submit(measureCell, workloadID, pqID, params.get(workloadID, {}), seed).result()
+            results[f"{workloadID}_{pqID}"] = cell
+            print(f"{workloadID:>9} {pqID:>4}: " + ", ".join(f"{k} = {v:.2f}" for k, v in cell.items()))
+    return results
+
+
+# Merges
+#---------------------------------------------------------------------
+# Merges a queue of m values into a queue of n values, either above all of them (disjoint) or
+# interleaved with them (overlapping). The cost must grow sublinearly with n.
+
+def mergeQueues(pqID, n, m, overlapping):
+    # Returns the time (in seconds) and the comparisons of the merge
+    large = createQueue(pqID, None)
+    small = createQueue(pqID, None)
+    largeValues = (2*np.random.permutation(n)).tolist()
+    smallValues = (2*np.random.choice(n, m, replace=False)+1).tolist() if overlapping else list(range(2*n, 2*n+m))
+    # Exact predictions: the predicted rank of v is v
+    predicted = range(2*n+m)
+    for v in largeValues:
+        insertInQueue(large, pqID, v, predicted)
+    for v in smallValues:
+        insertInQueue(small, pqID, v, predicted)
+    comps = large.countComps
+    ti = perf_counter()
+    if pqID == "OSL":
+        large.merge(small)
+    else:
+        large.join(small)
+    elapsed = perf_counter() - ti
+    return elapsed, large.countComps - comps
+
+def benchmarkMerges(nvals=(1000, 10000, 100000), m=100, pqIDs=("SL", "OSL"), seed=0):
+    results = {}
+    for pqID in pqIDs:
+        for overlapping in [False, True]:
+            for n in nvals:
+                np.random.seed(seed)
+                elapsed, comps = mergeQueues(pqID, n, m, overlapping)
+                key = f"merge_{pqID}_{'overlapping' if overlapping else 'disjoint'}_{n}"
+                results[key] = {"usPerMerge": 1e6*elapsed, "compsPerMerge": comps}
+                print(f"{key:>30}: {1e6*elapsed:.0f} us, {comps} comparisons")
+    return results
+
+
+# Concurrent queues
+#---------------------------------------------------------------------
+# Producers insert n values with noisy predicted ranks into a MultiQueue while consumers extract
+# them. Reports the throughput and the rank errors of the extractions (see multiqueue.rankErrors).
+# With CPython's global interpreter lock, the throughput measures the lock contention rather than
+# a parallel speedup.
+
+def concurrentRun(numThreads, n=100000, numShards=None, routing="random", pqID="OSL", error=10, seed=0):
+    import threading
+    from multiqueue import MultiQueue, rankErrors
+    np.random.seed(seed)
+    predicted = noisyRanks(n, error)
+    values = np.random.permutation(n).tolist()
+    numProducers = max(1, numThreads//2)
+    numConsumers = max(1, numThreads - numProducers)
+    mq = MultiQueue(numShards or 2*numThreads, pqID, routing, maxRank=n-1, record=True)
+    producersDone = threading.Event()
+    extracted = [0 for c in range(numConsumers)]
+    def produce(p):
+        for v in values[p::numProducers]:
+            mq.insert(v, predicted[v])
+    def consume(c):
+        while True:
+            if mq.extractMin() is not None:
+                extracted[c] += 1
+            elif producersDone.is_set() and mq.isEmpty():
+                return
+    producers = [threading.Thread(target=produce, args=(p,)) for p in range(numProducers)]
+    consumers = [threading.Thread(target=consume, args=(c,)) for c in range(numConsumers)]
+    ti = perf_counter()
+    for thread in producers + consumers:
+        thread.start()
+    for thread in producers:
+        thread.join()
+    producersDone.set()
+    for thread in consumers:
+        thread.join()
+    elapsed = perf_counter() - ti
+    errors = rankErrors(mq.log)
+    assert sum(extracted) == n
+    return {"opsPerSecond": 2*n/elapsed, "meanRankError": errors.mean(),
+            "p99RankError": float(np.percentile(errors, 99)), "compsPerOp": mq.countComps/(2*n)}
+
+def benchmarkConcurrent(threadCounts=(1, 2, 4, 8), routings=("random", "rank"), **params):
+    results = {}
+    for routing in routings:
+        for numThreads in threadCounts:
+            key = f"multiqueue_{routing}_{numThreads}"
+            results[key] = concurrentRun(numThreads, routing=routing, **params)
+            print(f"{key:>22}: " + ", ".join(f"{k} = {v:.2f}" for k, v in results[key].items()))
+    return results
+
+
+# Hold model
+#---------------------------------------------------------------------
+# Fused (pushpop) against separate (extractMin then insert) hold operations, for each increment
+# distribution and prediction error (see holdWorkload).
+
+def benchmarkHold(distributions=tuple(holdIncrements), errors=(0, 10, 1000), pqIDs=("FH", "BH", "SL", "OSL"), seed=0, **params):
+    results = {}
+    for distribution in distributions:
+        for error in errors:
+            for pqID in pqIDs:
+                if pqID != "OSL" and error != errors[0]:
+                    continue
+                for fused in [True, False]:
+                    np.random.seed(seed)
+                    run = holdWorkload(pqID, distribution=distribution, error=error, fused=fused, **params)
+                    ti = perf_counter()
+                    ops, comps, elements = run()
+                    elapsed = perf_counter() - ti
+                    key = f"hold_{distribution}_{pqID}_{'fused' if fused else 'separate'}" + (f"_{error}" if pqID == "OSL" else "")
+                    results[key] = {"nsPerOp": 1e9*elapsed/ops, "compsPerOp": comps/ops}
+                    print(f"{key:>38}: " + ", ".join(f"{k} = {v:.2f}" for k, v in results[key].items()))
+    return results
+
+
+# Timers
+#---------------------------------------------------------------------
+# Schedules n timers with deadlines spread over duration seconds, starting lead seconds later (which
+# must cover the scheduling time), on an event loop. A fraction cancelRatio of them is cancelled.
+# Reports the scheduling throughput and the lateness of the callbacks (time at which they run -
+# deadline). Periodic timers have deadlines on a grid of period seconds, random timers uniform ones.
+
+def timerRun(loopFactory, n=20000, duration=2.0, lead=1.0, cancelRatio=0.2, periodic=True, period=0.01, seed=0):
+    import asyncio
+    np.random.seed(seed)
+    if periodic:
+        offsets = (period * np.random.randint(1, int(duration/period)+1, n)).tolist()
+    else:
+        offsets = (duration * np.random.rand(n)).tolist()
+    cancel = (np.random.rand(n) < cancelRatio).tolist()
+    loop = loopFactory()
+    lateness = []
+    def fire(when):
+        lateness.append(loop.time() - when)
+    async def main():
+        start = loop.time() + lead
+        ti = perf_counter()
+        handles = [loop.call_at(start + offset, fire, start + offset) for offset in offsets]
+        scheduling = perf_counter() - ti
+        for handle, c in zip(handles, cancel):
+            if c:
+                handle.cancel()
+        await asyncio.sleep(start + duration - loop.time() + 0.05)
+        return scheduling
+    try:
+        scheduling = loop.run_until_complete(main())
+    finally:
+        loop.close()
+    lateness = 1e6 * np.array(lateness)
+    return {"timersPerSecond": n/scheduling, "meanLatenessUs": lateness.mean(),
+            "p99LatenessUs": float(np.percentile(lateness, 99)), "fired": len(lateness)}
+
+def benchmarkTimers(**params):
+    import asyncio
+    from timers import OnlineSLEventLoop
+    results = {}
+    for periodic in [True, False]:
+        for loopID, loopFactory in [("default", asyncio.new_event_loop), ("OSL", OnlineSLEventLoop)]:
+            key = f"timers_{'periodic' if periodic else 'random'}_{loopID}"
+            results[key] = timerRun(loopFactory, periodic=periodic, **params)
+            print(f"{key:>24}: " + ", ".join(f"{k} = {v:.2f}" for k, v in results[key].items()))
+    return results
+
+
+# Caches
+#---------------------------------------------------------------------
+# Zipf traces of length requests over numKeys keys (popularity of the i-th key proportional to
+# 1/i^a). The predicted next access of a request at time t is t + (next - t)*exp(error*N(0,1)),
+# next being the exact next access of the key (2*length if none). A miss puts the key in the cache.
+
+def zipfTrace(numKeys, length, a=1.0):
+    weights = 1 / np.arange(1, numKeys+1)**a
+    return np.random.permutation(numKeys)[np.random.choice(numKeys, length, p=weights/weights.sum())].tolist()
+
+def nextAccesses(trace):
+    nextAccess = [2*len(trace) for t in trace]
+    last = {}
+    for t in range(len(trace)-1, -1, -1):
+        if trace[t] in last:
+            nextAccess[t] = last[trace[t]]
+        last[trace[t]] = t
+    return nextAccess
+
+def cacheRun(cacheID, capacity=1000, numKeys=100000, length=200000, a=1.0, error=0.0, seed=0):
+    from cache import LAPQCache, LRUCache
+    np.random.seed(seed)
+    trace = zipfTrace(numKeys, length, a)
+    gaps = np.array(nextAccesses(trace)) - np.arange(length)
+    predicted = (np.arange(length) + gaps*np.exp(error*np.random.randn(length))).tolist()
+    cache = LAPQCache(capacity) if cacheID == "LAPQ" else LRUCache(capacity)
+    ti = perf_counter()
+    for key, nextAccess in zip(trace, predicted):
+        if cache.get(key, nextAccess) is None:
+            cache.put(key, key, nextAccess)
+    elapsed = perf_counter() - ti
+    result = {"hitRate": cache.hits/length, "opsPerSecond": length/elapsed}
+    if cacheID == "LAPQ":
+        result["compsPerOp"] = cache.countComps/length
+    return result
+
+def benchmarkCaches(errors=(0, 0.5, 2), exponents=(0.8, 1.0, 1.2), **params):
+    results = {}
+    for a in exponents:
+        key = f"cache_zipf{a}_LRU"
+        results[key] = cacheRun("LRU", a=a, **params)
+        print(f"{key:>26}: " + ", ".join(f"{k} = {v:.3f}" for k, v in results[key].items()))
+        for error in errors:
+            key = f"cache_zipf{a}_LAPQ_{error}"
+            results[key] = cacheRun("LAPQ", a=a, error=error, **params)
+            print(f"{key:>26}: " + ", ".join(f"{k} = {v:.3f}" for k, v in results[key].items()))
+    return results
+
+
+# Expensive comparisons
+#---------------------------------------------------------------------
+# Sorts n values with dirty comparisons (sortDC), each clean comparison sleeping for delay seconds,
+# with a plain, a memoized and a parallel comparator (see comparators.py). Reports the time per
+# insertion, the logical comparisons (identical for the three) and the actual evaluations.
+
+def slowSubtraction(delay):
+    from time import sleep
+    def compare(val1, val2):
+        sleep(delay)
+        return val1 - val2
+    return compare
+
+def benchmarkComparators(n=300, delay=1e-3, error=10, depth=8, workers=16, seed=0):
+    from sorting import sortDC
+    from comparators import MemoComparator, ParallelComparator
+    results = {}
+    for comparatorID in ["plain", "memo", "parallel"]:
+        np.random.seed(seed)
+        predicted = noisyRanks(n, error)
+        predictions = [(predicted[j], j) for j in range(n)]
+        compare = slowSubtraction(delay)
+        if comparatorID == "memo":
+            compare = MemoComparator(compare)
+        elif comparatorID == "parallel":
+            compare = ParallelComparator(compare, depth=depth, workers=workers)
+        ti = perf_counter()
+        sl = sortDC(predictions, comparator=compare)
+        elapsed = perf_counter() - ti
+        if comparatorID == "parallel":
+            compare.close()
+        assert sl.getValsHeights()[0] == list(range(n))
+        key = f"comparator_{comparatorID}"
+        results[key] = {"msPerInsert": 1e3*elapsed/n, "compsPerInsert": sl.countComps/n,
+                        "evaluationsPerInsert": getattr(compare, "evaluations", sl.countComps)/n}
+        print(f"{key:>20}: " + ", ".join(f"{k} = {v:.2f}" for k, v in results[key].items()))
+    return results
+
+
+# Import time of the core modules
+#---------------------------------------------------------------------
+# The priority queues, the sorting functions and Dijkstra's algorithm must be importable with
+# NumPy and sortedcontainers only: every process-pool worker pays for the imports.
+
+coreModules = ["heaps", "skiplist", "predictions", "sorting", "dijkstra", "graphs"]
+heavyModules = ["matplotlib", "osmnx", "networkx", "pandas", "geopandas", "scipy"]
+
+def measureImport(module, repeats=5):
+    # Best time (in seconds) to import the module in a fresh interpreter, and the heavy modules it loads
+    code = ("import sys; from time import perf_counter; ti = perf_counter(); "
+            f"import {module}; t = perf_counter() - ti; "
+            f"print(t, *[m for m in {heavyModules!r} if m in sys.modules])")
+    best = np.inf
+    for r in range(repeats):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+        best = min(best, float(output[0]))
+    return best, output[1:]
+
+def checkImports(budget=0.1):
+    # Fails if a core module loads a heavy module, or takes more than budget seconds on top of NumPy
+    # and sortedcontainers
+    base = max(measureImport("numpy")[0] + measureImport("sortedcontainers")[0], 0)
+    failures = []
+    for module in coreModules:
+        t, heavy = measureImport(module)
+        print(f"import {module}: {1000*t:.1f} ms (numpy + sortedcontainers: {1000*base:.1f} ms)" + (f", loads {heavy}" if heavy else ""))
+        if heavy or t > base + budget:
+            failures.append(module)
+    return failures
+
+
+# Baselines
+#---------------------------------------------------------------------
+
+def selectMetrics(results, shared):
+    return {cell: {metric: value for metric, value in metrics.items() if (metric in sharedMetrics) == shared}
+            for cell, metrics in results.items()}
+
+def updateBaselineFile(results, filename):
+    # The cells which were not run keep their previous baseline
+    baseline = readBaselineFile(filename)
+    baseline.update(results)
+    with open(filename, 'w') as file:
+        json.dump(baseline, file, indent=1, sort_keys=True)
+
+def readBaselineFile(filename):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'r') as file:
+        return json.load(file)
+
+def saveBaseline(results, filename=baselineFile, localFilename=localBaselineFile, shared=True):
+    # With shared=False, only saves the timings and memory of this machine
+    updateBaselineFile(selectMetrics(results, False), localFilename)
+    if shared:
+        updateBaselineFile(selectMetrics(results, True), filename)
+
+def loadBaseline(filename=baselineFile, localFilename=localBaselineFile):
+    baseline = readBaselineFile(filename)
+    for cell, metrics in readBaselineFile(localFilename).items():
+        baseline[cell] = {**baseline.get(cell, {}), **metrics}
+    return baseline
+
+def findRegressions(results, baseline, tolerances=tolerances):
+    # Returns the list of (cell, metric, baseline value, new value) exceeding the tolerance
+    regressions = []
+    for cell in results:
+        if cell not in baseline:
+            continue
+        for metric, value in results[cell].items():
+            old = baseline[cell].get(metric)
+            if old is not None and value > old * (1 + tolerances[metric]) + 1e-9:
+                regressions.append((cell, metric, old, value))
+    return regressions
+
+
+if __name__ == "__main__":
+    # python benchmarks.py [--save] [workloadID ...]: runs the benchmarks, compares them with the
+    # baseline (exit code 1 on regressions), --save overwrites the baseline. The timings and memory
+    # of the cells missing from the local baseline are saved as their baseline.
+    # python benchmarks.py --imports: only checks the import time of the core modules
+    # python benchmarks.py --merges: only prints the cost of merges for increasing queue sizes
+    # python benchmarks.py --concurrent: only prints the throughput and rank errors of the MultiQueue
+    # python benchmarks.py --hold: only compares fused and separate hold operations
+    # python benchmarks.py --timers: only compares the asyncio timers with the OnlineSL event loop
+    # python benchmarks.py --caches: only compares the hit rates of LAPQCache and LRU on Zipf traces
+    # python benchmarks.py --comparators: only compares the memoized and parallel comparators
+    args = sys.argv[1:]
+    if "--imports" in args:
+        sys.exit(1 if checkImports() else 0)
+    if "--merges" in args:
+        benchmarkMerges()
+        sys.exit(0)
+    if "--concurrent" in args:
+        benchmarkConcurrent()
+        sys.exit(0)
+    if "--hold" in args:
+        benchmarkHold()
+        sys.exit(0)
+    if "--timers" in args:
+        benchmarkTimers()
+        sys.exit(0)
+    if "--caches" in args:
+        benchmarkCaches()
+        sys.exit(0)
+    if "--comparators" in args:
+        benchmarkComparators()
+        sys.exit(0)
+    save = "--save" in args
+    workloadIDs = [a for a in args if a != "--save"] or None
+    results = runBenchmarks(workloadIDs)
+    if save:
+        saveBaseline(results)
+    else:
+        regressions = findRegressions(results, loadBaseline())
+        local = readBaselineFile(localBaselineFile)
+        missing = {cell: metrics for cell, metrics in results.items() if cell not in local}
+        if missing:
+            saveBaseline(missing, shared=False)
+            print(f"Saved the timings and memory of {len(missing)} cells in {localBaselineFile}")
+        for cell, metric, old, value in regressions:
+            print(f"REGRESSION {cell} {metric}: {old:.2f} -> {value:.2f}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from skiplist import OnlineSL
+
+######################################################################
+# Caches with predicted next accesses
+######################################################################
+# LAPQCache evicts the entry whose predicted next access is the furthest in the future, as
+# Belady's optimal policy does with the exact next accesses. The entries are kept in an OnlineSL
+# keyed on the negated predicted next access time (the minimum is evicted first), whose predicted
+# rank is the negated time bucket (nextAccess // bucketWidth). A hit moves the entry to its new
+# predicted time with OnlineSL.updateKey.
+#
+# The budget is a number of entries (sizeOf=None) or a total size, sizeOf(value) being the size of
+# an entry (e.g. len for bytes). A value larger than the whole budget is not cached.
+# The predicted next access times must be finite: a key predicted never to be accessed again can be
+# given a time beyond the end of the trace.
+
+class LAPQCache:
+
+    def __init__(self, capacity, sizeOf=None, bucketWidth=1):
+        self.capacity = capacity
+        self.sizeOf = sizeOf or (lambda value: 1)
+        self.bucketWidth = bucketWidth
+        self.pq = OnlineSL()
+        # key -> (value, size, node), and key of each node
+        self.entries = {}
+        self.keyOf = {}
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    @property
+    def countComps(self):
+        return self.pq.countComps
+
+    def predictedRank(self, nextAccess):
+        return -int(nextAccess // self.bucketWidth)
+
+    def get(self, key, nextAccess):
+        # Returns the value (None on a miss), and moves the entry to its new predicted next access
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        value, size, node = self.entries[key]
+        del self.keyOf[node]
+        node = self.pq.updateKey(node, -nextAccess, self.predictedRank(nextAccess))
+        self.keyOf[node] = key
+        self.entries[key] = (value, size, node)
+        return value
+
+    def put(self, key, value, nextAccess):
+        self.pop(key)
+        size = self.sizeOf(value)
+        if size > self.capacity:
+            return
+        while self.used + size > self.capacity:
+            self.evict()
+        node = self.pq.insert(-nextAccess, self.predictedRank(nextAccess))
+        self.keyOf[node] = key
+        self.entries[key] = (value, size, node)
+        self.used += size
+
+    def pop(self, key):
+        # Removes the entry if present and returns its value (None otherwise)
+        if key not in self.entries:
+            return None
+        value, size, node = self.entries.pop(key)
+        del self.keyOf[node]
+        self.pq.delete(node)
+        self.used -= size
+        return value
+
+    def evict(self):
+        key = self.keyOf[self.pq.sl.head.getNext(0)]
+        self.pop(key)
+        self.evictions += 1
+        return key
+
+
+class LRUCache:
+    # Baseline with the same interface, nextAccess is ignored
+
+    def __init__(self, capacity, sizeOf=None):
+        self.capacity = capacity
+        self.sizeOf = sizeOf or (lambda value: 1)
+        self.entries = OrderedDict()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, nextAccess=None):
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def put(self, key, value, nextAccess=None):
+        self.pop(key)
+        size = self.sizeOf(value)
+        if size > self.capacity:
+            return
+        while self.used + size > self.capacity:
+            self.pop(next(iter(self.entries)))
+            self.evictions += 1
+        self.entries[key] = (value, size)
+        self.used += size
+
+    def pop(self, key):
+        if key not in self.entries:
+            return None
+        value, size = self.entries.pop(key)
+        self.used -= size
+        return value
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+######################################################################
+# Expensive comparators
+######################################################################
+# A comparator is a function compare(val1, val2) returning a number with the sign of val1 - val2.
+# SkipList(comparator=...) uses it for its clean comparisons instead of the subtraction. When a
+# comparison is expensive (a model call, a disk read, ...):
+# - MemoComparator keeps the results of the last maxSize pairs (LRU eviction), and answers
+#   compare(val2, val1) from the result of compare(val1, val2),
+# - ParallelComparator also has a prefetch(pairs) method, called by SkipList.exponentialSearch with
+#   the comparisons the search may need next (the first depth hops of the gallop in both
+#   directions): they are evaluated concurrently by an executor and stored in the memo, and the
+#   search then reads them one by one.
+# SkipList.countComps still counts the comparisons of the search algorithm: a memoized or
+# prefetched comparison is counted when the search uses it. The comparators count the actual
+# evaluations of compare, and the speculative ones.
+
+class MemoComparator:
+
+    def __init__(self, compare, maxSize=100000):
+        self.compare = compare
+        self.maxSize = maxSize
+        self.memo = OrderedDict()
+        self.evaluations = 0
+        self.hits = 0
+
+    def lookup(self, val1, val2):
+        # Cached result of compare(val1, val2), or None
+        if (val1, val2) in self.memo:
+            self.memo.move_to_end((val1, val2))
+            return self.memo[(val1, val2)]
+        if (val2, val1) in self.memo:
+            self.memo.move_to_end((val2, val1))
+            return -self.memo[(val2, val1)]
+        return None
+
+    def store(self, val1, val2, result):
+        self.memo[(val1, val2)] = result
+        if len(self.memo) > self.maxSize:
+            self.memo.popitem(last=False)
+
+    def __call__(self, val1, val2):
+        result = self.lookup(val1, val2)
+        if result is not None:
+            self.hits += 1
+            return result
+        result = self.compare(val1, val2)
+        self.evaluations += 1
+        self.store(val1, val2, result)
+        return result
+
+
+class ParallelComparator(MemoComparator):
+    # Use close() or a with statement to shut down the executor it creates. compare must be
+    # picklable with a process pool executor.
+
+    def __init__(self, compare, maxSize=100000, depth=8, executor=None, workers=None):
+        super().__init__(compare, maxSize)
+        self.depth = depth
+        self.ownsExecutor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers)
+        self.speculations = 0
+
+    def prefetch(self, pairs):
+        missing = []
+        for val1, val2 in pairs:
+            if self.lookup(val1, val2) is None and (val1, val2) not in missing:
+                missing.append((val1, val2))
+        if len(missing) == 0:
+            return
+        results = self.executor.map(self.compare, [pair[0] for pair in missing], [pair[1] for pair in missing])
+        for (val1, val2), result in zip(missing, results):
+            self.store(val1, val2, result)
+        self.evaluations += len(missing)
+        self.speculations += len(missing)
+
+    def close(self):
+        if self.ownsExecutor:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
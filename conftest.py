@@ -0,0 +1 @@
+# Makes the modules of the repository importable from tests/
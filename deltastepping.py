@@ -0,0 +1,180 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from heaps import BinaryHeap, FibonacciHeap
+from skiplist import OnlineSL
+from graphs import toCSR
+
+######################################################################
+# Parallel Δ-stepping
+######################################################################
+# Nodes are kept in buckets of width delta (node v is in bucket floor(dist(v)/delta)). The
+# smallest non-empty bucket is emptied repeatedly by relaxing the light edges (length <= delta)
+# of its nodes, which may refill it; then the heavy edges of all the nodes removed from it are
+# relaxed once. Each relaxation phase is split into chunks of the frontier, relaxed by a process
+# pool on a CSR graph and a distance array in shared memory. The workers return the improving
+# (node, distance) requests, which the main process reduces and applies before the next phase.
+#
+# The indices of the non-empty buckets are kept in a priority queue (BH, FH, or OSL), whose
+# comparisons are the ones reported. With OSL, the predicted rank of a bucket is the predicted
+# rank of the node which opened it.
+
+# Workers
+#---------------------------------------------------------------------
+workerShms = []
+workerArrays = {}
+
+def attachArrays(specs):
+    # specs: {name: (shared memory name, shape, dtype)}
+    for name, (shmName, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shmName)
+        workerShms.append(shm)
+        workerArrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def relaxChunk(frontier, light, delta, arrays=None):
+    # Returns the (nodes, distances) improved by the light or heavy edges of the frontier, and the
+    # number of relaxed edges
+    arrays = workerArrays if arrays is None else arrays
+    indptr, indices, lengths, dist = arrays["indptr"], arrays["indices"], arrays["lengths"], arrays["dist"]
+    starts, ends = indptr[frontier], indptr[frontier+1]
+    counts = ends - starts
+    total = counts.sum()
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0), 0
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    edges = np.arange(total) + offsets
+    edgeLengths = lengths[edges].astype(np.float64)
+    keep = (edgeLengths <= delta) if light else (edgeLengths > delta)
+    sources = np.repeat(frontier, counts)[keep]
+    targets = indices[edges[keep]].astype(np.int64)
+    newDistances = dist[sources] + edgeLengths[keep]
+    improved = newDistances < dist[targets]
+    return targets[improved], newDistances[improved], len(targets)
+
+
+# Solver
+#---------------------------------------------------------------------
+class DeltaStepping:
+    # Owns the shared memory and the process pool: use close() or a with statement.
+    # workers=1 runs the phases in the main process.
+
+    def __init__(self, graph, graphType="city", workers=None, delta=None, minChunk=1024):
+        csr, self.nodes = toCSR(graph, graphType)
+        self.nodeIndex = {node: i for i, node in enumerate(self.nodes)}
+        self.n = csr.number_of_nodes()
+        self.delta = delta if delta is not None else float(csr.lengths.mean())
+        self.minChunk = minChunk
+        self.workers = workers
+        # Number of edges relaxed by the last query (Dijkstra relaxes each edge once)
+        self.relaxed = 0
+        arrays = {"indptr": csr.indptr, "indices": csr.indices, "lengths": csr.lengths,
+                  "dist": np.full(self.n, np.inf)}
+        self.shms = []
+        self.arrays = {}
+        specs = {}
+        for name, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self.arrays[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+            self.arrays[name][:] = array
+            self.shms.append(shm)
+            specs[name] = (shm.name, array.shape, array.dtype)
+        self.dist = self.arrays["dist"]
+        self.pool = None
+        if workers != 1:
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=attachArrays, initargs=(specs,))
+            self.workers = self.pool._max_workers
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        # The arrays must be released before their shared memory is closed
+        self.dist = None
+        self.arrays = {}
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+        self.shms = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def relax(self, frontier, light):
+        numChunks = 1 if self.pool is None else max(1, min(self.workers, len(frontier) // self.minChunk))
+        if numChunks == 1:
+            targets, newDistances, relaxed = relaxChunk(frontier, light, self.delta, self.arrays)
+        else:
+            chunks = np.array_split(frontier, numChunks)
+            results = list(self.pool.map(relaxChunk, chunks, [light]*numChunks, [self.delta]*numChunks))
+            targets = np.concatenate([r[0] for r in results])
+            newDistances = np.concatenate([r[1] for r in results])
+            relaxed = sum(r[2] for r in results)
+        self.relaxed += relaxed
+        return targets, newDistances
+
+    def query(self, source, predictions=None, pqID="BH"):
+        # Returns the distance array (indexed as self.nodes) and the priority queue of the buckets
+        dist, delta = self.dist, self.delta
+        dist[:] = np.inf
+        self.relaxed = 0
+        if pqID == "OSL":
+            predictedRank = [predictions[node] for node in self.nodes]
+            pq = OnlineSL()
+        else:
+            pq = FibonacciHeap() if pqID == "FH" else BinaryHeap()
+        s = self.nodeIndex[source]
+        dist[s] = 0
+        buckets = {0: {s}}
+        current = 0
+        def insertBucket(b, v):
+            if pqID == "OSL":
+                pq.insert(b, predictedRank[v])
+            else:
+                pq.insert(b)
+        def apply(targets, newDistances):
+            # Keeps the smallest request per node, then moves the improved nodes between buckets
+            order = np.lexsort((newDistances, targets))
+            targets, newDistances = targets[order], newDistances[order]
+            first = np.ones(len(targets), dtype=bool)
+            first[1:] = targets[1:] != targets[:-1]
+            targets, newDistances = targets[first], newDistances[first]
+            improved = newDistances < dist[targets]
+            targets, newDistances = targets[improved], newDistances[improved]
+            # -1 for the nodes not reached yet
+            oldDistances = dist[targets]
+            reached = np.isfinite(oldDistances)
+            oldBuckets = np.full(len(targets), -1, dtype=np.int64)
+            oldBuckets[reached] = oldDistances[reached] // delta
+            newBuckets = (newDistances // delta).astype(np.int64).tolist()
+            dist[targets] = newDistances
+            for v, old, b in zip(targets.tolist(), oldBuckets.tolist(), newBuckets):
+                if old in buckets:
+                    buckets[old].discard(v)
+                if b not in buckets:
+                    buckets[b] = set()
+                    # The current bucket is not in the queue while it is being emptied
+                    if b != current:
+                        insertBucket(b, v)
+                buckets[b].add(v)
+        insertBucket(0, s)
+        while not pq.isEmpty():
+            current = pq.extractMin()
+            removed = []
+            while buckets.get(current):
+                frontier = np.fromiter(buckets.pop(current), dtype=np.int64)
+                removed.append(frontier)
+                apply(*self.relax(frontier, light=True))
+            buckets.pop(current, None)
+            if removed:
+                apply(*self.relax(np.unique(np.concatenate(removed)), light=False))
+        return dist.copy(), pq
+
+
+def deltaStepping(graph, source, predictions=None, pqID="BH", graphType="city", workers=None, delta=None):
+    # One query, with the same output as dijkstraPQ
+    with DeltaStepping(graph, graphType, workers, delta) as solver:
+        dist, pq = solver.query(source, predictions, pqID)
+        return dict(zip(solver.nodes, dist.tolist())), pq
@@ -1,25 +1,39 @@
-import osmnx as ox
 import os
+from time import time
 from heaps import *
 from skiplist import *
 from predictions import *
+from adaptive import AdaptivePQ
 
 ######################################################################
 # Dijkstra's algorithm with priority queue
 ######################################################################
 
-def createPQ(pqID, predictions=None, keyNode=None):
+# Priority queues which do not use predictions (created by createPQ without predictions)
+noPredictionPQs = ["BH", "FH", "RH", "DIAL", "PH", "RPH"]
+
+def createPQ(pqID, predictions=None, keyNode=None, recycleNodes=False):
     if predictions:
         if pqID == "DC":
             def dirtyCompare(dist1, dist2):
                 node1 = keyNode[dist1][-1]
                 node2 = keyNode[dist2][-1]
                 return predictions[node1] - predictions[node2]
-            return SkipList(dcompare=dirtyCompare)
+            return SkipList(dcompare=dirtyCompare, recycleNodes=recycleNodes)
+        elif pqID == "ADA":
+            return AdaptivePQ()
         else:
-            return OnlineSL()
+            return OnlineSL(recycleNodes)
     elif pqID == "FH":
         return FibonacciHeap()
+    elif pqID == "RH":
+        return RadixHeap()
+    elif pqID == "DIAL":
+        return DialQueue()
+    elif pqID == "PH":
+        return PairingHeap()
+    elif pqID == "RPH":
+        return RankPairingHeap()
     else:
         return BinaryHeap()
 
@@ -27,7 +41,7 @@ def insertInPQ(pq, pqID, key, element=None, predGenID="class", predictions=None)
 
     if predictions: 
         
-        # predictions is a SortedList of keys
+        # predictions is a SortedList of keys or a KeyCDFModel
         if predGenID=="sortedKeys": 
             predictedRank = predictions.bisect_left(key)
             pq.insert(key, predictedRank)
@@ -42,7 +56,25 @@ def insertInPQ(pq, pqID, key, element=None, predGenID="class", predictions=None)
     else:
         pq.insert(key)
 
-def dijkstraPQ(graph, source, predictions=None, pqID="BH", predGenID="class", graphType="city", returnAllKeys=False):
+def insertManyInPQ(pq, pqID, keys, elements, predGenID="class", predictions=None):
+    # Same as calling insertInPQ for each (key, element), with a single insert_many
+    if predictions:
+        if predGenID == "sortedKeys" and isinstance(predictions, KeyCDFModel):
+            pq.insert_many(keys, predictions.predictRanks(keys).tolist())
+        elif predGenID == "sortedKeys":
+            pq.insert_many(keys, [predictions.bisect_left(key) for key in keys])
+        else:
+            pq.insert_many(keys, [predictions[element] for element in elements])
+    else:
+        pq.insert_many(keys)
+
+def dijkstraPQ(graph, source, predictions=None, pqID="BH", predGenID="class", graphType="city", returnAllKeys=False, batchThreshold=np.inf):
+    # The improved neighbors of a node with at least batchThreshold neighbors are inserted with
+    # insert_many (for the queues which have it). It is off by default: the comparisons of BH then
+    # follow the accounting of BinaryHeap.insert_many (2 per element when it heapifies), and those
+    # of the skip lists the batch sweeps, instead of the counts of single insertions.
+    if graphType == "csr":
+        return dijkstraCSR(graph, source, predictions, pqID, predGenID, returnAllKeys, batchThreshold)
     # Dictionary to store the shortest distance to each node
     distances = {node: float('inf') for node in graph.nodes}
     distances[source] = 0
@@ -50,6 +82,7 @@ def dijkstraPQ(graph, source, predictions=None, pqID="BH", predGenID="class", gr
     allKeys = []
     pq = createPQ(pqID, predictions, keyNode)
     insertInPQ(pq, pqID, 0)
+    batched = hasattr(pq, "insert_many") and pqID != "DC"
     
     
     count = 0
@@ -61,7 +94,11 @@ def dijkstraPQ(graph, source, predictions=None, pqID="BH", predGenID="class", gr
         if current_distance > distances[current_node]:
             continue
         # Explore neighbors
-        for neighbor, attributes in graph[current_node].items():
+        neighbors = graph[current_node]
+        batch = batched and len(neighbors) >= batchThreshold
+        keys = []
+        elements = []
+        for neighbor, attributes in neighbors.items():
             count += 1
             distance = 0
             if graphType == "city":
@@ -75,12 +112,379 @@ def dijkstraPQ(graph, source, predictions=None, pqID="BH", predGenID="class", gr
                 if new_distance not in keyNode:
                     keyNode[new_distance] = []
                 keyNode[new_distance].append(neighbor)
-                insertInPQ(pq, pqID, new_distance, neighbor, predGenID, predictions)
+                if batch:
+                    keys.append(new_distance)
+                    elements.append(neighbor)
+                else:
+                    insertInPQ(pq, pqID, new_distance, neighbor, predGenID, predictions)
                 allKeys.append(new_distance)
+        if keys:
+            insertManyInPQ(pq, pqID, keys, elements, predGenID, predictions)
     if returnAllKeys:
         return distances, pq, allKeys
     return distances, pq
 
+def dijkstraCSR(graph, source, predictions=None, pqID="BH", predGenID="class", returnAllKeys=False, batchThreshold=np.inf, vectorThreshold=16):
+    # dijkstraPQ on a CSRGraph. The tentative distances of the neighbors of a node with at least
+    # vectorThreshold neighbors are computed in one vectorized step (this does not change the
+    # comparisons). Below, NumPy's per-call overhead is larger than the loop, which uses the
+    # adjacency converted to lists.
+    n = graph.number_of_nodes()
+    dist = np.full(n, np.inf)
+    dist[source] = 0
+    indptr, indices, lengths = graph.indptr.tolist(), graph.indices.tolist(), graph.lengths.tolist()
+    keyNode = {0:[source]}
+    allKeys = []
+    pq = createPQ(pqID, predictions, keyNode)
+    insertInPQ(pq, pqID, 0)
+    batched = hasattr(pq, "insert_many") and pqID != "DC"
+    while not pq.isEmpty():
+        current_distance = pq.extractMin()
+        current_node = keyNode[current_distance].pop()
+        if current_distance > dist[current_node]:
+            continue
+        a, b = indptr[current_node], indptr[current_node+1]
+        if b-a >= vectorThreshold:
+            neighbors = graph.indices[a:b]
+            newDistances = current_distance + graph.lengths[a:b].astype(np.float64)
+            improved = newDistances < dist[neighbors]
+            keys = newDistances[improved].tolist()
+            elements = neighbors[improved].tolist()
+        else:
+            keys = []
+            elements = []
+            for k in range(a, b):
+                new_distance = current_distance + lengths[k]
+                if new_distance < dist[indices[k]]:
+                    keys.append(new_distance)
+                    elements.append(indices[k])
+        for new_distance, neighbor in zip(keys, elements):
+            dist[neighbor] = new_distance
+            if new_distance not in keyNode:
+                keyNode[new_distance] = []
+            keyNode[new_distance].append(neighbor)
+        if batched and b-a >= batchThreshold:
+            insertManyInPQ(pq, pqID, keys, elements, predGenID, predictions)
+        else:
+            for new_distance, neighbor in zip(keys, elements):
+                insertInPQ(pq, pqID, new_distance, neighbor, predGenID, predictions)
+        allKeys += keys
+    distances = dict(zip(range(n), dist.tolist()))
+    if returnAllKeys:
+        return distances, pq, allKeys
+    return distances, pq
+
+def dijkstraDecreaseKey(graph, source, pqID="PH", graphType="city"):
+    # Each node is inserted at most once, and its key is decreased when a shorter path is found.
+    # The heap must return a handle from insert and support decrease_key: FH, PH or RPH.
+    distances = {node: float('inf') for node in graph.nodes}
+    distances[source] = 0
+    keyNode = {0:[source]}
+    handles = {}
+    pq = createPQ(pqID)
+    handles[source] = pq.insert(0)
+    while not pq.isEmpty():
+        current_distance = pq.extractMin()
+        current_node = keyNode[current_distance].pop()
+        del handles[current_node]
+        for neighbor, attributes in graph[current_node].items():
+            new_distance = current_distance + getEdgeLength(attributes, graphType)
+            if new_distance < distances[neighbor]:
+                if neighbor in handles:
+                    keyNode[distances[neighbor]].remove(neighbor)
+                    pq.decrease_key(handles[neighbor], new_distance)
+                else:
+                    handles[neighbor] = pq.insert(new_distance)
+                distances[neighbor] = new_distance
+                if new_distance not in keyNode:
+                    keyNode[new_distance] = []
+                keyNode[new_distance].append(neighbor)
+    return distances, pq
+
+
+
+
+######################################################################
+# A* search
+######################################################################
+
+# The key of a node is f = g + h, where g is its tentative distance from the source and h a lower
+# bound on its distance to the target: the great-circle (haversine) distance for the osmnx graphs
+# (x = longitude, y = latitude, in degrees), the Euclidean distance for the CSR graphs (in meters).
+# Edge lengths are at least these distances, up to their rounding, so h is scaled down slightly.
+# The heuristic of all the nodes is computed in one vectorized step per target.
+
+earthRadius = 6371009
+
+def nodeCoordinates(graph, graphType="city"):
+    # Arrays of x and y coordinates, in the order of graph.nodes
+    if graphType == "csr":
+        return graph.x, graph.y
+    nodes = graph.nodes
+    return np.array([nodes[node]["x"] for node in nodes]), np.array([nodes[node]["y"] for node in nodes])
+
+def heuristicValues(graph, target, graphType="city", coordinates=None, slack=1e-6):
+    # {node: lower bound on the distance from node to target}
+    x, y = coordinates if coordinates is not None else nodeCoordinates(graph, graphType)
+    nodes = list(graph.nodes)
+    t = nodes.index(target) if graphType != "csr" else target
+    if graphType == "csr":
+        h = np.hypot(x - x[t], y - y[t])
+    else:
+        lon, lat = np.radians(x), np.radians(y)
+        a = np.sin((lat - lat[t])/2)**2 + np.cos(lat) * np.cos(lat[t]) * np.sin((lon - lon[t])/2)**2
+        h = 2 * earthRadius * np.arcsin(np.sqrt(np.minimum(a, 1)))
+    return dict(zip(nodes, (h * (1 - slack)).tolist()))
+
+def getFRanks(graph, source, target, graphType="city", heuristic=None):
+    # Nodes sorted by their exact f-value d(source, v) + h(v)
+    heuristic = heuristic or heuristicValues(graph, target, graphType)
+    distances, pq = dijkstraPQ(graph, source, graphType=graphType)
+    return sorted(distances, key=lambda node: distances[node] + heuristic[node])
+
+def astarPQ(graph, source, target, predictions=None, pqID="BH", predGenID="class", graphType="city", heuristic=None):
+    # Returns the distances (exact for the settled nodes), the priority queue and the number of
+    # settled nodes. predictions are the predicted ranks of the f-values of the nodes.
+    heuristic = heuristic or heuristicValues(graph, target, graphType)
+    distances = {node: float('inf') for node in graph.nodes}
+    distances[source] = 0
+    f = heuristic[source]
+    keyNode = {f:[source]}
+    pq = createPQ(pqID, predictions, keyNode)
+    insertInPQ(pq, pqID, f, source, predGenID, predictions)
+    settled = 0
+    while not pq.isEmpty():
+        current_f = pq.extractMin()
+        current_node = keyNode[current_f].pop()
+        # Stale entry
+        if current_f > distances[current_node] + heuristic[current_node]:
+            continue
+        settled += 1
+        if current_node == target:
+            break
+        current_distance = distances[current_node]
+        for neighbor, attributes in graph[current_node].items():
+            new_distance = current_distance + getEdgeLength(attributes, graphType)
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                new_f = new_distance + heuristic[neighbor]
+                if new_f not in keyNode:
+                    keyNode[new_f] = []
+                keyNode[new_f].append(neighbor)
+                insertInPQ(pq, pqID, new_f, neighbor, predGenID, predictions)
+    return distances, pq, settled
+
+
+
+
+######################################################################
+# Repeated Dijkstra queries on the same graph
+######################################################################
+
+# A DijkstraContext owns the state of the queries on one graph: adjacency lists of node indices
+# built once, distance/parent arrays allocated once, and a priority queue reset between queries
+# (skip-list nodes are recycled). A node's distance is only valid if its stamp is the current
+# epoch, so starting a query costs O(1) instead of O(n), and the query costs O(touched nodes).
+
+class DijkstraContext:
+
+    def __init__(self, graph, pqID="BH", graphType="city"):
+        self.pqID = pqID
+        self.nodes = list(graph.nodes)
+        self.nodeIndex = {node: i for i, node in enumerate(self.nodes)}
+        self.adjacency = [[(self.nodeIndex[neighbor], getEdgeLength(attributes, graphType))
+                           for neighbor, attributes in graph[node].items()] for node in self.nodes]
+        n = len(self.nodes)
+        self.distance = [float('inf')] * n
+        self.parent = [-1] * n
+        self.stamp = [0] * n
+        self.epoch = 0
+        self.touched = []
+        self.keyNode = {}
+        self.pq = None
+        self.predictions = None
+
+    def getPQ(self, predictions):
+        # The dirty comparisons of DC depend on the predictions, so the queue is rebuilt if they change
+        reusable = self.pq is not None and (predictions is None) == (self.predictions is None)
+        if reusable and (self.pqID != "DC" or predictions is self.predictions):
+            self.pq.reset()
+        else:
+            self.pq = createPQ(self.pqID, predictions, self.keyNode, recycleNodes=True)
+        self.predictions = predictions
+        return self.pq
+
+    def query(self, source, predictions=None, predGenID="class"):
+        self.epoch += 1
+        epoch = self.epoch
+        distance, parent, stamp, touched = self.distance, self.parent, self.stamp, self.touched
+        nodes, nodeIndex, adjacency, keyNode = self.nodes, self.nodeIndex, self.adjacency, self.keyNode
+        touched.clear()
+        keyNode.clear()
+        s = nodeIndex[source]
+        stamp[s] = epoch
+        distance[s] = 0
+        parent[s] = -1
+        touched.append(s)
+        keyNode[0] = [source]
+        pq = self.getPQ(predictions)
+        insertInPQ(pq, self.pqID, 0)
+        while not pq.isEmpty():
+            current_distance = pq.extractMin()
+            current_node = keyNode[current_distance].pop()
+            i = nodeIndex[current_node]
+            if current_distance > distance[i]:
+                continue
+            for j, length in adjacency[i]:
+                new_distance = current_distance + length
+                if stamp[j] != epoch or new_distance < distance[j]:
+                    if stamp[j] != epoch:
+                        stamp[j] = epoch
+                        touched.append(j)
+                    distance[j] = new_distance
+                    parent[j] = i
+                    neighbor = nodes[j]
+                    if new_distance not in keyNode:
+                        keyNode[new_distance] = []
+                    keyNode[new_distance].append(neighbor)
+                    insertInPQ(pq, self.pqID, new_distance, neighbor, predGenID, predictions)
+        return pq
+
+    def getDistance(self, node):
+        i = self.nodeIndex[node]
+        if self.stamp[i] != self.epoch:
+            return float('inf')
+        return self.distance[i]
+
+    def getPath(self, target):
+        i = self.nodeIndex[target]
+        if self.stamp[i] != self.epoch:
+            return None
+        path = []
+        while i != -1:
+            path.append(self.nodes[i])
+            i = self.parent[i]
+        return path[::-1]
+
+    def getDistances(self):
+        # Same dictionary as the one returned by dijkstraPQ, costs O(n)
+        distances = {node: float('inf') for node in self.nodes}
+        for i in self.touched:
+            distances[self.nodes[i]] = self.distance[i]
+        return distances
+
+
+
+
+######################################################################
+# Incremental Dijkstra under edge-weight updates
+######################################################################
+
+def getEdgeLength(attributes, graphType):
+    if graphType == "city":
+        return attributes[0]["length"]
+    if graphType == "weighted":
+        return attributes["weight"]
+    if graphType == "csr":
+        return attributes
+    return 0
+
+def setEdgeLength(graph, u, v, length, graphType):
+    if graphType == "csr":
+        raise ValueError("The edge lengths of a CSR graph cannot be changed.")
+    if graphType == "city":
+        graph[u][v][0]["length"] = length
+    elif graphType == "weighted":
+        graph[u][v]["weight"] = length
+
+def applyEdgeChanges(graph, changes, graphType="city"):
+    # changes is a list of (u, v, newLength), returns the list of (u, v, oldLength, newLength)
+    updates = []
+    for u, v, length in changes:
+        updates.append((u, v, getEdgeLength(graph[u][v], graphType), length))
+        setEdgeLength(graph, u, v, length, graphType)
+    return updates
+
+def getAffectedNodes(graph, distances, changes, graphType):
+    # Nodes reachable through tight edges from the head of an increased tight edge. All the
+    # other nodes keep a shortest path avoiding the increased edges, hence their distance.
+    # Must be called before the changes are applied to the graph.
+    if graphType == "csr":
+        raise ValueError("Incremental updates are not supported for CSR graphs.")
+    stack = []
+    for u, v, length in changes:
+        oldLength = getEdgeLength(graph[u][v], graphType)
+        if length > oldLength and distances[u] + oldLength == distances[v]:
+            stack.append(v)
+    affected = set(stack)
+    while stack:
+        node = stack.pop()
+        for neighbor, attributes in graph[node].items():
+            if neighbor in affected:
+                continue
+            if distances[node] + getEdgeLength(attributes, graphType) == distances[neighbor]:
+                affected.add(neighbor)
+                stack.append(neighbor)
+    return affected
+
+def incrementalDijkstra(graph, distances, changes, pqID="OSL", predictions=None, graphType="city"):
+    # Applies the changes (u, v, newLength) to the graph and repairs the distances of the previous
+    # run, only visiting the affected region. The ranks of the previous distances are used as
+    # predictions, unless other predictions are given.
+    if predictions is None and pqID not in noPredictionPQs:
+        predictions = {node: r for r, node in enumerate(sorted(distances, key=distances.get))}
+    affected = getAffectedNodes(graph, distances, changes, graphType)
+    updates = applyEdgeChanges(graph, changes, graphType)
+    distances = dict(distances)
+    for node in affected:
+        distances[node] = float('inf')
+
+    # Seeds: affected nodes reached from the unaffected region, and heads of decreased edges
+    seeds = {}
+    predecessors = graph.pred if graph.is_directed() else graph.adj
+    for node in affected:
+        for pred in predecessors[node]:
+            if pred not in affected:
+                new_distance = distances[pred] + getEdgeLength(graph[pred][node], graphType)
+                if new_distance < seeds.get(node, float('inf')):
+                    seeds[node] = new_distance
+    for u, v, oldLength, length in updates:
+        if length < oldLength and distances[u] + length < min(distances[v], seeds.get(v, float('inf'))):
+            seeds[v] = distances[u] + length
+
+    keyNode = {}
+    pq = createPQ(pqID, predictions, keyNode)
+    for node, new_distance in seeds.items():
+        distances[node] = new_distance
+        if new_distance not in keyNode:
+            keyNode[new_distance] = []
+        keyNode[new_distance].append(node)
+        insertInPQ(pq, pqID, new_distance, node, "incremental", predictions)
+
+    while not pq.isEmpty():
+        current_distance = pq.extractMin()
+        current_node = keyNode[current_distance].pop()
+        if current_distance > distances[current_node]:
+            continue
+        for neighbor, attributes in graph[current_node].items():
+            new_distance = current_distance + getEdgeLength(attributes, graphType)
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                if new_distance not in keyNode:
+                    keyNode[new_distance] = []
+                keyNode[new_distance].append(neighbor)
+                insertInPQ(pq, pqID, new_distance, neighbor, "incremental", predictions)
+    return distances, pq
+
+def randomEdgeChanges(graph, numChanges, graphType="city", minFactor=0.5, maxFactor=2):
+    edges = list(dict.fromkeys(graph.edges()))
+    changes = []
+    for i in np.random.choice(len(edges), numChanges, replace=False):
+        u, v = edges[i]
+        factor = np.random.uniform(minFactor, maxFactor)
+        changes.append((u, v, getEdgeLength(graph[u][v], graphType)*factor))
+    return changes
+
 
 
 
@@ -105,12 +509,70 @@ def getDecayPredictions(rankedNodes, timesteps):
     dp = decayPredictions(n, timesteps, rankedNodes)
     return formatPredictions(dp)
 
-def getKeyPredictions(graph, source, graphType):
+def getKeyPredictions(graph, source, graphType, *, numBins=None):
+    # All the keys of a reference run, or a KeyCDFModel of them with numBins bins
     #source = np.random.choice(list(graph.nodes()))
     getRanks(graph, source, graphType)
     distances, pq, allKeys = dijkstraPQ(graph, source, returnAllKeys=True, graphType=graphType)
+    if numBins:
+        return KeyCDFModel(allKeys, numBins)
     return SortedList(allKeys)
 
+######################################################################
+# Landmark predictions
+######################################################################
+
+# As in ALT, we store the distances from and to k landmarks. By the triangle inequality,
+# max_l max(d(l,v) - d(l,s), d(s,l) - d(v,l)) is a lower bound on d(s,v), so the index gives
+# predicted keys and ranks for the nodes of any new source s in O(n*k) vectorized time.
+
+def distancesToArray(distances, nodes, dtype="float32"):
+    return np.array([distances[node] for node in nodes], dtype=dtype)
+
+class LandmarkIndex:
+
+    def __init__(self, graph, k=8, graphType="city", landmarks=None, dtype="float32"):
+        self.graphType = graphType
+        self.nodes = list(graph.nodes)
+        self.nodeIndex = {node: i for i, node in enumerate(self.nodes)}
+        self.landmarks = []
+        n = len(self.nodes)
+        k = k if landmarks is None else len(landmarks)
+        self.fromLandmark = np.zeros((k, n), dtype=dtype)
+        self.toLandmark = np.zeros((k, n), dtype=dtype)
+        reverse = graph.reverse(copy=False) if graph.is_directed() else graph
+        # Landmarks are chosen greedily, each one being the farthest from those already chosen
+        minDist = np.full(n, np.inf)
+        for l in range(k):
+            if landmarks is not None:
+                landmark = landmarks[l]
+            elif l == 0:
+                landmark = self.nodes[np.random.randint(n)]
+            else:
+                landmark = self.nodes[np.argmax(np.where(np.isfinite(minDist), minDist, -1))]
+            self.landmarks.append(landmark)
+            distances, pq = dijkstraPQ(graph, landmark, graphType=graphType)
+            self.fromLandmark[l] = distancesToArray(distances, self.nodes, dtype)
+            distances, pq = dijkstraPQ(reverse, landmark, graphType=graphType)
+            self.toLandmark[l] = distancesToArray(distances, self.nodes, dtype)
+            minDist = np.minimum(minDist, self.fromLandmark[l])
+
+    def predictedKeys(self, source):
+        s = self.nodeIndex[source]
+        F, T = self.fromLandmark, self.toLandmark
+        with np.errstate(invalid="ignore"):
+            bounds = np.fmax(F - F[:, s, None], T[:, s, None] - T)
+        # inf - inf means the landmark gives no information on the node
+        bounds[np.isnan(bounds)] = 0
+        return np.maximum(bounds.max(axis=0), 0)
+
+    def predictedRanks(self, source):
+        keys = self.predictedKeys(source)
+        order = np.argsort(keys, kind="stable")
+        return {self.nodes[order[r]]: r for r in range(len(order))}
+
+
+
 def getPredictions(predGenID, rankedNodes, params, graphType):
     if predGenID == "class":
         c = params['c']
@@ -119,10 +581,13 @@ def getPredictions(predGenID, rankedNodes, params, graphType):
         timesteps = params['timesteps']
         return getDecayPredictions(rankedNodes, timesteps)
     if predGenID == "sortedKeys":
-        dist = params['d']
         graph = params['graph']
         source = params['source']
-        return getKeyPredictions(graph, source, dist, graphType)
+        return getKeyPredictions(graph, source, graphType, numBins=params.get('bins'))
+    if predGenID == "landmarks":
+        index = params['index']
+        source = params['source']
+        return index.predictedRanks(source)
     return None
 
 
@@ -132,6 +597,8 @@ def getPredictions(predGenID, rankedNodes, params, graphType):
 ######################################################################
 
 def importCityGraph(cityName): #city name lower case (?)
+    # osmnx is only imported here, the rest of the module does not need it
+    import osmnx as ox
     filename = f"data/{cityName}.graphml"
     if os.path.exists(filename):
         graph = ox.load_graphml(filename)
@@ -167,7 +634,7 @@ def testDijkstra(graph, predGenID=None, params=None, pqID="OSL", niters=30, grap
     #-----------------------------------
     # No predictions
     #-----------------------------------
-    if pqID in ["BH", "FH"]: 
+    if pqID in noPredictionPQs:
         for i in range(niters):
             source = np.random.choice(list(graph.nodes()))
             distances, pq = dijkstraPQ(graph, source, pqID=pqID, graphType=graphType)
@@ -178,7 +645,7 @@ def testDijkstra(graph, predGenID=None, params=None, pqID="OSL", niters=30, grap
     #-----------------------------------
     elif predGenID == "sortedKeys":
         refSource = chooseRandomSource(graph, graphType)[0]
-        predictions = getKeyPredictions(graph, refSource, graphType)
+        predictions = getKeyPredictions(graph, refSource, graphType, numBins=params.get("bins"))
         rankedNodes = getRanks(graph, refSource, graphType)[0]
         dist = params["d"]
         for i in range(niters):
@@ -188,6 +655,19 @@ def testDijkstra(graph, predGenID=None, params=None, pqID="OSL", niters=30, grap
             distances, pq = dijkstraPQ(graph, source, predictions, pqID="OSL", predGenID=predGenID, graphType=graphType)
             countComps[i] = pq.countComps
 
+    #-----------------------------------
+    # Landmark predictions
+    #-----------------------------------
+    elif predGenID == "landmarks":
+        index = LandmarkIndex(graph, params["k"], graphType)
+        params["index"] = index
+        for i in range(niters):
+            source = chooseRandomSource(graph, graphType)[0]
+            params["source"] = source
+            predictions = getPredictions(predGenID, None, params, graphType)
+            distances, pq = dijkstraPQ(graph, source, predictions, pqID=pqID, predGenID=predGenID, graphType=graphType)
+            countComps[i] = pq.countComps
+
     #-----------------------------------
     # Class or decay predictions
     #-----------------------------------
@@ -198,4 +678,50 @@ def testDijkstra(graph, predGenID=None, params=None, pqID="OSL", niters=30, grap
             predictions = getPredictions(predGenID, rankedNodes, params, graphType)
             distances, pq = dijkstraPQ(graph, source, predictions, pqID=pqID, predGenID=predGenID, graphType=graphType)
             countComps[i] = pq.countComps
-    return countComps.mean()/n, countComps.std()/n
\ No newline at end of file
+    return countComps.mean()/n, countComps.std()/n
+
+
+# Incremental Dijkstra vs full recomputation
+#-----------------------------------------------------------------------------
+
+def testIncrementalDijkstra(graph, numChanges=10, pqIDs=["OSL", "BH"], niters=30, graphType="city", tolerance=1e-9):
+    # For each priority queue, compares the comparisons and runtime of the incremental repair
+    # with those of a full recomputation on the updated graph. The distances may differ by
+    # floating-point rounding (sums in another order): {pqID}_maxError is the largest difference.
+    # Raises a RuntimeError (after restoring the graph) if a distance differs by more than
+    # tolerance (relative).
+    stats = {}
+    for pqID in pqIDs:
+        for mode in ["incremental", "full"]:
+            stats[f"{pqID}_{mode}_comps"] = np.zeros(niters)
+            stats[f"{pqID}_{mode}_time"] = np.zeros(niters)
+        stats[f"{pqID}_maxError"] = np.zeros(niters)
+    for i in range(niters):
+        source = chooseRandomSource(graph, graphType)[0]
+        distances, pq = dijkstraPQ(graph, source, graphType=graphType)
+        oldRanks = {node: r for r, node in enumerate(sorted(distances, key=distances.get))}
+        changes = randomEdgeChanges(graph, numChanges, graphType)
+        restore = [(u, v, getEdgeLength(graph[u][v], graphType)) for u, v, length in changes]
+        for pqID in pqIDs:
+            predictions = None if pqID in noPredictionPQs else oldRanks
+            ti = time()
+            newDistances, pq = incrementalDijkstra(graph, distances, changes, pqID, predictions, graphType)
+            stats[f"{pqID}_incremental_time"][i] = time() - ti
+            stats[f"{pqID}_incremental_comps"][i] = pq.countComps
+            ti = time()
+            fullDistances, pq = dijkstraPQ(graph, source, predictions, pqID=pqID, predGenID="incremental", graphType=graphType)
+            stats[f"{pqID}_full_time"][i] = time() - ti
+            stats[f"{pqID}_full_comps"][i] = pq.countComps
+            incremental = np.array([newDistances[node] for node in fullDistances])
+            full = np.array(list(fullDistances.values()))
+            mismatches = ~np.isclose(incremental, full, rtol=tolerance, atol=0)
+            finite = np.isfinite(incremental) & np.isfinite(full)
+            stats[f"{pqID}_maxError"][i] = np.abs(incremental[finite] - full[finite]).max(initial=0)
+            # Restore the graph before the next priority queue
+            applyEdgeChanges(graph, restore, graphType)
+            if mismatches.any():
+                raise RuntimeError(f"{pqID}: {mismatches.sum()} incremental distances differ from the full "
+                                   f"recomputation (iteration {i}, source {source}).")
+    for key in stats:
+        stats[key] = (stats[key].mean(), stats[key].std())
+    return stats
@@ -1,9 +1,11 @@
 import json
+import os
 import numpy as np
 from time import time
 from sortedcontainers import SortedList
 from sorting import *
 from dijkstra import *
+from graphs import generateGraph
 
 ######################################################################
 # Save Experiment Results
@@ -20,19 +22,112 @@ def saveToFile(mean, std, filename):
         json.dump(data, file)
 
 def uploadFromFile(filename):
-    try:
+    # Returns (None, None) if the experiment was never run. The experiments logged in a
+    # ResultsStore are read from the log, which is never older than the saved file: if the sweep
+    # was interrupted, the results logged so far are aggregated, with nan for the parameters
+    # without any result. The other experiments are read from the saved file.
+    mean, std = {}, {}
+    if os.path.exists("data/"+filename):
         with open("data/"+filename, 'r') as file:
             data = json.load(file)
-    except:
+        for key in data["mean"]:
+            mean[key] = np.array(data["mean"][key])
+            std[key] = np.array(data["std"][key])
+    if os.path.exists(ResultsStore.getPath(filename)):
+        logMean, logStd = ResultsStore(filename).aggregate()
+        mean.update(logMean)
+        std.update(logStd)
+    if not mean:
         return None, None
-    mean = data["mean"]
-    std = data["std"]
-    for key in mean:
-        mean[key] = np.array(mean[key])
-        std[key] = np.array(std[key])
     return mean, std
 
 
+# Checkpointed results
+#---------------------------------------------------------------------
+# Append-only log of a sweep, with one JSON line per (experiment ID, parameter index, iteration),
+# written as soon as the result is computed. The sweep saved in data/name.json is logged in
+# data/name.jsonl. A line truncated by a crash is ignored when the log is read.
+# The parameter index of a cell only has a meaning for the grid of its sweep: a sweep is only
+# resumed with the same grid, seed, constant flag and number of iterations. Only the sweeps of runner.py are logged, the
+# sweeps of this file save their results when they are done.
+
+class ResultsStore:
+
+    @staticmethod
+    def getPath(filename):
+        return "data/" + os.path.splitext(filename)[0] + ".jsonl"
+
+    def __init__(self, filename):
+        self.path = self.getPath(filename)
+        self.sweeps = {}
+        self.cells = {}
+        self.truncated = False
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as file:
+                for line in file:
+                    self.truncated = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if "value" in record:
+                        self.cells[(record["expID"], record["i"], record["iter"])] = record["value"]
+                    else:
+                        self.sweeps[record["expID"]] = record
+
+    def append(self, record):
+        with open(self.path, 'a') as file:
+            if self.truncated:
+                file.write("\n")
+                self.truncated = False
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def addSweep(self, expID, grid, constant=False, seed=None, niters=None):
+        # grid: list of the parameters (JSON serializable) of the sweep
+        # constant: only the first parameter is run, its results hold for all the parameters
+        # niters: iterations per parameter, aggregate() uses all the logged iterations
+        record = {"expID": expID, "numParams": len(grid), "grid": json.loads(json.dumps(grid)),
+                  "constant": constant, "seed": seed, "niters": niters}
+        if expID in self.sweeps:
+            for key in ["seed", "numParams", "grid", "constant", "niters"]:
+                if self.sweeps[expID].get(key) != record[key]:
+                    raise ValueError(f"{self.path} contains results of {expID} obtained with another {key} "
+                                     f"({self.sweeps[expID].get(key)}), delete it or use another file name.")
+            return
+        self.sweeps[expID] = record
+        self.append(record)
+
+    def has(self, expID, i, it):
+        return (expID, i, it) in self.cells
+
+    def get(self, expID, i, it):
+        return self.cells[(expID, i, it)]
+
+    def add(self, expID, i, it, value):
+        self.cells[(expID, i, it)] = float(value)
+        self.append({"expID": expID, "i": i, "iter": it, "value": float(value)})
+
+    def aggregate(self):
+        values = {expID: {} for expID in self.sweeps}
+        for (expID, i, it), value in self.cells.items():
+            values[expID].setdefault(i, []).append(value)
+        mean = {}
+        std = {}
+        for expID, sweep in self.sweeps.items():
+            numParams = sweep["numParams"]
+            mean[expID] = np.full(numParams, np.nan)
+            std[expID] = np.full(numParams, np.nan)
+            for i, vals in values[expID].items():
+                mean[expID][i] = np.mean(vals)
+                std[expID][i] = np.std(vals)
+            if sweep["constant"]:
+                mean[expID][:] = mean[expID][0]
+                std[expID][:] = std[expID][0]
+        return mean, std
+
+
 ######################################################################
 # Sorting experiments
 ######################################################################
@@ -216,6 +311,262 @@ def testDijkstraSortedKeys(cityName, niters=50,m=20):
     saveToFile(mean, std, filename)
 
 
+# Key predictions: CDF model vs SortedList of all the keys
+#---------------------------------------------------------------------
+def testDijkstraKeyModel(cityName, niters=50, binVals=[16, 64, 256, 1024, 4096, 16384], d=5000):
+    # For each number of bins: comparisons of OSL, memory of the model, and mean absolute error of
+    # its predicted ranks on the reference keys (exact for the SortedList, "bins" = 0)
+    graph = importCityGraph(cityName)
+    predGenID = "sortedKeys"
+    refSource = chooseRandomSource(graph)[0]
+    allKeys = dijkstraPQ(graph, refSource, returnAllKeys=True)[2]
+    exactRanks = np.searchsorted(np.sort(allKeys), allKeys, side="left")
+    binVals = [0] + binVals
+    mean = {}
+    std = {}
+    for key in ["comps", "bytes", "rankError"]:
+        mean[f"dijkstra_OSL_{predGenID}_{key}_{cityName}"] = np.zeros(len(binVals))
+        std[f"dijkstra_OSL_{predGenID}_{key}_{cityName}"] = np.zeros(len(binVals))
+    for i, numBins in enumerate(binVals):
+        np.random.seed(0)
+        params = {'d': d, 'bins': numBins}
+        comps = testDijkstra(graph, predGenID, params, "OSL", niters)
+        if numBins:
+            model = KeyCDFModel(allKeys, numBins)
+            nbytes = model.nbytes
+            rankError = np.abs(model.predictRanks(allKeys) - exactRanks).mean()
+        else:
+            # A float and a pointer per key
+            nbytes = 32*len(allKeys)
+            rankError = 0
+        mean[f"dijkstra_OSL_{predGenID}_comps_{cityName}"][i], std[f"dijkstra_OSL_{predGenID}_comps_{cityName}"][i] = comps
+        mean[f"dijkstra_OSL_{predGenID}_bytes_{cityName}"][i] = nbytes
+        mean[f"dijkstra_OSL_{predGenID}_rankError_{cityName}"][i] = rankError
+        print(f"bins = {numBins}: {comps[0]:.3f} comparisons/n, {nbytes} bytes, rank error {rankError:.1f}")
+    filename = f"data_dijkstra_keymodel_{cityName}.json"
+    saveToFile(mean, std, filename)
+    return mean, std
+
+
+# Test with landmark predictions
+#---------------------------------------------------------------------
+def testDijkstraLandmarks(cityName, niters=50, kvals=[1, 2, 4, 8, 16]):
+    graph = importCityGraph(cityName)
+    predGenID = "landmarks"
+    m = len(kvals)-1
+    mean = {}
+    std = {}
+
+    Ti = time()
+    for pqID in ["OSL", "DC"]:
+        ti = time()
+        print("\nPriority queue: ",pqID)
+        expID = f"dijkstra_{pqID}_{predGenID}_{cityName}"
+        mean[expID] = np.zeros(m+1, dtype="float")
+        std[expID] = np.zeros(m+1, dtype="float")
+        for i in range(m+1):
+            print("- k = ",kvals[i],", time ",time()-ti)
+            params = {'k':kvals[i]}
+            mean[expID][i],std[expID][i] = testDijkstra(graph, predGenID, params, pqID, niters)
+        print("Runtime = ", time()-ti)
+    print("\nTotal runtime = ", time()-Ti)
+    filename = f"data_dijkstra_{predGenID}_{cityName}.json"
+    saveToFile(mean, std, filename)
+
+
+# Compare the monotone queues with BH, FH and OSL
+#---------------------------------------------------------------------
+def testDijkstraMonotone(cityName, niters=50, pqIDs=["RH", "DIAL", "BH", "FH", "OSL"], timesteps=0):
+    # OSL uses decay predictions with the given number of timesteps (0 = exact ranks)
+    graph = importCityGraph(cityName)
+    n = graph.number_of_nodes()
+    comps = {pqID: np.zeros(niters) for pqID in pqIDs}
+    runtime = {pqID: np.zeros(niters) for pqID in pqIDs}
+    for i in range(niters):
+        source, rankedNodes, numComps = chooseRandomSource(graph)
+        predictions = getDecayPredictions(rankedNodes, timesteps)
+        for pqID in pqIDs:
+            ti = time()
+            if pqID in ["OSL", "DC"]:
+                distances, pq = dijkstraPQ(graph, source, predictions, pqID=pqID, predGenID="decay")
+            else:
+                distances, pq = dijkstraPQ(graph, source, pqID=pqID)
+            runtime[pqID][i] = time() - ti
+            comps[pqID][i] = pq.countComps / n
+    mean = {}
+    std = {}
+    for pqID in pqIDs:
+        print(f"{pqID}: comparisons/n = {comps[pqID].mean():.3f}, runtime = {1000*runtime[pqID].mean():.2f} ms")
+        mean[f"dijkstra_{pqID}_comps_{cityName}"] = [comps[pqID].mean()]
+        std[f"dijkstra_{pqID}_comps_{cityName}"] = [comps[pqID].std()]
+        mean[f"dijkstra_{pqID}_time_{cityName}"] = [runtime[pqID].mean()]
+        std[f"dijkstra_{pqID}_time_{cityName}"] = [runtime[pqID].std()]
+    filename = f"data_dijkstra_monotone_{cityName}.json"
+    saveToFile(mean, std, filename)
+    return mean, std
+
+
+# Pairing heaps vs Fibonacci heap, with lazy insertions or decrease-key
+#---------------------------------------------------------------------
+def testDijkstraDecreaseKey(cityName, niters=50, pqIDs=["FH", "PH", "RPH"]):
+    # "lazy": dijkstraPQ inserts a new key for each shorter path, "dk": dijkstraDecreaseKey
+    graph = importCityGraph(cityName)
+    n = graph.number_of_nodes()
+    variants = [(pqID, variant) for pqID in pqIDs for variant in ["lazy", "dk"]]
+    comps = {v: np.zeros(niters) for v in variants}
+    runtime = {v: np.zeros(niters) for v in variants}
+    for i in range(niters):
+        source = np.random.choice(list(graph.nodes()))
+        for pqID, variant in variants:
+            ti = time()
+            if variant == "lazy":
+                distances, pq = dijkstraPQ(graph, source, pqID=pqID)
+            else:
+                distances, pq = dijkstraDecreaseKey(graph, source, pqID=pqID)
+            runtime[(pqID, variant)][i] = time() - ti
+            comps[(pqID, variant)][i] = pq.countComps / n
+    mean = {}
+    std = {}
+    for pqID, variant in variants:
+        v = (pqID, variant)
+        print(f"{pqID} ({variant}): comparisons/n = {comps[v].mean():.3f}, runtime = {1000*runtime[v].mean():.2f} ms")
+        mean[f"dijkstra_{pqID}_{variant}_comps_{cityName}"] = [comps[v].mean()]
+        std[f"dijkstra_{pqID}_{variant}_comps_{cityName}"] = [comps[v].std()]
+        mean[f"dijkstra_{pqID}_{variant}_time_{cityName}"] = [runtime[v].mean()]
+        std[f"dijkstra_{pqID}_{variant}_time_{cityName}"] = [runtime[v].std()]
+    filename = f"data_dijkstra_decreasekey_{cityName}.json"
+    saveToFile(mean, std, filename)
+    return mean, std
+
+
+# Point-to-point queries: A* vs Dijkstra stopped at the target
+#---------------------------------------------------------------------
+def testAStar(cityName, niters=50, pqIDs=["BH", "FH", "OSL", "DC"], timesteps=0):
+    # Settled nodes/n and comparisons/n. OSL and DC use decay predictions of the ranks of the keys
+    # (f-values for A*, distances for Dijkstra) with the given number of timesteps.
+    graph = importCityGraph(cityName)
+    n = graph.number_of_nodes()
+    nodes = list(graph.nodes)
+    coordinates = nodeCoordinates(graph)
+    zero = {node: 0 for node in nodes}
+    variants = [(search, pqID) for search in ["dijkstra", "astar"] for pqID in pqIDs]
+    settled = {v: np.zeros(niters) for v in variants}
+    comps = {v: np.zeros(niters) for v in variants}
+    i = 0
+    while i < niters:
+        source, target = np.random.choice(len(nodes), 2)
+        source, target = nodes[source], nodes[target]
+        h = heuristicValues(graph, target, coordinates=coordinates)
+        ranks = {"dijkstra": getFRanks(graph, source, target, heuristic=zero), "astar": getFRanks(graph, source, target, heuristic=h)}
+        distances = astarPQ(graph, source, target, heuristic=zero)[0]
+        if distances[target] == float('inf'):
+            continue
+        for search, pqID in variants:
+            predictions = getDecayPredictions(ranks[search], timesteps) if pqID in ["OSL", "DC"] else None
+            heuristic = h if search == "astar" else zero
+            distances, pq, numSettled = astarPQ(graph, source, target, predictions, pqID, "decay", heuristic=heuristic)
+            settled[(search, pqID)][i] = numSettled / n
+            comps[(search, pqID)][i] = pq.countComps / n
+        i += 1
+    mean = {}
+    std = {}
+    for search, pqID in variants:
+        v = (search, pqID)
+        print(f"{search} {pqID}: settled/n = {settled[v].mean():.3f}, comparisons/n = {comps[v].mean():.3f}")
+        mean[f"{search}_{pqID}_settled_{cityName}"] = [settled[v].mean()]
+        std[f"{search}_{pqID}_settled_{cityName}"] = [settled[v].std()]
+        mean[f"{search}_{pqID}_comps_{cityName}"] = [comps[v].mean()]
+        std[f"{search}_{pqID}_comps_{cityName}"] = [comps[v].std()]
+    filename = f"data_astar_{cityName}.json"
+    saveToFile(mean, std, filename)
+    return mean, std
+
+
+# Scaling on synthetic road-like graphs (no network access needed)
+#---------------------------------------------------------------------
+def testDijkstraScaling(kind="grid", nvals=[10**4, 10**5, 10**6], pqIDs=["OSL", "DC", "BH", "FH"], niters=10, seed=0):
+    # OSL and DC use decay predictions with n timesteps
+    predGenID = "decay"
+    m = len(nvals)-1
+    mean = {}
+    std = {}
+    for pqID in pqIDs:
+        expID = f"dijkstra_{pqID}_{predGenID}_{kind}"
+        mean[expID] = np.zeros(m+1, dtype="float")
+        std[expID] = np.zeros(m+1, dtype="float")
+    Ti = time()
+    for i in range(m+1):
+        graph, graphType = generateGraph(kind, nvals[i], seed)
+        print(f"\n{kind} graph: n = {graph.number_of_nodes()}, m = {graph.number_of_edges()}")
+        for pqID in pqIDs:
+            ti = time()
+            expID = f"dijkstra_{pqID}_{predGenID}_{kind}"
+            params = {'timesteps': graph.number_of_nodes()}
+            mean[expID][i],std[expID][i] = testDijkstra(graph, predGenID, params, pqID, niters, graphType)
+            print(f"- {pqID}: {mean[expID][i]:.3f} comparisons/n, time {time()-ti:.1f}")
+    print("\nTotal runtime = ", time()-Ti)
+    filename = f"data_dijkstra_scaling_{kind}.json"
+    saveToFile(mean, std, filename)
+
+
+# Parallel Δ-stepping vs sequential Dijkstra
+#---------------------------------------------------------------------
+def testDeltaStepping(kind="grid", n=10**6, workerCounts=[1, 2, 4, 8], pqIDs=["BH", "FH", "OSL"], niters=3, seed=0, delta=None):
+    # Runtime of Δ-stepping (BH buckets) for each number of workers, and comparisons/n of the bucket
+    # queue vs the queue of dijkstraPQ. OSL uses decay predictions with n timesteps.
+    from deltastepping import DeltaStepping
+    graph, graphType = generateGraph(kind, n, seed)
+    n = graph.number_of_nodes()
+    sources = []
+    for i in range(niters):
+        source, rankedNodes, numComps = chooseRandomSource(graph, graphType)
+        sources.append((source, getPredictions("decay", rankedNodes, {'timesteps': n}, graphType)))
+    mean = {}
+    std = {}
+    runtime = {}
+    for workers in workerCounts:
+        with DeltaStepping(graph, graphType, workers, delta) as solver:
+            times = np.zeros(niters)
+            for i, (source, predictions) in enumerate(sources):
+                ti = time()
+                solver.query(source)
+                times[i] = time() - ti
+            runtime[workers] = times
+            if workers == workerCounts[0]:
+                for pqID in pqIDs:
+                    comps = np.zeros(niters)
+                    relaxed = np.zeros(niters)
+                    for i, (source, predictions) in enumerate(sources):
+                        dist, pq = solver.query(source, predictions, pqID)
+                        comps[i] = pq.countComps / n
+                        relaxed[i] = solver.relaxed / n
+                    mean[f"deltastepping_{pqID}_comps_{kind}"] = [comps.mean()]
+                    std[f"deltastepping_{pqID}_comps_{kind}"] = [comps.std()]
+                    mean[f"deltastepping_{pqID}_relaxed_{kind}"] = [relaxed.mean()]
+                    std[f"deltastepping_{pqID}_relaxed_{kind}"] = [relaxed.std()]
+        speedup = runtime[workerCounts[0]].mean() / runtime[workers].mean()
+        mean[f"deltastepping_time_{workers}_{kind}"] = [runtime[workers].mean()]
+        std[f"deltastepping_time_{workers}_{kind}"] = [runtime[workers].std()]
+        print(f"{workers} workers: {runtime[workers].mean():.2f} s per query, speedup {speedup:.2f}")
+    for pqID in pqIDs:
+        comps = np.zeros(niters)
+        times = np.zeros(niters)
+        for i, (source, predictions) in enumerate(sources):
+            ti = time()
+            distances, pq = dijkstraPQ(graph, source, predictions if pqID == "OSL" else None, pqID=pqID, predGenID="decay", graphType=graphType)
+            times[i] = time() - ti
+            comps[i] = pq.countComps / n
+        mean[f"dijkstra_{pqID}_comps_{kind}"] = [comps.mean()]
+        std[f"dijkstra_{pqID}_comps_{kind}"] = [comps.std()]
+        mean[f"dijkstra_{pqID}_time_{kind}"] = [times.mean()]
+        std[f"dijkstra_{pqID}_time_{kind}"] = [times.std()]
+        print(f"{pqID}: comparisons/n = {comps.mean():.3f} (Dijkstra), {mean[f'deltastepping_{pqID}_comps_{kind}'][0]:.3f} (Δ-stepping, "
+              f"{mean[f'deltastepping_{pqID}_relaxed_{kind}'][0]:.2f} relaxations/n), Dijkstra runtime {times.mean():.2f} s")
+    filename = f"data_deltastepping_{kind}.json"
+    saveToFile(mean, std, filename)
+    return mean, std
+
+
 # Test Dijkstra's algorithm in any prediction model
 #---------------------------------------------------------------------
 def testDijkstraAlgorithm(cityName, predGenID, niters=50, m=20):
@@ -225,5 +576,7 @@ def testDijkstraAlgorithm(cityName, predGenID, niters=50, m=20):
         testDijkstraDecay(cityName, niters, m)
     elif predGenID == "sortedKeys":
         testDijkstraSortedKeys(cityName, niters, m)
+    elif predGenID == "landmarks":
+        testDijkstraLandmarks(cityName, niters)
     else:
-        raise ValueError("predGenID must be 'class', 'decay' or 'sortedKeys.")
\ No newline at end of file
+        raise ValueError("predGenID must be 'class', 'decay', 'sortedKeys' or 'landmarks'.")
\ No newline at end of file
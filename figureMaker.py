@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 from matplotlib.pyplot import figure
 from experiments import uploadFromFile
+from visualization import showSkipList
 import numpy as np
 
 
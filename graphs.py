@@ -0,0 +1,252 @@
+import numpy as np
+
+######################################################################
+# CSR graphs
+######################################################################
+# A CSRGraph stores the out-edges of node u in indices[indptr[u]:indptr[u+1]], with their
+# lengths in the same positions of the lengths array. Nodes are the integers 0..n-1.
+# It exposes the few networkx methods used by dijkstraPQ/testDijkstra (with graphType="csr"),
+# so that graphs with millions of nodes can be used without building networkx objects.
+
+class NodeView:
+    # Iterable and callable, like the graph.nodes attribute of networkx graphs
+    def __init__(self, n):
+        self.n = n
+
+    def __iter__(self):
+        return iter(range(self.n))
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, node):
+        return 0 <= node < self.n
+
+    def __call__(self):
+        return self
+
+
+class CSRGraph:
+
+    def __init__(self, indptr, indices, lengths, x=None, y=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.lengths = lengths
+        self.x = x
+        self.y = y
+        self.nodes = NodeView(len(indptr)-1)
+
+    @classmethod
+    def fromEdges(cls, n, src, dst, lengths, x=None, y=None):
+        # Removes self loops and keeps the shortest of parallel edges
+        keep = (src != dst)
+        src, dst, lengths = src[keep], dst[keep], lengths[keep]
+        order = np.lexsort((lengths, dst, src))
+        src, dst, lengths = src[order], dst[order], lengths[order]
+        first = np.ones(len(src), dtype=bool)
+        first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        src, dst, lengths = src[first], dst[first], lengths[first]
+        indptr = np.zeros(n+1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return cls(indptr, dst.astype(np.int32), lengths.astype(np.float32), x, y)
+
+    def number_of_nodes(self):
+        return len(self.indptr)-1
+
+    def number_of_edges(self):
+        return len(self.indices)
+
+    def is_directed(self):
+        return True
+
+    def neighbors(self, u):
+        a, b = self.indptr[u], self.indptr[u+1]
+        return self.indices[a:b], self.lengths[a:b]
+
+    def __getitem__(self, u):
+        # {neighbor: length}, the adjacency format used by dijkstraPQ with graphType="csr"
+        a, b = self.indptr[u], self.indptr[u+1]
+        return dict(zip(self.indices[a:b].tolist(), self.lengths[a:b].tolist()))
+
+    def edgeArrays(self):
+        src = np.repeat(np.arange(self.number_of_nodes(), dtype=np.int32), np.diff(self.indptr))
+        return src, self.indices, self.lengths
+
+    def reverse(self, copy=False):
+        src, dst, lengths = self.edgeArrays()
+        return CSRGraph.fromEdges(self.number_of_nodes(), dst, src, lengths, self.x, self.y)
+
+    def toNetworkx(self):
+        # MultiDiGraph with a "length" attribute on the edges, as returned by osmnx (graphType="city")
+        import networkx as nx
+        graph = nx.MultiDiGraph()
+        n = self.number_of_nodes()
+        if self.x is not None:
+            graph.add_nodes_from((u, {"x": float(self.x[u]), "y": float(self.y[u])}) for u in range(n))
+        else:
+            graph.add_nodes_from(range(n))
+        src, dst, lengths = self.edgeArrays()
+        graph.add_edges_from(zip(src.tolist(), dst.tolist(), ({"length": l} for l in lengths.tolist())))
+        return graph
+
+
+def toCSR(graph, graphType="city"):
+    # Converts a networkx graph, returns the CSR graph and the list of nodes (CSR node i = nodes[i])
+    if isinstance(graph, CSRGraph):
+        return graph, list(graph.nodes)
+    nodes = list(graph.nodes)
+    nodeIndex = {node: i for i, node in enumerate(nodes)}
+    src, dst, lengths = [], [], []
+    for u, neighbors in graph.adjacency():
+        for v, attributes in neighbors.items():
+            src.append(nodeIndex[u])
+            dst.append(nodeIndex[v])
+            if graphType == "city":
+                lengths.append(attributes[0]["length"])
+            elif graphType == "weighted":
+                lengths.append(attributes["weight"])
+            else:
+                lengths.append(0)
+    x = y = None
+    if len(nodes) > 0 and "x" in graph.nodes[nodes[0]]:
+        x = np.array([graph.nodes[node]["x"] for node in nodes])
+        y = np.array([graph.nodes[node]["y"] for node in nodes])
+    csr = CSRGraph.fromEdges(len(nodes), np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64),
+                             np.array(lengths, dtype=np.float64), x, y)
+    return csr, nodes
+
+
+
+######################################################################
+# Road-like graph generators
+######################################################################
+# All generators are seeded, place the nodes in the plane (in meters) and give each edge a length
+# at least equal to the Euclidean distance between its endpoints. Roads are two-way.
+
+def symmetricEdges(src, dst, lengths):
+    return np.concatenate([src, dst]), np.concatenate([dst, src]), np.concatenate([lengths, lengths])
+
+def euclideanLengths(x, y, src, dst, rng, detour=0.2):
+    # Roads are not straight: the length is the Euclidean distance times a random detour factor
+    d = np.hypot(x[src]-x[dst], y[src]-y[dst])
+    return d * (1 + detour*rng.random(len(src)))
+
+
+# Perturbed grid
+#---------------
+# The nodes fill a rows x cols grid row by row, the last row being partial: the graph has exactly
+# n nodes.
+
+def gridCoordinates(n, rng, spacing, jitter):
+    rows = max(1, int(np.sqrt(n)))
+    cols = -(-n // rows)
+    r, c = np.divmod(np.arange(rows*cols), cols)
+    x = (c + jitter*(rng.random(rows*cols)-0.5)) * spacing
+    y = (r + jitter*(rng.random(rows*cols)-0.5)) * spacing
+    return rows, cols, x[:n], y[:n]
+
+def inGraph(src, dst, n):
+    # Drops the edges of the missing nodes of the last row
+    keep = (src < n) & (dst < n)
+    return src[keep], dst[keep]
+
+def gridEdges(rows, cols, n, rng, dropRate):
+    nodes = np.arange(rows*cols).reshape(rows, cols)
+    src = np.concatenate([nodes[:, :-1].ravel(), nodes[:-1, :].ravel()])
+    dst = np.concatenate([nodes[:, 1:].ravel(), nodes[1:, :].ravel()])
+    keep = rng.random(len(src)) >= dropRate
+    return inGraph(src[keep], dst[keep], n)
+
+def perturbedGridGraph(n, seed=0, spacing=100, jitter=0.4, dropRate=0.1):
+    rng = np.random.default_rng(seed)
+    rows, cols, x, y = gridCoordinates(n, rng, spacing, jitter)
+    src, dst = gridEdges(rows, cols, n, rng, dropRate)
+    lengths = euclideanLengths(x, y, src, dst, rng)
+    return CSRGraph.fromEdges(n, *symmetricEdges(src, dst, lengths), x, y)
+
+
+# Random geometric graph with k-NN edges
+#---------------------------------------
+
+def knnEdges(x, y, k, chunkSize=1<<16):
+    # Each point is linked to its k nearest neighbors among the points of the 3x3 surrounding
+    # cells of a grid with about k points per cell
+    n = len(x)
+    cellSize = np.sqrt(k * (x.max()-x.min()+1) * (y.max()-y.min()+1) / n)
+    gx = ((x-x.min()) / cellSize).astype(np.int64)
+    gy = ((y-y.min()) / cellSize).astype(np.int64)
+    ncx, ncy = gx.max()+1, gy.max()+1
+    cell = gx*ncy + gy
+    order = np.argsort(cell, kind="stable")
+    counts = np.bincount(cell, minlength=ncx*ncy)
+    start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    table = np.full((ncx*ncy, counts.max()), -1, dtype=np.int64)
+    table[cell[order], np.arange(n) - start[cell[order]]] = order
+    src, dst = [], []
+    for a in range(0, n, chunkSize):
+        points = np.arange(a, min(a+chunkSize, n))
+        candidates = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                cx, cy = gx[points]+dx, gy[points]+dy
+                inside = (cx >= 0) & (cx < ncx) & (cy >= 0) & (cy < ncy)
+                rowsCand = table[np.where(inside, cx*ncy + cy, 0)]
+                rowsCand[~inside] = -1
+                candidates.append(rowsCand)
+        candidates = np.concatenate(candidates, axis=1)
+        d2 = (x[candidates]-x[points, None])**2 + (y[candidates]-y[points, None])**2
+        d2[(candidates < 0) | (candidates == points[:, None])] = np.inf
+        kk = min(k, d2.shape[1]-1)
+        nearest = np.argpartition(d2, kk, axis=1)[:, :kk]
+        found = np.take_along_axis(d2, nearest, axis=1) < np.inf
+        src.append(np.repeat(points, kk)[found.ravel()])
+        dst.append(np.take_along_axis(candidates, nearest, axis=1)[found])
+    return np.concatenate(src), np.concatenate(dst)
+
+def geometricKNNGraph(n, k=4, seed=0, spacing=100):
+    rng = np.random.default_rng(seed)
+    side = np.sqrt(n) * spacing
+    x = rng.random(n) * side
+    y = rng.random(n) * side
+    src, dst = knnEdges(x, y, k)
+    lengths = euclideanLengths(x, y, src, dst, rng)
+    return CSRGraph.fromEdges(n, *symmetricEdges(src, dst, lengths), x, y)
+
+
+# Hierarchical highway overlay
+#-----------------------------
+
+def highwayGraph(n, seed=0, levels=2, stride=10, spacing=100, jitter=0.4, dropRate=0.1):
+    # Perturbed grid where, at each level l, the nodes on every (stride**l)-th row and column are
+    # also linked by nearly straight highways to the next such node of their row and column
+    rng = np.random.default_rng(seed)
+    rows, cols, x, y = gridCoordinates(n, rng, spacing, jitter)
+    src, dst = gridEdges(rows, cols, n, rng, dropRate)
+    lengths = euclideanLengths(x, y, src, dst, rng)
+    allSrc, allDst, allLengths = [src], [dst], [lengths]
+    nodes = np.arange(rows*cols).reshape(rows, cols)
+    for l in range(1, levels+1):
+        s = stride**l
+        hubs = nodes[::s, ::s]
+        hsrc = np.concatenate([hubs[:, :-1].ravel(), hubs[:-1, :].ravel()])
+        hdst = np.concatenate([hubs[:, 1:].ravel(), hubs[1:, :].ravel()])
+        hsrc, hdst = inGraph(hsrc, hdst, n)
+        allSrc.append(hsrc)
+        allDst.append(hdst)
+        allLengths.append(euclideanLengths(x, y, hsrc, hdst, rng, detour=0.05))
+    src, dst, lengths = np.concatenate(allSrc), np.concatenate(allDst), np.concatenate(allLengths)
+    return CSRGraph.fromEdges(n, *symmetricEdges(src, dst, lengths), x, y)
+
+
+graphGenerators = {
+    "grid": perturbedGridGraph,
+    "knn": geometricKNNGraph,
+    "highway": highwayGraph,
+}
+
+def generateGraph(kind, n, seed=0, csr=True, **params):
+    # Returns the graph and the graphType to pass to dijkstraPQ/testDijkstra
+    graph = graphGenerators[kind](n, seed=seed, **params)
+    if csr:
+        return graph, "csr"
+    return graph.toNetworkx(), "city"
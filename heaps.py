@@ -1,7 +1,6 @@
 import numpy as np
+import struct
 from time import time
-import matplotlib.pyplot as plt
-from matplotlib.pyplot import figure
 from sortedcontainers import SortedList
 
 
@@ -48,6 +47,12 @@ class FibonacciHeap:
     def isEmpty(self):
         return (self.total_num_elements == 0)
 
+    def reset(self):
+        self.root_list = None
+        self.min_node = None
+        self.total_num_elements = 0
+        self.countComps = 0
+
     # Iterate through the node list
     def iterate(self, head = None):
         if head is None:
@@ -111,6 +116,47 @@ class FibonacciHeap:
             self.min_node = self.find_min_node()
         return m.value
 
+    # Inserts a batch of keys: the singleton trees are melded into the root list, and the minimum
+    # of the batch is compared once with the current minimum. Returns the nodes.
+    def insert_many(self, keys, predictions=None):
+        nodes = []
+        batchMin = None
+        for key in keys:
+            node = self.Node(key)
+            node.left = node.right = node
+            self.meld_into_root_list(node)
+            nodes.append(node)
+            if batchMin is None:
+                batchMin = node
+            else:
+                self.countComps += 1
+                if node.value < batchMin.value:
+                    batchMin = node
+        if batchMin is not None:
+            if self.min_node is not None:
+                self.countComps += 1
+                if batchMin.value < self.min_node.value:
+                    self.min_node = batchMin
+            else:
+                self.min_node = batchMin
+        self.total_num_elements += len(nodes)
+        return nodes
+
+    # Inserts the value and extracts the minimum. If the value is not larger than the minimum, it is
+    # returned without modifying the heap (1 comparison); otherwise its singleton tree is melded
+    # without updating the minimum pointer, before extracting the minimum.
+    def pushpop(self, value):
+        if self.min_node is None:
+            return value
+        self.countComps += 1
+        if value <= self.min_node.value:
+            return value
+        node = self.Node(value)
+        node.left = node.right = node
+        self.meld_into_root_list(node)
+        self.total_num_elements += 1
+        return self.extractMin()
+
     # This operation works by taking the node, decreasing the key and if the heap property becomes violated (the new key 
     # is smaller than the key of the parent), the node is cut from its parent. If the parent is not a root, it is marked. 
     # If it has been marked already, it is cut as well and its parent is marked. We continue upwards until we reach either 
@@ -308,7 +354,7 @@ class FibonacciHeap:
 ######################################################################
 # Binary heap
 ######################################################################
-from heapq import heappush, heappop, heapify
+from heapq import heappush, heappop, heapify, heappushpop
 
 class BinaryHeap: 
       
@@ -320,6 +366,23 @@ class BinaryHeap:
     
     def isEmpty(self):
         return (len(self.heap) == 0)
+
+    def reset(self):
+        self.heap.clear()
+        self.n = 0
+        self.countComps = 0
+
+    # Builds a heap from a list of keys, which it takes over. A sorted list is already a heap (no
+    # comparisons), otherwise it is heapified, with at most 2 comparisons per element.
+    @classmethod
+    def fromList(cls, keys, isSorted=False):
+        pq = cls()
+        if not isSorted:
+            heapify(keys)
+            pq.countComps += 2*len(keys)
+        pq.heap = keys
+        pq.n = len(keys)
+        return pq
     
     def parent(self, i): 
         return (i-1)/2
@@ -329,7 +392,30 @@ class BinaryHeap:
         heappush(self.heap, k) 
         self.countComps += int(np.log2(int(np.log2(self.n+2))))
         self.n += 1          
+
+    # Inserts a batch of keys. A batch larger than the heap is added with heapify, which makes at
+    # most 2 comparisons per element.
+    def insert_many(self, keys, predictions=None):
+        if len(keys) > self.n:
+            self.heap.extend(keys)
+            heapify(self.heap)
+            self.n += len(keys)
+            self.countComps += 2*self.n
+        else:
+            for k in keys:
+                self.insert(k)
   
+    # Inserts k and extracts the minimum, with a single sift: heap[0] is replaced by k if it is
+    # larger, which costs 1 comparison when k is the minimum
+    def pushpop(self, k):
+        if self.n == 0:
+            return k
+        self.countComps += 1
+        if k <= self.heap[0]:
+            return k
+        self.countComps += int(np.log2(self.n))
+        return heappushpop(self.heap, k)
+
     # Decrease value of key at index 'i' to new_val 
     # It is assumed that new_val is smaller than heap[i] 
     def decreaseKey(self, i, new_val): 
@@ -355,6 +441,350 @@ class BinaryHeap:
     def getMin(self): 
         return self.heap[0] 
 
+######################################################################
+# Pairing heaps
+######################################################################
+# Both heaps return a node (a handle) from insert, to be passed to decrease_key. The nodes use
+# __slots__ and all passes over children or roots are iterative. countComps counts the key
+# comparisons of the links and of the minimum updates.
+
+# Pairing heap
+#-------------
+# A heap-ordered multiway tree: each node points to its first child, to its next sibling, and to
+# its previous sibling (or to its parent for a first child). extractMin links the children of the
+# root in pairs from left to right, then links the results from right to left (two-pass).
+
+class PairingHeap:
+
+    class Node:
+        __slots__ = ("value", "child", "sibling", "prev")
+        def __init__(self, value):
+            self.value = value
+            self.child = None
+            self.sibling = None
+            self.prev = None
+
+    def __init__(self):
+        self.root = None
+        self.n = 0
+        self.countComps = 0
+
+    def isEmpty(self):
+        return (self.n == 0)
+
+    def reset(self):
+        self.root = None
+        self.n = 0
+        self.countComps = 0
+
+    def find_minimum(self):
+        if self.root is None:
+            raise ValueError('Pairing heap is empty, minimum does not exist!')
+        return self.root.value
+
+    def link(self, a, b):
+        # Links two roots, returns the new root
+        self.countComps += 1
+        if b.value < a.value:
+            a, b = b, a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        b.prev = a
+        a.child = b
+        a.sibling = a.prev = None
+        return a
+
+    def insert(self, value):
+        node = self.Node(value)
+        self.root = node if self.root is None else self.link(self.root, node)
+        self.n += 1
+        return node
+
+    def extractMin(self):
+        root = self.root
+        if root is None:
+            raise ValueError('Pairing heap is empty, cannot extract mininum!')
+        # First pass: link the children in pairs, from left to right
+        pairs = []
+        child = root.child
+        while child is not None:
+            nextChild = child.sibling
+            if nextChild is None:
+                child.prev = child.sibling = None
+                pairs.append(child)
+                break
+            following = nextChild.sibling
+            pairs.append(self.link(child, nextChild))
+            child = following
+        # Second pass: link the pairs from right to left
+        newRoot = pairs.pop() if pairs else None
+        while pairs:
+            newRoot = self.link(pairs.pop(), newRoot)
+        self.root = newRoot
+        self.n -= 1
+        root.child = None
+        return root.value
+
+    def decrease_key(self, node, v):
+        if v > node.value:
+            raise ValueError("Cannot decrease key with a value greater than what it already is.")
+        node.value = v
+        if node is self.root:
+            return
+        # Cut the subtree of node and link it with the root
+        if node.prev.child is node:
+            node.prev.child = node.sibling
+        else:
+            node.prev.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.prev = node.prev
+        node.sibling = node.prev = None
+        self.root = self.link(self.root, node)
+
+
+# Rank-pairing heap
+#------------------
+# Type-2 rank-pairing heap (Haeupler, Sen and Tarjan, 2011): a list of half-ordered binary trees
+# (half trees), whose roots only have a left child. A node is smaller than all the nodes of its
+# left subtree. Ranks follow the type-2 rule: a node whose children have ranks r1 and r2 (-1 for a
+# missing child) has rank max(r1, r2) + 1 if |r1 - r2| <= 1, and max(r1, r2) otherwise, and a root
+# has rank r(left) + 1. extractMin links roots of equal rank in a single pass. decrease_key cuts
+# the subtree of the node, makes it a root and restores the rank rule on the path to its former
+# root, which is O(1) amortized.
+
+class RankPairingHeap:
+
+    class Node:
+        __slots__ = ("value", "left", "right", "parent", "rank")
+        def __init__(self, value):
+            self.value = value
+            self.left = None
+            self.right = None
+            self.parent = None
+            self.rank = 0
+
+    def __init__(self):
+        self.roots = []
+        self.min_node = None
+        self.n = 0
+        self.countComps = 0
+
+    def isEmpty(self):
+        return (self.n == 0)
+
+    def reset(self):
+        self.roots = []
+        self.min_node = None
+        self.n = 0
+        self.countComps = 0
+
+    def find_minimum(self):
+        if self.min_node is None:
+            raise ValueError('Rank-pairing heap is empty, minimum does not exist!')
+        return self.min_node.value
+
+    def addRoot(self, node):
+        self.roots.append(node)
+        if self.min_node is None:
+            self.min_node = node
+        else:
+            self.countComps += 1
+            if node.value < self.min_node.value:
+                self.min_node = node
+
+    def link(self, a, b):
+        # Links two half trees of equal rank, returns the new root
+        self.countComps += 1
+        if b.value < a.value:
+            a, b = b, a
+        b.right = a.left
+        if b.right is not None:
+            b.right.parent = b
+        b.parent = a
+        a.left = b
+        a.rank += 1
+        return a
+
+    def insert(self, value):
+        node = self.Node(value)
+        self.addRoot(node)
+        self.n += 1
+        return node
+
+    def extractMin(self):
+        m = self.min_node
+        if m is None:
+            raise ValueError('Rank-pairing heap is empty, cannot extract mininum!')
+        # The right spine of the left subtree of the minimum becomes a list of half trees
+        roots = [root for root in self.roots if root is not m]
+        node = m.left
+        while node is not None:
+            nextNode = node.right
+            node.right = node.parent = None
+            node.rank = node.left.rank + 1 if node.left is not None else 0
+            roots.append(node)
+            node = nextNode
+        m.left = None
+        # One pass: two half trees of equal rank are linked, and the result is not linked again
+        buckets = {}
+        self.roots = []
+        self.min_node = None
+        for root in roots:
+            other = buckets.pop(root.rank, None)
+            if other is None:
+                buckets[root.rank] = root
+            else:
+                self.addRoot(self.link(root, other))
+        for root in buckets.values():
+            self.addRoot(root)
+        self.n -= 1
+        return m.value
+
+    def decrease_key(self, node, v):
+        if v > node.value:
+            raise ValueError("Cannot decrease key with a value greater than what it already is.")
+        node.value = v
+        if node.parent is None:
+            if node is not self.min_node:
+                self.countComps += 1
+                if v < self.min_node.value:
+                    self.min_node = node
+            return
+        # The right subtree of node takes its place
+        parent = node.parent
+        if parent.left is node:
+            parent.left = node.right
+        else:
+            parent.right = node.right
+        if node.right is not None:
+            node.right.parent = parent
+        node.right = node.parent = None
+        node.rank = node.left.rank + 1 if node.left is not None else 0
+        self.addRoot(node)
+        # Type-2 rank rule on the path to the root
+        u = parent
+        while True:
+            if u.parent is None:
+                u.rank = u.left.rank + 1 if u.left is not None else 0
+                break
+            r1 = u.left.rank if u.left is not None else -1
+            r2 = u.right.rank if u.right is not None else -1
+            k = max(r1, r2) + 1 if abs(r1 - r2) <= 1 else max(r1, r2)
+            if k >= u.rank:
+                break
+            u.rank = k
+            u = u.parent
+
+
+######################################################################
+# Monotone priority queues
+######################################################################
+# In Dijkstra's algorithm, the extracted keys are non-decreasing. The following queues only
+# support such monotone sequences of operations: inserted keys must be at least the last
+# extracted key. Placing a key in a bucket uses bit operations or arithmetic, not comparisons,
+# so countComps only counts the comparisons made to find the minimum of a bucket.
+
+# Radix heap
+#-----------
+
+def floatToBits(key):
+    # For non-negative floats, the order of the IEEE 754 representations is the order of the keys
+    return struct.unpack('<Q', struct.pack('<d', key))[0]
+
+class RadixHeap:
+
+    def __init__(self):
+        # Bucket i contains the keys whose code differs from the last extracted one at bit i-1
+        self.buckets = [[] for i in range(65)]
+        self.last = 0
+        self.n = 0
+        self.countComps = 0
+
+    def reset(self):
+        for bucket in self.buckets:
+            bucket.clear()
+        self.last = 0
+        self.n = 0
+        self.countComps = 0
+
+    def isEmpty(self):
+        return (self.n == 0)
+
+    def insert(self, key):
+        code = floatToBits(float(key))
+        if code < self.last:
+            raise ValueError("Radix heap is monotone, cannot insert a key smaller than the last extracted one.")
+        self.buckets[(code ^ self.last).bit_length()].append((code, key))
+        self.n += 1
+
+    def extractMin(self):
+        if self.n == 0:
+            raise ValueError('Radix heap is empty, cannot extract mininum!')
+        if not self.buckets[0]:
+            i = 1
+            while not self.buckets[i]:
+                i += 1
+            bucket = self.buckets[i]
+            self.buckets[i] = []
+            self.countComps += len(bucket) - 1
+            self.last = min(bucket)[0]
+            for code, key in bucket:
+                self.buckets[(code ^ self.last).bit_length()].append((code, key))
+        self.n -= 1
+        return self.buckets[0].pop()[1]
+
+# Dial's bucket queue
+#--------------------
+
+class DialQueue:
+
+    def __init__(self, scale=1):
+        # A key is stored in the bucket int(key*scale), the buckets are scanned in increasing order
+        self.scale = scale
+        self.buckets = {}
+        self.cursor = 0
+        self.n = 0
+        self.countComps = 0
+
+    def reset(self):
+        self.buckets.clear()
+        self.cursor = 0
+        self.n = 0
+        self.countComps = 0
+
+    def isEmpty(self):
+        return (self.n == 0)
+
+    def insert(self, key):
+        index = int(key * self.scale)
+        if index < self.cursor:
+            raise ValueError("Dial queue is monotone, cannot insert a key smaller than the last extracted one.")
+        if index not in self.buckets:
+            self.buckets[index] = []
+        self.buckets[index].append(key)
+        self.n += 1
+
+    def extractMin(self):
+        if self.n == 0:
+            raise ValueError('Dial queue is empty, cannot extract mininum!')
+        while self.cursor not in self.buckets:
+            self.cursor += 1
+        bucket = self.buckets[self.cursor]
+        # Keys in the same bucket are not necessarily equal
+        iMin = 0
+        for i in range(1, len(bucket)):
+            self.countComps += 1
+            if bucket[i] < bucket[iMin]:
+                iMin = i
+        bucket[iMin], bucket[-1] = bucket[-1], bucket[iMin]
+        key = bucket.pop()
+        if not bucket:
+            del self.buckets[self.cursor]
+        self.n -= 1
+        return key
+
+
 def bHeapSort(arr):
     heap = BinaryHeap()
     for a in arr:
@@ -0,0 +1,103 @@
+import random
+import threading
+import itertools
+import numpy as np
+from sortedcontainers import SortedList
+from skiplist import SkipList, OnlineSL
+
+######################################################################
+# Sharded concurrent priority queue (MultiQueue)
+######################################################################
+# A relaxed priority queue made of numShards skip lists (OnlineSL or SkipList), each protected by
+# its own lock, for concurrent producers and consumers:
+# - insert routes the value to a random shard (routing="random") or to the shard of its predicted
+#   rank range (routing="rank", predicted ranks in [0, maxRank]),
+# - extractMin picks two random shards, reads their minimums without locking, and extracts from
+#   the one with the smaller minimum ("two-choice" pop).
+# extractMin does not always return the global minimum. With record=True, the operations are
+# logged with a global timestamp taken under the shard lock, and rankErrors replays the log to
+# measure how far the extractions are from the exact order.
+
+class MultiQueue:
+
+    def __init__(self, numShards=8, pqID="OSL", routing="random", maxRank=None, record=False):
+        if routing not in ["random", "rank"]:
+            raise ValueError("routing must be 'random' or 'rank'.")
+        if routing == "rank" and maxRank is None:
+            raise ValueError("routing='rank' requires maxRank.")
+        self.numShards = numShards
+        self.pqID = pqID
+        self.routing = routing
+        self.maxRank = maxRank
+        self.shards = [OnlineSL() if pqID == "OSL" else SkipList() for i in range(numShards)]
+        self.locks = [threading.Lock() for i in range(numShards)]
+        # Minimum of each shard (inf if empty), written under the lock of the shard
+        self.tops = [np.inf for i in range(numShards)]
+        # Comparisons of the two-choice pops, by shard
+        self.choiceComps = [0 for i in range(numShards)]
+        self.log = [] if record else None
+        self.clock = itertools.count()
+
+    @property
+    def countComps(self):
+        return sum(shard.countComps for shard in self.shards) + sum(self.choiceComps)
+
+    def isEmpty(self):
+        return all(top == np.inf for top in self.tops)
+
+    def shardOf(self, predictedRank):
+        if self.routing == "rank":
+            return min(max(predictedRank * self.numShards // (self.maxRank+1), 0), self.numShards-1)
+        return random.randrange(self.numShards)
+
+    def updateTop(self, i):
+        first = self.shards[i].sl.head.getNext(0) if self.pqID == "OSL" else self.shards[i].head.getNext(0)
+        self.tops[i] = first.value if first else np.inf
+
+    def insert(self, val, predictedRank=0):
+        i = self.shardOf(predictedRank)
+        with self.locks[i]:
+            if self.pqID == "OSL":
+                self.shards[i].insert(val, predictedRank)
+            else:
+                self.shards[i].insert(val)
+            self.updateTop(i)
+            if self.log is not None:
+                self.log.append((next(self.clock), True, val))
+
+    def extractMin(self):
+        # Returns None if all the shards are empty
+        while True:
+            i = random.randrange(self.numShards)
+            j = random.randrange(self.numShards)
+            compared = (i != j)
+            if compared and self.tops[j] < self.tops[i]:
+                i = j
+            if self.tops[i] == np.inf:
+                if self.isEmpty():
+                    return None
+                continue
+            with self.locks[i]:
+                # Another consumer may have emptied the shard
+                if self.shards[i].isEmpty():
+                    continue
+                self.choiceComps[i] += compared
+                val = self.shards[i].extractMin()
+                self.updateTop(i)
+                if self.log is not None:
+                    self.log.append((next(self.clock), False, val))
+                return val
+
+
+def rankErrors(log):
+    # Replays the log in timestamp order and returns, for each extraction, the number of values in
+    # the queue smaller than the extracted value (0 for an exact priority queue)
+    present = SortedList()
+    errors = []
+    for t, isInsert, val in sorted(log, key=lambda entry: entry[0]):
+        if isInsert:
+            present.add(val)
+        else:
+            errors.append(present.bisect_left(val))
+            present.remove(val)
+    return np.array(errors)
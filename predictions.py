@@ -1,4 +1,6 @@
+import sys
 import numpy as np
+from array import array
 
 # Class predictions
 #------------------
@@ -32,4 +34,53 @@ def decayPredictions(n,timesteps,rankedVals=None):
         i = toPerturb[t]
         pRanks[i] += bernoullis[t]
     predictions = [(pRanks[j],rankedVals[j]) for j in range(n)] # (prediction, true value)
-    return predictions
\ No newline at end of file
+    return predictions
+
+# Key predictions: CDF model
+#---------------------------
+# Replaces the SortedList of all the keys of a reference run (predGenID="sortedKeys"). The key
+# range is cut into numBins equal-width bins, and the model stores the number of reference keys
+# below each bin boundary. The predicted rank of a key is interpolated linearly inside its bin,
+# which is found by arithmetic: O(1) time and numBins+1 integers of memory. The counts are kept in
+# a single array.array, indexed directly by bisect_left and viewed without copy as a NumPy array by
+# predictRanks; nbytes is the size of this object.
+class KeyCDFModel:
+
+    def __init__(self, keys, numBins=1024):
+        keys = np.sort(np.asarray(keys, dtype=np.float64))
+        self.n = len(keys)
+        self.numBins = numBins
+        self.low = keys[0] if self.n else 0.0
+        high = keys[-1] if self.n else 1.0
+        self.scale = numBins / (high - self.low) if high > self.low else 0.0
+        boundaries = self.low + np.arange(numBins+1) / self.scale if self.scale else np.full(numBins+1, self.low)
+        cumulative = np.searchsorted(keys, boundaries, side="left").astype(np.int64)
+        cumulative[-1] = self.n
+        self.cumulative = array("q", cumulative.tobytes())
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self.cumulative)
+
+    def bisect_left(self, key):
+        # Predicted number of reference keys smaller than key, as SortedList.bisect_left
+        if self.scale == 0:
+            return 0 if key <= self.low else self.n
+        x = (key - self.low) * self.scale
+        if x <= 0:
+            return 0
+        if x >= self.numBins:
+            return self.n
+        b = int(x)
+        c = self.cumulative
+        return int(c[b] + (c[b+1] - c[b]) * (x - b))
+
+    def predictRanks(self, keys):
+        # Batch version of bisect_left
+        keys = np.asarray(keys, dtype=np.float64)
+        if self.scale == 0:
+            return np.where(keys <= self.low, 0, self.n)
+        x = np.clip((keys - self.low) * self.scale, 0, self.numBins)
+        b = np.minimum(x.astype(np.int64), self.numBins-1)
+        c = np.frombuffer(self.cumulative, dtype=np.int64)
+        return (c[b] + (c[b+1] - c[b]) * (x - b)).astype(np.int64)
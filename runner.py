@@ -0,0 +1,137 @@
+import numpy as np
+from time import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sorting import testSortAlgo, IDtoAlgo
+from dijkstra import testDijkstra, importCityGraph, noPredictionPQs
+from experiments import saveToFile, ResultsStore
+
+######################################################################
+# Parallel seeded experiment runner
+######################################################################
+# A sweep is split into independent (algorithm, parameter index, iteration) tasks. Each task seeds
+# the global NumPy random state (used by the prediction generators and the skip lists) with its
+# own child of a SeedSequence, identified by its spawn key rather than by the order in which the
+# tasks run. The results are aggregated in task order, so they are bit-identical for any number
+# of workers. Each result is logged in a ResultsStore as soon as it is computed, and the tasks
+# already logged are skipped, so an interrupted sweep can be resumed.
+
+# Parameter grids, as in experiments.py
+#---------------------------------------------------------------------
+def sortParamGrid(n, predGenID, m=20):
+    if predGenID == "class":
+        return [{'n':n, 'c':i*n//m} for i in range(m+1)]
+    if predGenID == "decay":
+        tsMax = int(n*np.sqrt(n))
+        return [{'n':n, 'timesteps':i*tsMax//m} for i in range(m+1)]
+    raise ValueError("predGenID must be 'class' or 'decay'.")
+
+def dijkstraParamGrid(n, predGenID, m=20):
+    if predGenID == "class":
+        return [{'c':i*n//m} for i in range(m+1)]
+    if predGenID == "decay":
+        tsMax = 20*n
+        return [{'timesteps':i*tsMax//m} for i in range(m+1)]
+    raise ValueError("predGenID must be 'class' or 'decay'.")
+
+
+# Tasks
+#---------------------------------------------------------------------
+workerGraph = {}
+
+def loadWorkerGraph(cityName):
+    if cityName not in workerGraph:
+        workerGraph[cityName] = importCityGraph(cityName)
+    return workerGraph[cityName]
+
+def taskSeed(seed, algoID, i, it):
+    algoKey = int.from_bytes(algoID.encode(), "little")
+    return np.random.SeedSequence(seed, spawn_key=(algoKey, i, it)).generate_state(4)
+
+def runTask(task):
+    # Returns the number of comparisons divided by n of a single iteration
+    experiment, cityName, algoID, params, predGenID, seedState = task
+    np.random.seed(seedState)
+    if experiment == "sort":
+        mean, std = testSortAlgo(algoID, dict(params), predGenID, niters=1)
+    else:
+        graph = loadWorkerGraph(cityName)
+        if algoID in noPredictionPQs:
+            mean, std = testDijkstra(graph, pqID=algoID, niters=1)
+        else:
+            mean, std = testDijkstra(graph, predGenID, dict(params), algoID, niters=1)
+    return mean
+
+def runTasks(tasks, onResult, workers=None, initializer=None, initargs=()):
+    # Calls onResult(k, result) as soon as the k-th task is done
+    if workers == 1:
+        if initializer is not None and len(tasks) > 0:
+            initializer(*initargs)
+        for k in range(len(tasks)):
+            onResult(k, runTask(tasks[k]))
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        futures = {pool.submit(runTask, tasks[k]): k for k in range(len(tasks))}
+        for future in as_completed(futures):
+            onResult(futures[future], future.result())
+
+
+# Sweeps
+#---------------------------------------------------------------------
+def runSweep(experiment, cityName, cells, predGenID, workers, seed, store, initializer=None, initargs=()):
+    # cells: list of (expID, algoID, paramGrid, constant, niters). The comparisons of a constant algorithm
+    # do not depend on the parameter, so only the first parameter is run and its results are replicated.
+    tasks = []
+    taskCells = []
+    allCells = []
+    for expID, algoID, grid, constant, niters in cells:
+        store.addSweep(expID, grid, constant, seed, niters)
+        for i in range(1 if constant else len(grid)):
+            for it in range(niters):
+                allCells.append((expID, i, it))
+                if not store.has(expID, i, it):
+                    taskCells.append((expID, i, it))
+                    tasks.append((experiment, cityName, algoID, grid[i], predGenID, taskSeed(seed, algoID, i, it)))
+    print(f"{len(tasks)} tasks to run, {len(allCells)-len(tasks)} already done")
+    def onResult(k, result):
+        store.add(*taskCells[k], result)
+    Ti = time()
+    runTasks(tasks, onResult, workers, initializer, initargs)
+    print("Total runtime = ", time()-Ti)
+    results = np.array([store.get(*cell) for cell in allCells])
+    mean = {}
+    std = {}
+    start = 0
+    for expID, algoID, grid, constant, niters in cells:
+        numParams = 1 if constant else len(grid)
+        values = results[start:start+numParams*niters].reshape(numParams, niters)
+        start += numParams*niters
+        mean[expID] = np.ones(len(grid))*values.mean(axis=1)
+        std[expID] = np.ones(len(grid))*values.std(axis=1)
+    return mean, std
+
+def runSortSweep(n, predGenID, algosToTest=IDtoAlgo, niters=30, m=20, workers=None, seed=0, save=True):
+    grid = sortParamGrid(n, predGenID, m)
+    cells = []
+    for algoID in sorted(algosToTest):
+        # BH is computed by a formula and FH sorts one random array, as in testSortAlgo
+        constant = algoID in ["BH", "FH"]
+        cells.append((f"{algoID}_{predGenID}_{n}", algoID, grid, constant, 1 if constant else niters))
+    filename = f"data_{predGenID}_{n}.json"
+    mean, std = runSweep("sort", None, cells, predGenID, workers, seed, ResultsStore(filename))
+    if save:
+        saveToFile(mean, std, filename)
+    return mean, std
+
+def runDijkstraSweep(cityName, predGenID, pqIDs=["OSL", "DC", "BH", "FH"], niters=50, m=20, workers=None, seed=0, save=True):
+    n = loadWorkerGraph(cityName).number_of_nodes()
+    grid = dijkstraParamGrid(n, predGenID, m)
+    cells = []
+    for pqID in pqIDs:
+        constant = pqID in noPredictionPQs
+        cells.append((f"dijkstra_{pqID}_{predGenID}_{cityName}", pqID, grid, constant, niters))
+    filename = f"data_dijkstra_{predGenID}_{cityName}.json"
+    store = ResultsStore(filename)
+    mean, std = runSweep("dijkstra", cityName, cells, predGenID, workers, seed, store, loadWorkerGraph, (cityName,))
+    if save:
+        saveToFile(mean, std, filename)
+    return mean, std
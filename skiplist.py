@@ -1,59 +1,11 @@
 import numpy as np
 from time import time
-import matplotlib.pyplot as plt
-from matplotlib.pyplot import figure
+from collections import Counter
 from sortedcontainers import SortedList
 
 ######################################################################
 # Helpers
 ######################################################################
-def constructLinks(heights):
-    H = np.max(heights)
-    levels = [[] for l in range(H)]
-    for l in range(0,H):
-        level = l+1
-        for x in range(len(heights)):
-            if heights[x] >= level:
-                levels[l].append(x)
-    return levels
-
-def showSkipList(vals, heights, u=1, r=0.5, arrow_head=0.3, scale=1):
-    # u = space between two elements
-    H = np.max(heights)
-    heights = [H] + list(heights) + [H]
-    fig = plt.figure(figsize=(scale*len(heights)*(1+u),scale*(H+r+1))) 
-    plt.axis('off')
-    levels = constructLinks(heights)
-    # Head/tail
-    #plt.fill_between([0,1],0,H,color="gold")
-    xnil = (len(heights)-1) * (1+u)
-    plt.fill_between([xnil,xnil+1],0,H,color="lightgrey")
-    plt.text(-0.1, -0.7, "HEAD", color="black", fontsize=scale*25)
-    plt.text(xnil+0.15, H/2-0.2, "NIL", color="black", fontsize=scale*25)
-    # heights
-    for i in range(len(heights)):
-        h = heights[i]
-        x = i*(1+u)
-        plt.plot([x,x,x+1,x+1,x], [0,h,h,0,0], c="black")
-        if i<len(heights)-1:
-            for j in range(1,h):
-                plt.plot([x,x+1],[j,j], c="black")
-        if i>0 and i<len(heights)-1:
-            plt.plot([x+0.5,x+0.5], [0,-r], c="black")
-            plt.plot([x,x,x+1,x+1,x], [-r,-r-1,-r-1,-r,-r], c="black")
-            plt.fill_between([x,x+1],-r-1,-r,color="gold")
-            plt.text(x+0.15 + 0.15*(vals[i-1]<10), -r-1/2-0.1, vals[i-1], color="black", fontsize=scale*30)
-    # arrows
-    for i in range(len(levels)):
-        h = i+0.5
-        level = levels[i]
-        for j in range(len(level)-1):
-            x1 = level[j]*(1+u)+0.5
-            x2 = level[j+1]*(1+u) - arrow_head
-            #plt.plot([x1,x2],[h,h], c="black")
-            plt.arrow(x1, h, x2-x1, 0.0, color='black', head_length=arrow_head, head_width=0.2)
-            plt.scatter([x1],[h], s=scale*100, color="black")
-
 class Node:
     
     def __init__(self, value=None, height=1):
@@ -93,6 +45,77 @@ def damagedCompare(val1, val2, dr=0.25):
 
 
 
+######################################################################
+# Prediction error estimator
+######################################################################
+
+# Streaming estimate of the displacement between the position given by a prediction (the source
+# node of an exponential search) and the actual insertion position. The skip list does not store
+# ranks: a hop at level h is counted as 1<<h positions, its expected span for p=0.5, so the
+# displacement is approximated from the pointer hops of the search without scanning level 0.
+# Displacements are grouped in logarithmic buckets (bucket b holds [2^(b-1), 2^b), bucket 0 holds
+# 0), and each record costs O(1). It is off by default: CountingSkipList(trackErrors=True), or
+# OnlineSL(trackErrors=True), records every exponential search in skipList.errors (None otherwise).
+
+class PredictionErrorEstimator:
+
+    def __init__(self, numBuckets=64):
+        self.counts = [0 for b in range(numBuckets)]
+        self.bucketComps = [0 for b in range(numBuckets)]
+        self.count = 0
+        self.total = 0
+        self.totalComps = 0
+
+    def reset(self):
+        for b in range(len(self.counts)):
+            self.counts[b] = 0
+            self.bucketComps[b] = 0
+        self.count = 0
+        self.total = 0
+        self.totalComps = 0
+
+    def record(self, displacement, comps):
+        b = min(displacement.bit_length(), len(self.counts)-1)
+        self.counts[b] += 1
+        self.bucketComps[b] += comps
+        self.count += 1
+        self.total += displacement
+        self.totalComps += comps
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def meanComps(self):
+        return self.totalComps / self.count if self.count else 0
+
+    def quantile(self, q):
+        # Linear interpolation inside the bucket containing the q-quantile
+        if self.count == 0:
+            return 0
+        target = q * self.count
+        cumulated = 0
+        for b in range(len(self.counts)):
+            if self.counts[b] > 0 and cumulated + self.counts[b] >= target:
+                if b == 0:
+                    return 0
+                low = 1 << (b-1)
+                return low + low * (target - cumulated) / self.counts[b]
+            cumulated += self.counts[b]
+        return 1 << (len(self.counts)-1)
+
+    def curve(self):
+        # Error vs comparisons: [(lowest displacement of the bucket, #searches, mean comparisons)]
+        return [((1 << (b-1)) if b > 0 else 0, self.counts[b], self.bucketComps[b] / self.counts[b])
+                for b in range(len(self.counts)) if self.counts[b] > 0]
+
+    def getStats(self, quantiles=(0.5, 0.9, 0.99)):
+        # Can be saved as JSON
+        return {"count": self.count, "mean": self.mean(), "meanComps": self.meanComps(),
+                "quantiles": {str(q): self.quantile(q) for q in quantiles},
+                "curve": [list(point) for point in self.curve()]}
+
+
+
 ######################################################################
 # Skip list
 ######################################################################
@@ -100,7 +123,7 @@ def damagedCompare(val1, val2, dr=0.25):
 class SkipList:
     # The tail is None
     # The head is node with value = "head"
-    def __init__(self, p=0.5, dcompare=damagedCompare):
+    def __init__(self, p=0.5, dcompare=damagedCompare, recycleNodes=False, comparator=None):
         self.p = p
         self.head = Node(-np.inf)
         self.maxHeight = 0
@@ -108,7 +131,30 @@ class SkipList:
         self.countComps = 0
         self.countDirtyComps = 0
         self.nodes = {}
+        # Number of values (self.nodes only has one entry per distinct value)
+        self.size = 0
         self.dirtyCompare = dcompare
+        # Deleted nodes, by height, reused by the next insertions
+        self.pool = {} if recycleNodes else None
+        # Prediction errors of the exponential searches, see CountingSkipList
+        self.errors = None
+        # Clean comparisons by a comparator (see comparators.py), which may prefetch the
+        # comparisons of the exponential searches
+        self.comparator = comparator
+        if comparator is not None:
+            self.cleanCompare = comparator
+        self.prefetch = getattr(comparator, "prefetch", None)
+    
+    def reset(self):
+        # Empties the skip list, keeping the head and the pool of nodes
+        self.head.next = [None for h in range(self.head.height)]
+        self.nodes.clear()
+        self.size = 0
+        self.countComps = 0
+        self.countDirtyComps = 0
+    
+    def __len__(self):
+        return self.size
     
     def isEmpty(self):
         return (self.head.getNext() == None)
@@ -143,7 +189,11 @@ class SkipList:
     def insertNextTo(self, value, prevNode):
         # create the new node
         newHeight = self.sampleHeight()
-        newNode = Node(value, newHeight)
+        if self.pool and self.pool.get(newHeight):
+            newNode = self.pool[newHeight].pop()
+            newNode.value = value
+        else:
+            newNode = Node(value, newHeight)
         self.nodes[value] = newNode
         self.updateHeadHeight(newNode)
         # Add it in all the levels h<newHeight
@@ -154,6 +204,7 @@ class SkipList:
             successor = predecessor.getNext(h)
             predecessor.setNext(newNode, h)
             newNode.setNext(successor, h)
+        self.size += 1
         return newNode
     
     def delete(self, node):
@@ -162,8 +213,22 @@ class SkipList:
             predecessor = node.getPrev(h)
             successor = node.getNext(h)
             predecessor.setNext(successor,h)
+        self.size -= 1
+        self.unindex(node)
+        if self.pool is not None:
+            if node.height not in self.pool:
+                self.pool[node.height] = []
+            self.pool[node.height].append(node)
         return node
     
+    def unindex(self, node):
+        # The value must point to a live node with the same value, if any (the node may be reused)
+        if self.nodes.get(node.value) is node:
+            del self.nodes[node.value]
+            for neighbor in [node.getPrev(0), node.getNext(0)]:
+                if neighbor and neighbor.value == node.value:
+                    self.nodes[node.value] = neighbor
+    
     # Search
     #--------------------
     def findPredecessor(self, value, dirty=False):
@@ -199,7 +264,31 @@ class SkipList:
             h = h-1
         return curr.getPrev()
     
+    def gallopPairs(self, sourceNode, value, depth):
+        # Comparisons of the first depth hops of the gallops to the right and to the left
+        pairs = []
+        if sourceNode.getNext():
+            pairs.append((sourceNode.getNext().value, value))
+        if sourceNode.value != -np.inf:
+            pairs.append((sourceNode.value, value))
+        curr = sourceNode
+        for i in range(depth):
+            curr = curr.getNext(curr.height-1)
+            if curr is None:
+                break
+            pairs.append((curr.value, value))
+        curr = sourceNode
+        for i in range(depth):
+            if curr.value == -np.inf:
+                break
+            curr = curr.getPrev(curr.height-1)
+            if curr.value != -np.inf:
+                pairs.append((curr.value, value))
+        return pairs
+
     def exponentialSearch(self, sourceNode, value):
+        if self.prefetch is not None:
+            self.prefetch(self.gallopPairs(sourceNode, value, self.comparator.depth))
         goRight = (sourceNode.getNext() and self.compare(sourceNode.getNext().value, value) < 0)
         goLeft = (self.compare(sourceNode.value, value) > 0)
         if goRight:
@@ -228,6 +317,29 @@ class SkipList:
         return self.insertNextTo(value, predecessor)
         
     
+    def insert_many(self, values, predictions=None):
+        # Inserts the batch in one left-to-right sweep: each value is found by an exponential
+        # search from the previous one, O(k log(n/k)) comparisons instead of O(k log n). With
+        # predictions (a predicted rank per value), the batch is swept in increasing order of
+        # predicted rank, which costs no comparisons, and a value misplaced by its prediction is
+        # found by a search to the left. Otherwise the batch is sorted, counted as k*log2(k)
+        # comparisons. Returns the new nodes, in the order of values.
+        newNodes = [None for i in range(len(values))]
+        finger = self.head
+        if predictions is not None:
+            for i in sorted(range(len(values)), key=predictions.__getitem__):
+                finger = self.insertNextTo(values[i], self.exponentialSearch(finger, values[i]))
+                newNodes[i] = finger
+            return newNodes
+        self.countComps += int(len(values) * np.log2(len(values))) if len(values) else 0
+        for i in sorted(range(len(values)), key=values.__getitem__):
+            # The search starts from the successor, already compared
+            if finger.getNext(0) and self.compare(finger.getNext(0).value, values[i]) <= 0:
+                finger = self.rightExponentialSearch(finger.getNext(0), values[i])
+            finger = self.insertNextTo(values[i], finger)
+            newNodes[i] = finger
+        return newNodes
+
     def findMin(self):
         return self.head.getNext()
     
@@ -235,9 +347,156 @@ class SkipList:
         minNode = self.findMin()
         return self.delete(minNode).value
         
+    def pushpop(self, value):
+        # Inserts the value and extracts the minimum, with one search from the head
+        predecessor = self.findPredecessor(value)
+        if predecessor is self.head:
+            return value
+        return self.replaceMin(value, predecessor)
+
+    def replaceMin(self, value, predecessor):
+        # Inserts the value after its predecessor (not the head) and extracts the minimum. When the
+        # predecessor is the minimum, its node is reused for the value: no pointer changes.
+        first = self.head.getNext(0)
+        minValue = first.value
+        if predecessor is first:
+            self.unindex(first)
+            first.value = value
+            self.nodes[value] = first
+        else:
+            self.insertNextTo(value, predecessor)
+            self.delete(first)
+        return minValue
+
+    def updateKey(self, node, newValue):
+        # Moves the node to newValue (smaller or larger) by an exponential search from its
+        # predecessor, in O(log d) comparisons for a move of d positions. Returns the new node.
+        predecessor = node.getPrev(0)
+        self.delete(node)
+        predecessor = self.exponentialSearch(predecessor, newValue)
+        return self.insertNextTo(newValue, predecessor)
+
     def decreaseKey(self, value, newValue):
-        return
+        if newValue > value:
+            raise ValueError("Cannot decrease key with a value greater than what it already is.")
+        return self.updateKey(self.nodes[value], newValue)
     
+    # Split and join
+    #--------------------------
+    # The pointers are moved in O(log n) expected time. The value -> node index (self.nodes) is
+    # updated by moving the entries of the smaller part, in O(min) dictionary operations.
+    def clear(self):
+        # Forgets all the nodes, which may now belong to another skip list
+        self.head = Node(-np.inf)
+        self.maxHeight = 0
+        self.nodes = {}
+        self.size = 0
+
+    def adopt(self, other):
+        # Takes the nodes of other, which is cleared
+        self.head, self.maxHeight, self.nodes, self.size = other.head, other.maxHeight, other.nodes, other.size
+        other.clear()
+
+    def lastNodes(self):
+        # Last node of each level, without comparisons
+        lasts = [None for h in range(self.head.height)]
+        curr = self.head
+        for h in range(self.head.height-1, -1, -1):
+            while curr.getNext(h):
+                curr = curr.getNext(h)
+            lasts[h] = curr
+        return lasts
+
+    def moveIndex(self, nodes, other):
+        # Moves the entries of the given nodes from self.nodes to other.nodes
+        for node in nodes:
+            if node.value in self.nodes:
+                other.nodes[node.value] = self.nodes.pop(node.value)
+
+    def cut(self, predecessors, right):
+        # Moves the nodes after predecessors[h] (at each level h) to the empty skip list right
+        right.updateHeadHeight(self.head)
+        for h in range(self.head.height):
+            successor = predecessors[h].getNext(h)
+            predecessors[h].next[h] = None
+            right.head.setNext(successor, h)
+
+    def split(self, key):
+        # Keeps the values <= key and returns a skip list with the values > key
+        predecessors = [None for h in range(self.head.height)]
+        curr = self.head
+        for h in range(self.head.height-1, -1, -1):
+            while curr.getNext(h) and self.compare(curr.getNext(h).value, key) <= 0:
+                curr = curr.getNext(h)
+            predecessors[h] = curr
+        right = self.emptyCopy()
+        # Walks both parts until the smaller one ends
+        leftNodes, rightNodes = [], []
+        leftNode, rightNode = predecessors[0], predecessors[0].getNext(0)
+        while leftNode is not self.head and rightNode:
+            leftNodes.append(leftNode)
+            rightNodes.append(rightNode)
+            leftNode, rightNode = leftNode.getPrev(0), rightNode.getNext(0)
+        self.cut(predecessors, right)
+        if rightNode is None:
+            self.moveIndex(rightNodes, right)
+            right.size = len(rightNodes)
+            self.size -= right.size
+        else:
+            right.nodes, self.nodes = self.nodes, right.nodes
+            right.moveIndex(leftNodes, self)
+            right.size = self.size - len(leftNodes)
+            self.size = len(leftNodes)
+        return right
+
+    def emptyCopy(self):
+        # Empty skip list with the same parameters
+        return type(self)(self.p, self.dirtyCompare, self.pool is not None, comparator=self.comparator)
+
+    def concatenate(self, other):
+        # Appends the nodes of other, whose values are all >= the values of self, and clears other
+        lasts = self.lastNodes()
+        self.updateHeadHeight(other.head)
+        lasts += [self.head for h in range(len(lasts), self.head.height)]
+        for h in range(other.head.height):
+            lasts[h].setNext(other.head.getNext(h), h)
+        if self.size < other.size:
+            self.nodes, other.nodes = other.nodes, self.nodes
+        self.nodes.update(other.nodes)
+        self.size += other.size
+        other.clear()
+
+    def join(self, other):
+        # Moves the values of other into self. Without overlap, the lists are concatenated after
+        # 2 comparisons. Otherwise the values of the smaller list are inserted in the larger one
+        # in increasing order, each by an exponential search from the previous one.
+        if other.isEmpty():
+            return
+        if self.isEmpty():
+            self.adopt(other)
+            return
+        first, otherFirst = self.head.getNext(0), other.head.getNext(0)
+        if self.compare(self.lastNodes()[0].value, otherFirst.value) <= 0:
+            self.concatenate(other)
+        elif self.compare(other.lastNodes()[0].value, first.value) <= 0:
+            other.concatenate(self)
+            self.adopt(other)
+        else:
+            large, small = (self, other) if self.size >= other.size else (other, self)
+            comps = large.countComps
+            finger = large.head
+            node = small.head.getNext(0)
+            while node:
+                if finger.getNext(0) and large.compare(finger.getNext(0).value, node.value) <= 0:
+                    finger = large.rightExponentialSearch(finger.getNext(0), node.value)
+                finger = large.insertNextTo(node.value, finger)
+                node = node.getNext(0)
+            if large is other:
+                self.countComps += other.countComps - comps
+                self.adopt(other)
+            else:
+                other.clear()
+
     def getValsHeights(self):
         vals = []
         heights = []
@@ -249,6 +508,7 @@ class SkipList:
         return vals, heights
     
     def show(self):
+        from visualization import showSkipList
         vals, heights = self.getValsHeights()
         showSkipList(vals, heights)
     
@@ -256,6 +516,291 @@ class SkipList:
         vals, heights = self.getValsHeights()
         return str(vals)
 
+######################################################################
+# Counting skip list
+######################################################################
+
+# Same searches as SkipList, which also leave their pointer hops in searchHops, the levels climbed
+# by the exponential searches in searchClimbed, and the approximate number of positions between
+# the source and the result of the exponential searches in searchSpan. With trackErrors, every
+# exponential search is recorded in self.errors (a PredictionErrorEstimator). The counting is only
+# paid by this class and InstrumentedSkipList: the searches of SkipList are left untouched.
+
+class CountingSkipList(SkipList):
+
+    def __init__(self, *args, trackErrors=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.searchHops = 0
+        self.searchClimbed = 0
+        self.searchSpan = 0
+        self.errors = PredictionErrorEstimator() if trackErrors else None
+
+    def reset(self):
+        super().reset()
+        if self.errors is not None:
+            self.errors.reset()
+
+    def emptyCopy(self):
+        return type(self)(self.p, self.dirtyCompare, self.pool is not None, comparator=self.comparator,
+                          trackErrors=self.errors is not None)
+
+    def findPredecessor(self, value, dirty=False):
+        hops = 0
+        h = self.maxHeight
+        curr = self.head
+        while h >= 0:
+            while curr.getNext(h) and self.compare(curr.getNext(h).value, value, dirty) <= 0:
+                curr = curr.getNext(h)
+                hops += 1
+            h = h-1
+        self.searchHops = hops
+        return curr
+
+    def rightExponentialSearch(self, sourceNode, value):
+        curr = sourceNode
+        hops = span = 0
+        while curr.getNext(curr.height-1) and self.compare(curr.getNext(curr.height-1).value, value) <= 0:
+            span += 1 << (curr.height-1)
+            curr = curr.getNext(curr.height-1)
+            hops += 1
+        self.searchClimbed = curr.height - sourceNode.height
+        h = curr.height-1
+        while h >= 0:
+            while curr.getNext(h) and self.compare(curr.getNext(h).value, value) <= 0:
+                curr = curr.getNext(h)
+                span += 1 << h
+                hops += 1
+            h = h-1
+        self.searchHops, self.searchSpan = hops, span
+        return curr
+
+    def leftExponentialSearch(self, sourceNode, value):
+        curr = sourceNode
+        hops = span = 0
+        while self.compare(curr.getPrev(curr.height-1).value, value) >= 0:
+            span += 1 << (curr.height-1)
+            curr = curr.getPrev(curr.height-1)
+            hops += 1
+        self.searchClimbed = curr.height - sourceNode.height
+        h = curr.height-1
+        while h >= 0:
+            while self.compare(curr.getPrev(h).value, value) >= 0:
+                curr = curr.getPrev(h)
+                span += 1 << h
+                hops += 1
+            h = h-1
+        self.searchHops, self.searchSpan = hops, span
+        return curr.getPrev()
+
+    def exponentialSearch(self, sourceNode, value):
+        comps = self.countComps
+        self.searchSpan = 0
+        result = super().exponentialSearch(sourceNode, value)
+        if self.errors is not None:
+            self.errors.record(self.searchSpan, self.countComps - comps)
+        return result
+
+
+######################################################################
+# Instrumented skip list
+######################################################################
+
+# Records, for every call of the search methods, the pointer hops, the levels climbed or descended,
+# the clean and dirty comparisons, and for exponential searches the distance (number of positions)
+# between the source node and the result. Each quantity is stored as a histogram {value: #calls}.
+# The hop counts come from CountingSkipList: SkipList has no overhead when not instrumented.
+# Measuring the exact distance costs additional pointer hops (not comparisons) at level 0.
+
+class InstrumentedSkipList(CountingSkipList):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.histograms = {}
+
+    def resetStats(self):
+        self.histograms = {}
+
+    def record(self, method, **values):
+        for name, value in values.items():
+            key = f"{method}.{name}"
+            if key not in self.histograms:
+                self.histograms[key] = Counter()
+            self.histograms[key][value] += 1
+
+    def distance(self, leftNode, rightNode):
+        d = 0
+        while leftNode is not rightNode:
+            leftNode = leftNode.getNext(0)
+            d += 1
+        return d
+
+    def findPredecessor(self, value, dirty=False):
+        clean, dirtyComps = self.countComps, self.countDirtyComps
+        curr = super().findPredecessor(value, dirty)
+        self.record("findPredecessor", hops=self.searchHops, levels=self.maxHeight+1,
+                    cleanComps=self.countComps-clean, dirtyComps=self.countDirtyComps-dirtyComps)
+        return curr
+
+    def rightExponentialSearch(self, sourceNode, value):
+        clean = self.countComps
+        curr = super().rightExponentialSearch(sourceNode, value)
+        self.record("rightExponentialSearch", hops=self.searchHops, levelsClimbed=self.searchClimbed,
+                    cleanComps=self.countComps-clean, distance=self.distance(sourceNode, curr))
+        return curr
+
+    def leftExponentialSearch(self, sourceNode, value):
+        clean = self.countComps
+        result = super().leftExponentialSearch(sourceNode, value)
+        self.record("leftExponentialSearch", hops=self.searchHops, levelsClimbed=self.searchClimbed,
+                    cleanComps=self.countComps-clean, distance=self.distance(result, sourceNode))
+        return result
+
+    def exponentialSearch(self, sourceNode, value):
+        # Total cost, including the comparisons choosing the direction
+        clean = self.countComps
+        result = super().exponentialSearch(sourceNode, value)
+        self.record("exponentialSearch", cleanComps=self.countComps-clean)
+        return result
+
+    def getStats(self):
+        # {quantity: {"calls", "mean", "histogram"}}, can be saved as JSON
+        stats = {}
+        for key, histogram in self.histograms.items():
+            calls = sum(histogram.values())
+            total = sum(value*count for value, count in histogram.items())
+            stats[key] = {"calls": calls, "mean": total/calls,
+                          "histogram": {int(value): count for value, count in sorted(histogram.items())}}
+        return stats
+
+    def getMeanStd(self, prefix=""):
+        # Mean and standard deviation of each quantity, in the format of the experiment results (saveToFile)
+        mean = {}
+        std = {}
+        for key, histogram in self.histograms.items():
+            values = np.array(list(histogram.keys()), dtype=float)
+            counts = np.array(list(histogram.values()), dtype=float)
+            m = np.average(values, weights=counts)
+            mean[prefix+key] = np.array([m])
+            std[prefix+key] = np.array([np.sqrt(np.average((values-m)**2, weights=counts))])
+        return mean, std
+
+
+######################################################################
+# Indexable skip list
+######################################################################
+
+# Each node also stores, for every level h, the span of its pointer next[h]: the number of level-0
+# steps it skips. A pointer to the tail (None) skips up to the position size+1. The head is at
+# position 0, and rank(node) = position-1 is the number of values before the node.
+# The spans are updated by insertNextTo and delete (thus extractMin) in O(log n) expected time,
+# which gives rank, select and insertAtRank in O(log n) expected time without scanning level 0.
+
+class IndexableSkipList(SkipList):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.head.span = [1 for h in range(self.head.height)]
+
+    def reset(self):
+        super().reset()
+        self.head.span = [1 for h in range(self.head.height)]
+
+    def updateHeadHeight(self, newNode):
+        # The new pointers of the head point to the tail
+        if self.head.height < newNode.height:
+            self.head.span += [self.size+1 for h in range(newNode.height - self.head.height)]
+        super().updateHeadHeight(newNode)
+
+    def insertNextTo(self, value, prevNode):
+        newNode = super().insertNextTo(value, prevNode)
+        if getattr(newNode, "span", None) is None or len(newNode.span) != newNode.height:
+            newNode.span = [0 for h in range(newNode.height)]
+        # d = position of newNode - position of predecessor (at level h)
+        predecessor = newNode.getPrev(0)
+        d = 1
+        for h in range(self.head.height):
+            while h >= predecessor.height:
+                predecessor = predecessor.getPrev(h-1)
+                d += predecessor.span[h-1]
+            if h < newNode.height:
+                newNode.span[h] = predecessor.span[h] + 1 - d
+                predecessor.span[h] = d
+            else:
+                predecessor.span[h] += 1
+        return newNode
+
+    def delete(self, node):
+        predecessor = node
+        for h in range(self.head.height):
+            if h < node.height:
+                predecessor = node.getPrev(h)
+                predecessor.span[h] += node.span[h] - 1
+            else:
+                while h >= predecessor.height:
+                    predecessor = predecessor.getPrev(h-1)
+                predecessor.span[h] -= 1
+        return super().delete(node)
+
+    def clear(self):
+        super().clear()
+        self.head.span = [1]
+
+    def cut(self, predecessors, right):
+        # positions[h] = position of predecessors[h]
+        positions = [self.rank(node)+1 for node in predecessors]
+        k = positions[0]
+        right.updateHeadHeight(self.head)
+        for h in range(self.head.height):
+            right.head.span[h] = positions[h] + predecessors[h].span[h] - k
+            predecessors[h].span[h] = k+1 - positions[h]
+        super().cut(predecessors, right)
+
+    def concatenate(self, other):
+        self.updateHeadHeight(other.head)
+        lasts = self.lastNodes()
+        for h in range(self.head.height):
+            if h < other.head.height:
+                lasts[h].span[h] += other.head.span[h] - 1
+            else:
+                lasts[h].span[h] += other.size
+        super().concatenate(other)
+
+    def rank(self, node):
+        # Number of values before the node, climbing back to the head
+        position = 0
+        while node is not self.head:
+            predecessor = node.getPrev(node.height-1)
+            position += predecessor.span[node.height-1]
+            node = predecessor
+        return position-1
+
+    def select(self, k):
+        # Node of rank k (0 <= k < size)
+        if not 0 <= k < self.size:
+            raise IndexError(f"rank {k} out of range for a skip list of size {self.size}")
+        curr = self.head
+        position = 0
+        h = self.head.height-1
+        while h >= 0:
+            while curr.getNext(h) and position + curr.span[h] <= k+1:
+                position += curr.span[h]
+                curr = curr.getNext(h)
+            h = h-1
+        return curr
+
+    def insertAtRank(self, value, k):
+        # Inserts the value so that its rank is k, without comparisons: the caller keeps the values sorted
+        if not 0 <= k <= self.size:
+            raise IndexError(f"rank {k} out of range for a skip list of size {self.size}")
+        prevNode = self.head if k == 0 else self.select(k-1)
+        return self.insertNextTo(value, prevNode)
+
+
+class CountingIndexableSkipList(IndexableSkipList, CountingSkipList):
+    # Indexable skip list whose searches are counted (OnlineSL(indexable=True, trackErrors=True))
+    pass
+
+
 def skipListSort(arr):
     sl = SkipList()
     for a in arr:
@@ -280,30 +825,141 @@ def skipListSort(arr):
 # as it provides the required functionalities of a vEB tree
 
 class OnlineSL:
-    def __init__(self):
-        self.sl = SkipList()
+    def __init__(self, recycleNodes=False, instrumented=False, indexable=False, trackErrors=False):
+        # An indexable skip list gives the actual ranks of the values, see rank()
+        if instrumented and indexable:
+            raise ValueError("OnlineSL cannot be both instrumented and indexable.")
+        # The searches are only counted when needed, see CountingSkipList
+        if instrumented:
+            self.sl = InstrumentedSkipList(recycleNodes=recycleNodes, trackErrors=trackErrors)
+        elif indexable and trackErrors:
+            self.sl = CountingIndexableSkipList(recycleNodes=recycleNodes, trackErrors=True)
+        elif indexable:
+            self.sl = IndexableSkipList(recycleNodes=recycleNodes)
+        elif trackErrors:
+            self.sl = CountingSkipList(recycleNodes=recycleNodes, trackErrors=True)
+        else:
+            self.sl = SkipList(recycleNodes=recycleNodes)
         self.rankVal = {}
         self.valRank = {}
         self.veb = SortedList()
         self.veb.add(-np.inf)
         self.rankVal[-np.inf] = [-np.inf]
         self.countComps = 0
+        # Displacement between the predicted and the actual position of the inserted values (with trackErrors)
+        self.errors = self.sl.errors
 
     def isEmpty(self):
         return self.sl.isEmpty()
+
+    def rank(self, node):
+        # Actual rank of a node returned by insert (number of values before it)
+        if not isinstance(self.sl, IndexableSkipList):
+            raise ValueError("rank requires OnlineSL(indexable=True).")
+        return self.sl.rank(node)
+
+    def select(self, k):
+        # Value of actual rank k
+        if not isinstance(self.sl, IndexableSkipList):
+            raise ValueError("select requires OnlineSL(indexable=True).")
+        return self.sl.select(k).value
+
+    def reset(self):
+        self.sl.reset()
+        self.rankVal.clear()
+        self.valRank.clear()
+        self.veb.clear()
+        self.veb.add(-np.inf)
+        self.rankVal[-np.inf] = [-np.inf]
+        self.countComps = 0
     
     def getPredecessor(self, sortedArr, target):
         index = sortedArr.bisect_left(target)
         index = max(index-1,0)
         return sortedArr[index]
         
-    def insert(self,val,predictedRank=0):
+    def finger(self, predictedRank):
+        # Node of the last value whose predicted rank is the largest one smaller than predictedRank
         prevRank = self.getPredecessor(self.veb, predictedRank)
         prevVal = self.rankVal[prevRank][-1]
-        source = self.sl.head
-        if prevVal != -np.inf:
-            source = self.sl.nodes[prevVal]
-        source = self.sl.insertES(source, val)
+        if prevVal == -np.inf:
+            return self.sl.head
+        return self.sl.nodes[prevVal]
+
+    def insert(self,val,predictedRank=0):
+        # inserts the value and returns the new node
+        node = self.sl.insertES(self.finger(predictedRank), val)
+        self.addRank(val, predictedRank)
+        self.countComps = self.sl.countComps
+        return node
+
+    def predecessorRanks(self, ranks):
+        # For sorted ranks, the largest indexed predicted rank smaller than each of them. One merged
+        # pass over the index between the first and the last rank, or a bisection per rank when
+        # this part of the index is much larger than the batch.
+        lo = self.veb.bisect_left(ranks[0])
+        hi = self.veb.bisect_left(ranks[-1])
+        if hi - lo > len(ranks) * np.log2(len(self.veb) + 1):
+            return [self.getPredecessor(self.veb, r) for r in ranks]
+        predecessors = []
+        previous = self.veb[lo-1]
+        following = self.veb.islice(lo, hi)
+        candidate = next(following, None)
+        for r in ranks:
+            while candidate is not None and candidate < r:
+                previous = candidate
+                candidate = next(following, None)
+            predecessors.append(previous)
+        return predecessors
+
+    def insert_batch(self, vals, predictedRanks):
+        # Inserts the batch in increasing order of predicted rank, in one left-to-right sweep. As
+        # with insert, the finger of each value is the last value with the largest predicted rank
+        # smaller than its own: the last value of the batch with a smaller rank (smallerNode), unless
+        # the largest smaller rank of the queue (found by predecessorRanks) is larger. The batch
+        # makes the comparisons of inserting its values one by one in this order, and none to order
+        # the batch. Returns the new nodes, in the order of vals.
+        if len(vals) == 0:
+            return []
+        order = sorted(range(len(vals)), key=predictedRanks.__getitem__)
+        ranks = [predictedRanks[i] for i in order]
+        nodes = [None for i in range(len(vals))]
+        smallerNode = smallerRank = None
+        lastNode = lastRank = None
+        for i, rank, fingerRank in zip(order, ranks, self.predecessorRanks(ranks)):
+            if lastNode is not None and lastRank < rank:
+                smallerNode, smallerRank = lastNode, lastRank
+            if smallerNode is not None and smallerRank >= fingerRank:
+                source = smallerNode
+            else:
+                fingerVal = self.rankVal[fingerRank][-1]
+                source = self.sl.head if fingerVal == -np.inf else self.sl.nodes[fingerVal]
+            lastNode = self.sl.insertES(source, vals[i])
+            lastRank = rank
+            self.addRank(vals[i], rank)
+            nodes[i] = lastNode
+        self.countComps = self.sl.countComps
+        return nodes
+
+    def insert_many(self, vals, predictedRanks):
+        return self.insert_batch(vals, predictedRanks)
+
+    def pushpop(self, val, predictedRank=0):
+        # Inserts the value and extracts the minimum, with the comparisons of one insertion. The
+        # exponential search from the predicted position finds the predecessor of the value: if it
+        # is the head, the value is returned directly without changing the queue, otherwise the
+        # value replaces the minimum (see SkipList.replaceMin).
+        predecessor = self.sl.exponentialSearch(self.finger(predictedRank), val)
+        if predecessor is self.sl.head:
+            self.countComps = self.sl.countComps
+            return val
+        minVal = self.sl.replaceMin(val, predecessor)
+        self.removeRank(minVal)
+        self.addRank(val, predictedRank)
+        self.countComps = self.sl.countComps
+        return minVal
+
+    def addRank(self, val, predictedRank):
         if predictedRank not in self.rankVal:
             self.veb.add(predictedRank)
             self.rankVal[predictedRank] = []
@@ -311,19 +967,67 @@ class OnlineSL:
         if val not in self.valRank:
             self.valRank[val] = []
         self.valRank[val].append(predictedRank)
+
+    def appendSorted(self, vals, predictedRanks):
+        # Appends sorted values, all at least equal to the current maximum, without comparisons
+        node = self.sl.head
+        h = self.sl.head.height-1
+        while h >= 0:
+            while node.getNext(h):
+                node = node.getNext(h)
+            h = h-1
+        for i in range(len(vals)):
+            node = self.sl.insertNextTo(vals[i], node)
+            self.addRank(vals[i], predictedRanks[i])
+
+    def merge(self, other):
+        # Moves the values of other into self (see SkipList.join). The entries of the smaller rank
+        # index are added to the larger one.
+        smaller = self.sl.size < other.sl.size
+        self.sl.join(other.sl)
+        if smaller:
+            self.veb, other.veb = other.veb, self.veb
+            self.rankVal, other.rankVal = other.rankVal, self.rankVal
+            self.valRank, other.valRank = other.valRank, self.valRank
+        for rank in other.veb[1:]:
+            if rank not in self.rankVal:
+                self.veb.add(rank)
+                self.rankVal[rank] = []
+            self.rankVal[rank] += other.rankVal[rank]
+        for val, ranks in other.valRank.items():
+            if val not in self.valRank:
+                self.valRank[val] = []
+            self.valRank[val] += ranks
+        other.reset()
         self.countComps = self.sl.countComps
 
-    def extractMin(self):
-        minVal = self.sl.extractMin()
-        predictedRank = self.valRank[minVal][-1]
-        
-        self.rankVal[predictedRank].remove(minVal)
+    def updateKey(self, node, newVal, predictedRank=0):
+        # Moves a node returned by insert to newVal (see SkipList.updateKey), with a new predicted
+        # rank. Returns the new node.
+        self.removeRank(node.value)
+        node = self.sl.updateKey(node, newVal)
+        self.addRank(newVal, predictedRank)
+        self.countComps = self.sl.countComps
+        return node
+
+    def removeRank(self, val):
+        predictedRank = self.valRank[val][-1]
+        self.rankVal[predictedRank].remove(val)
         if len(self.rankVal[predictedRank]) == 0:
             del self.rankVal[predictedRank]
             self.veb.remove(predictedRank)
+        self.valRank[val].remove(predictedRank)
+        if len(self.valRank[val]) == 0:
+            del self.valRank[val]
+
+    def delete(self, node):
+        # Removes a node returned by insert, without comparisons
+        self.sl.delete(node)
+        self.removeRank(node.value)
+        return node.value
 
-        self.valRank[minVal].remove(predictedRank)
-        if len(self.valRank[minVal]) == 0:
-            del self.valRank[minVal]
+    def extractMin(self):
+        minVal = self.sl.extractMin()
+        self.removeRank(minVal)
         self.countComps = self.sl.countComps
-        return minVal
\ No newline at end of file
+        return minVal
@@ -38,10 +38,16 @@ def getPredecessor(sortedArr, target):
     return sortedArr[index]
 
 # Sort using Skip-List with online Rank predictions
-def sortOSL(predictions):
+def sortOSL(predictions, batchSize=None):
+    # batchSize: the values arrive in batches, inserted with OnlineSL.insert_batch
     n = len(predictions)
     np.random.shuffle(predictions)
     osl = OnlineSL()
+    if batchSize:
+        for start in range(0, n, batchSize):
+            batch = predictions[start:start+batchSize]
+            osl.insert_batch([val for predictedRank, val in batch], [predictedRank for predictedRank, val in batch])
+        return osl.sl
     for i in range(n):
         predictedRank, val = predictions[i]
         osl.insert(val, predictedRank)
@@ -67,11 +73,12 @@ def sortSL(predictions):
 ######################################################################
 
 # Sort given Dirty Comparisons
-def sortDC(predictions): # prediction[j][1] = j for all j
+def sortDC(predictions, comparator=None): # prediction[j][1] = j for all j
+    # comparator: clean comparisons of the indices, see comparators.py
     n = len(predictions)
     def dirtyCompare(i,j):
         return (predictions[i][0] - predictions[j][0])
-    sl = SkipList(dcompare=dirtyCompare)
+    sl = SkipList(dcompare=dirtyCompare, comparator=comparator)
     arr = np.arange(n)
     np.random.shuffle(arr)
     for i in arr:
@@ -0,0 +1,56 @@
+import heapq
+import numpy as np
+from adaptive import AdaptivePQ
+
+
+def filledQueue(n, rng):
+    pq = AdaptivePQ()
+    ref = []
+    for v in rng.permutation(n):
+        pq.insert(float(v), int(v))
+        heapq.heappush(ref, float(v))
+    return pq, ref
+
+
+def holdStep(pq, ref, n, error, rng):
+    # Extracts the minimum t and inserts t + increment, whose predicted rank has the given error
+    t = pq.extractMin()
+    assert t == heapq.heappop(ref)
+    new = t + rng.random() * n
+    pq.insert(new, int(new + error * rng.standard_normal()))
+    heapq.heappush(ref, new)
+
+
+def test_keeps_the_skip_list_with_good_predictions():
+    rng = np.random.default_rng(0)
+    pq, ref = filledQueue(2000, rng)
+    for step in range(20000):
+        holdStep(pq, ref, 2000, 10, rng)
+    assert pq.mode == "OSL" and pq.migrations == 0
+
+
+def test_switches_to_a_heap_with_bad_predictions():
+    rng = np.random.default_rng(1)
+    pq, ref = filledQueue(2000, rng)
+    step = 0
+    while pq.migrations == 0 and step < 20000:
+        holdStep(pq, ref, 2000, 10**6, rng)
+        step += 1
+    assert pq.mode == "BH" and pq.costEstimate > 2*np.log2(pq.size + 2)
+    for step in range(5000):
+        holdStep(pq, ref, 2000, 10**6, rng)
+    assert [pq.extractMin() for i in range(2000)] == sorted(ref)
+
+
+def test_migrations_keep_the_values_and_their_predictions():
+    pq = AdaptivePQ()
+    for val, rank in [(5, 1), (3, 0), (5, 7), (9, 2), (3, 4)]:
+        pq.insert(val, rank)
+    pq.migrate("BH")
+    assert pq.pq.heap == [3, 3, 5, 5, 9]
+    assert sorted(pq.rankVal) == [0, 1, 2, 4, 7]
+    pq.migrate("OSL")
+    assert pq.pq.sl.getValsHeights()[0] == [3, 3, 5, 5, 9]
+    assert sorted(pq.pq.valRank[5]) == [1, 7] and sorted(pq.pq.valRank[3]) == [0, 4]
+    assert [pq.extractMin() for i in range(5)] == [3, 3, 5, 5, 9]
+    assert pq.migrations == 2 and pq.isEmpty()
@@ -0,0 +1,32 @@
+import numpy as np
+from dijkstra import dijkstraPQ, astarPQ, heuristicValues, getFRanks
+from graphs import generateGraph
+
+
+def test_heuristic_is_a_lower_bound():
+    graph, graphType = generateGraph("knn", 2000, seed=2)
+    target = 1234
+    heuristic = heuristicValues(graph, target, graphType)
+    # Distances to the target are the distances from it in the reversed graph
+    toTarget, pq = dijkstraPQ(graph.reverse(), target, graphType=graphType)
+    assert heuristic[target] == 0
+    assert all(heuristic[node] <= toTarget[node] for node in graph.nodes)
+
+
+def test_astar_matches_dijkstra():
+    graph, graphType = generateGraph("grid", 3000, seed=6)
+    zero = {node: 0 for node in graph.nodes}
+    for source, target in [(0, 2999), (1500, 40), (12, 12)]:
+        reference, pq = dijkstraPQ(graph, source, graphType=graphType)
+        heuristic = heuristicValues(graph, target, graphType)
+        fRanks = getFRanks(graph, source, target, graphType, heuristic)
+        predictions = {node: rank for rank, node in enumerate(fRanks)}
+        blind = astarPQ(graph, source, target, graphType=graphType, heuristic=zero)[2]
+        for pqID, pqPredictions in [("BH", None), ("FH", None), ("OSL", None), ("OSL", predictions)]:
+            distances, pq, settled = astarPQ(graph, source, target, pqPredictions, pqID,
+                                             graphType=graphType, heuristic=heuristic)
+            assert np.isclose(distances[target], reference[target])
+            # The heuristic can only prune the search
+            assert 1 <= settled <= blind
+        if source != target:
+            assert settled < blind
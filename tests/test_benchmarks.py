@@ -0,0 +1,40 @@
+import json
+import numpy as np
+from benchmarks import measureCell, findRegressions, saveBaseline, loadBaseline, holdWorkload
+
+
+def test_comparison_counts_are_reproducible():
+    first = measureCell("sort", "OSL", {"n": 500}, seed=0, repeats=1)
+    again = measureCell("sort", "OSL", {"n": 500}, seed=0, repeats=1)
+    assert set(first) == {"nsPerOp", "compsPerOp", "tracemallocBytesPerElem", "rssBytesPerElem"}
+    assert first["compsPerOp"] == again["compsPerOp"] > 0
+
+
+def test_only_comparison_counts_are_shared(tmp_path):
+    shared, local = str(tmp_path / "shared.json"), str(tmp_path / "local.json")
+    results = {"sort_BH": {"compsPerOp": 7.0, "nsPerOp": 2000.0}, "sort_SL": {"compsPerOp": 11.0, "nsPerOp": 9000.0}}
+    saveBaseline(results, shared, local)
+    with open(shared) as file:
+        assert json.load(file) == {"sort_BH": {"compsPerOp": 7.0}, "sort_SL": {"compsPerOp": 11.0}}
+    # Another machine keeps the shared counts and saves its own timings
+    saveBaseline({"sort_BH": {"compsPerOp": 7.0, "nsPerOp": 500.0}}, shared, str(tmp_path / "other.json"), shared=False)
+    assert loadBaseline(shared, str(tmp_path / "other.json"))["sort_BH"] == {"compsPerOp": 7.0, "nsPerOp": 500.0}
+    baseline = loadBaseline(shared, local)
+    assert baseline == results
+    new = {"sort_BH": {"compsPerOp": 7.5, "nsPerOp": 2500.0}, "sort_SL": {"compsPerOp": 11.0, "nsPerOp": 20000.0}}
+    assert findRegressions(new, baseline) == [("sort_BH", "compsPerOp", 7.0, 7.5), ("sort_SL", "nsPerOp", 9000.0, 20000.0)]
+
+
+def test_fused_hold_saves_comparisons():
+    for pqID in ["FH", "BH", "OSL"]:
+        comps = []
+        for fused in [True, False]:
+            np.random.seed(0)
+            ops, count, size = holdWorkload(pqID, n=1000, events=5000, fused=fused)()
+            comps.append(count)
+        assert ops == 1000 + 2*5000
+        if pqID == "OSL":
+            # The skip list search dominates either way
+            assert comps[0] < 1.05 * comps[1]
+        else:
+            assert comps[0] < comps[1]
@@ -0,0 +1,56 @@
+import random
+import numpy as np
+from cache import LAPQCache, LRUCache
+from benchmarks import zipfTrace, nextAccesses
+
+
+def beladyHits(trace, capacity):
+    # Every miss is cached, evicting the cached key whose next access is the furthest
+    nextAccess = nextAccesses(trace)
+    cached = {}
+    hits = 0
+    for key, t in zip(trace, nextAccess):
+        if key in cached:
+            hits += 1
+        elif len(cached) == capacity:
+            del cached[max(cached, key=cached.get)]
+        cached[key] = t
+    return hits
+
+
+def test_exact_predictions_match_belady():
+    np.random.seed(0)
+    trace = zipfTrace(2000, 20000)
+    nextAccess = nextAccesses(trace)
+    for capacity in [1, 50, 300]:
+        lapq, lru = LAPQCache(capacity, bucketWidth=16), LRUCache(capacity)
+        for cache in [lapq, lru]:
+            for key, t in zip(trace, nextAccess):
+                if cache.get(key, t) is None:
+                    cache.put(key, key, t)
+            assert len(cache) <= capacity
+            assert cache.hits + cache.misses == len(trace)
+        assert lapq.hits == beladyHits(trace, capacity)
+        assert lapq.hits >= lru.hits
+        assert lapq.evictions == lapq.misses - len(lapq)
+
+
+def test_size_budget():
+    random.seed(1)
+    for cache in [LAPQCache(100, sizeOf=len), LRUCache(100, sizeOf=len)]:
+        for t in range(2000):
+            key = random.randint(0, 60)
+            value = bytes(random.randint(0, 40))
+            cache.put(key, value, t + random.randint(1, 100))
+            assert cache.used == sum(len(cache.entries[key][0]) for key in cache.entries) <= 100
+            assert cache.get(key, t + 50) == value
+        # A value larger than the budget replaces nothing and is not cached
+        key = next(iter(cache.entries))
+        cache.put(key, bytes(101), 5000)
+        assert key not in cache and cache.pop(key) is None
+    lapq = LAPQCache(3)
+    for key, nextAccess in [("a", 10), ("b", 30), ("c", 20)]:
+        lapq.put(key, key, nextAccess)
+    # Moving "b" before the others makes "c" the furthest
+    assert lapq.get("b", 5) == "b"
+    assert lapq.evict() == "c" and lapq.evict() == "a"
@@ -0,0 +1,54 @@
+import random
+import numpy as np
+from comparators import MemoComparator, ParallelComparator
+from skiplist import SkipList
+
+
+def searchWorkload(comparator=None):
+    # Inserts from the head, then exponential searches from random nodes. Returns the skip list
+    # and the values of the predecessors found.
+    random.seed(0)
+    np.random.seed(0)
+    sl = SkipList(comparator=comparator)
+    values = random.sample(range(10**6), 2000)
+    nodes = [sl.insert(v) for v in values]
+    found = []
+    for i in range(1000):
+        source = random.choice(nodes)
+        found.append(sl.exponentialSearch(source, random.randint(0, 10**6)).value)
+        # Searches close to the source, which the prefetch covers
+        found.append(sl.exponentialSearch(source, source.value + random.randint(-5000, 5000)).value)
+    return sl, found
+
+
+def test_comparators_keep_the_search_comparisons():
+    calls = []
+    def compare(val1, val2):
+        calls.append((val1, val2))
+        return val1 - val2
+    reference, expected = searchWorkload()
+    memo = MemoComparator(compare)
+    sl, found = searchWorkload(memo)
+    assert found == expected and sl.countComps == reference.countComps
+    assert memo.evaluations == len(calls) and memo.hits + memo.evaluations == sl.countComps
+    # A comparison reused in the other order is answered from the memo
+    assert memo(*calls[0][::-1]) == -(calls[0][0] - calls[0][1]) and memo.evaluations == len(calls)
+    with ParallelComparator(compare, depth=4, workers=4) as parallel:
+        sl, found = searchWorkload(parallel)
+    assert found == expected and sl.countComps == reference.countComps
+    assert parallel.speculations > 0
+    # The comparisons used by the search are prefetched ones (hits) or evaluated on demand
+    assert parallel.hits + parallel.evaluations - parallel.speculations == sl.countComps
+
+
+def test_memo_evicts_the_least_recently_used_pair():
+    memo = MemoComparator(lambda val1, val2: val1 - val2, maxSize=2)
+    memo(1, 2)
+    memo(3, 4)
+    memo(2, 1)
+    memo(5, 6)
+    # (3, 4) was used least recently
+    assert list(memo.memo) == [(1, 2), (5, 6)]
+    assert memo.evaluations == 3 and memo.hits == 1
+    memo(4, 3)
+    assert memo.evaluations == 4
@@ -0,0 +1,52 @@
+import numpy as np
+from deltastepping import DeltaStepping, deltaStepping, relaxChunk
+from dijkstra import dijkstraPQ, getRanks
+from graphs import generateGraph
+
+
+def test_delta_stepping_matches_dijkstra():
+    graph, graphType = generateGraph("grid", 3000, seed=3)
+    reference, pq = dijkstraPQ(graph, 0, graphType=graphType)
+    rankedNodes, comps = getRanks(graph, 0, graphType)
+    predictions = {node: rank for rank, node in enumerate(rankedNodes)}
+    expected = np.array([reference[node] for node in graph.nodes])
+    # Each out-edge of a reached node is relaxed at least once
+    reached = np.isfinite(expected)
+    reachedEdges = np.diff(graph.indptr)[reached].sum()
+    # delta=inf puts every edge in the light phase of a single bucket
+    for delta in [None, 10.0, 1000.0, np.inf]:
+        with DeltaStepping(graph, graphType, workers=1, delta=delta) as solver:
+            for pqID in ["BH", "FH", "OSL"]:
+                dist, pq = solver.query(0, predictions, pqID)
+                assert np.allclose(dist, expected)
+                assert solver.relaxed >= reachedEdges
+                assert pq.isEmpty()
+
+
+def test_parallel_phases_match_sequential_ones():
+    graph, graphType = generateGraph("grid", 2000, seed=4, csr=False)
+    reference, pq = dijkstraPQ(graph, 7, graphType=graphType)
+    distances, pq = deltaStepping(graph, 7, graphType=graphType, workers=1, delta=50.0)
+    assert distances.keys() == reference.keys()
+    assert np.allclose([distances[node] for node in reference], list(reference.values()))
+    with DeltaStepping(graph, graphType, workers=2, delta=50.0, minChunk=8) as solver:
+        for source in [7, 1500]:
+            reference, pq = dijkstraPQ(graph, source, graphType=graphType)
+            dist, pq = solver.query(source)
+            assert np.allclose(dist, [reference[node] for node in solver.nodes])
+
+
+def test_relax_chunk_splits_light_and_heavy_edges():
+    graph = generateGraph("grid", 400, seed=5)[0]
+    dist = np.full(400, np.inf)
+    frontier = np.arange(0, 400, 3)
+    dist[frontier] = 0
+    arrays = {"indptr": graph.indptr, "indices": graph.indices, "lengths": graph.lengths, "dist": dist}
+    delta = float(np.median(graph.lengths))
+    lightTargets, lightDistances, lightRelaxed = relaxChunk(frontier, True, delta, arrays)
+    heavyTargets, heavyDistances, heavyRelaxed = relaxChunk(frontier, False, delta, arrays)
+    assert lightRelaxed + heavyRelaxed == (graph.indptr[frontier+1] - graph.indptr[frontier]).sum()
+    assert (lightDistances <= delta).all() and (heavyDistances > delta).all()
+    # Only the nodes out of the frontier can be improved from distance 0
+    assert np.isinf(dist[lightTargets]).all() and np.isinf(dist[heavyTargets]).all()
+    assert relaxChunk(np.array([], dtype=np.int64), True, delta, arrays)[2] == 0
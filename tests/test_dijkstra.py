@@ -0,0 +1,139 @@
+import networkx as nx
+import numpy as np
+import pytest
+from dijkstra import dijkstraPQ, LandmarkIndex, getPredictions
+from dijkstra import incrementalDijkstra, randomEdgeChanges, getAffectedNodes
+from dijkstra import DijkstraContext, getRanks, getDecayPredictions, dijkstraDecreaseKey
+
+
+def weightedGraph(n=200, m=1000, seed=0):
+    # Random strongly connected directed graph with positive weights
+    rng = np.random.default_rng(seed)
+    graph = nx.gnm_random_graph(n, m, seed=seed, directed=True)
+    graph.add_edges_from((i, (i+1) % n) for i in range(n))
+    for u, v in graph.edges:
+        graph[u][v]["weight"] = float(rng.uniform(1, 10))
+    return graph
+
+
+def test_landmark_keys_are_lower_bounds():
+    graph = weightedGraph()
+    np.random.seed(0)
+    index = LandmarkIndex(graph, k=4, graphType="weighted")
+    assert len(set(index.landmarks)) == 4
+    for source in [0, 17, index.landmarks[2]]:
+        distances, pq = dijkstraPQ(graph, source, graphType="weighted")
+        exact = np.array([distances[node] for node in index.nodes])
+        keys = index.predictedKeys(source)
+        assert (keys <= exact + 1e-3).all()
+        if source in index.landmarks:
+            assert np.allclose(keys, exact, rtol=1e-5)
+
+
+def test_landmark_ranks_drive_osl():
+    graph = weightedGraph(seed=1)
+    np.random.seed(1)
+    index = LandmarkIndex(graph, k=4, graphType="weighted")
+    source = 5
+    predictions = getPredictions("landmarks", None, {"index": index, "source": source}, "weighted")
+    assert sorted(predictions.values()) == list(range(graph.number_of_nodes()))
+    reference, pq = dijkstraPQ(graph, source, graphType="weighted")
+    distances, pq = dijkstraPQ(graph, source, predictions, pqID="OSL", graphType="weighted")
+    assert distances == reference
+
+
+def test_incremental_matches_full_recomputation():
+    np.random.seed(2)
+    for pqID in ["OSL", "BH"]:
+        graph = weightedGraph(seed=2)
+        distances, pq = dijkstraPQ(graph, 0, graphType="weighted")
+        for step in range(5):
+            # Increases and decreases, including edges of the shortest path tree
+            changes = randomEdgeChanges(graph, 20, "weighted", minFactor=0.2, maxFactor=5)
+            u = next(iter(graph[0]))
+            changes.append((0, u, graph[0][u]["weight"] * 3))
+            distances, pq = incrementalDijkstra(graph, distances, changes, pqID, graphType="weighted")
+            full, pq = dijkstraPQ(graph, 0, graphType="weighted")
+            assert distances.keys() == full.keys()
+            assert all(np.isclose(distances[node], full[node], rtol=1e-9) for node in full)
+
+
+def test_incremental_rejects_csr_graphs():
+    from graphs import generateGraph
+    graph, graphType = generateGraph("grid", 100)
+    distances, pq = dijkstraPQ(graph, 0, graphType=graphType)
+    with pytest.raises(ValueError):
+        getAffectedNodes(graph, distances, [(0, 1, 5.0)], graphType)
+
+
+def test_monotone_queues_give_dijkstra_distances():
+    graph = weightedGraph(seed=3)
+    reference, pq = dijkstraPQ(graph, 0, pqID="BH", graphType="weighted")
+    for pqID in ["RH", "DIAL"]:
+        distances, pq = dijkstraPQ(graph, 0, pqID=pqID, graphType="weighted")
+        assert distances == reference
+
+
+def test_context_reuses_its_state_across_queries():
+    graph = weightedGraph(seed=4)
+    np.random.seed(4)
+    for pqID in ["BH", "OSL", "DC"]:
+        context = DijkstraContext(graph, pqID=pqID, graphType="weighted")
+        for source in [0, 50, 0, 199]:
+            reference, pq = dijkstraPQ(graph, source, graphType="weighted")
+            predictions = None
+            if pqID != "BH":
+                predictions = getDecayPredictions(getRanks(graph, source, "weighted")[0], 500)
+            context.query(source, predictions)
+            assert context.getDistances() == reference
+            target = 123
+            path = context.getPath(target)
+            assert path[0] == source and path[-1] == target
+            length = sum(graph[u][v]["weight"] for u, v in zip(path, path[1:]))
+            assert np.isclose(length, context.getDistance(target))
+    # A node not reached by the current query has no distance, even if a previous query reached it
+    graph.add_edge(200, 0, weight=1.0)
+    context = DijkstraContext(graph, graphType="weighted")
+    context.query(200)
+    assert context.getDistance(5) < float('inf')
+    context.query(0)
+    assert context.getDistance(200) == float('inf') and context.getPath(200) is None
+
+
+def test_decrease_key_dijkstra():
+    graph = weightedGraph(seed=5)
+    reference, pq = dijkstraPQ(graph, 0, graphType="weighted")
+    for pqID in ["PH", "RPH", "FH"]:
+        distances, pq = dijkstraDecreaseKey(graph, 0, pqID, graphType="weighted")
+        assert distances == reference
+
+
+def test_batched_relaxation_gives_the_same_distances():
+    from graphs import generateGraph
+    graph, graphType = generateGraph("knn", 1500, k=20)
+    rankedNodes = getRanks(graph, 0, graphType)[0]
+    predictions = getDecayPredictions(rankedNodes, 1000)
+    for g, t in [(graph, graphType), (weightedGraph(seed=6), "weighted")]:
+        for pqID in ["BH", "FH", "OSL"]:
+            p = predictions if pqID == "OSL" and t == graphType else None
+            np.random.seed(0)
+            reference, pq = dijkstraPQ(g, 0, p, pqID=pqID, graphType=t)
+            single = pq.countComps
+            distances, pq = dijkstraPQ(g, 0, p, pqID=pqID, graphType=t, batchThreshold=4)
+            assert distances == reference
+            # Batching is opt-in: by default the counts are those of single insertions
+            np.random.seed(0)
+            assert dijkstraPQ(g, 0, p, pqID=pqID, graphType=t, batchThreshold=np.inf)[1].countComps == single
+
+
+def test_key_cdf_predictions_in_dijkstra():
+    from predictions import KeyCDFModel
+    graph = weightedGraph(seed=7)
+    reference, pq = dijkstraPQ(graph, 3, graphType="weighted")
+    for bins in [None, 64]:
+        predictions = getPredictions("sortedKeys", None, {"graph": graph, "source": 3, "bins": bins}, "weighted")
+        assert isinstance(predictions, KeyCDFModel) == (bins is not None)
+        for batchThreshold in [np.inf, 2]:
+            distances, pq = dijkstraPQ(graph, 3, predictions, pqID="OSL", predGenID="sortedKeys",
+                                       graphType="weighted", batchThreshold=batchThreshold)
+            assert distances == reference
@@ -0,0 +1,45 @@
+import os
+import numpy as np
+import pytest
+import runner
+from experiments import ResultsStore, uploadFromFile
+
+
+def test_interrupted_sweep_resumes_with_the_same_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("data")
+    params = dict(n=200, predGenID="decay", algosToTest=["OSL", "SL"], niters=2, m=2, workers=1, seed=3, save=False)
+    mean, std = runner.runSortSweep(**params)
+    # Crash after 5 of the 12 results, in the middle of the 6th line
+    with open("data/data_decay_200.jsonl") as file:
+        lines = file.readlines()
+    with open("data/data_decay_200.jsonl", "w") as file:
+        file.writelines(lines[:7])
+        file.write(lines[7][:10])
+    partial, partialStd = uploadFromFile("data_decay_200.json")
+    assert np.isnan(partial["SL_decay_200"]).all() and not np.isnan(partial["OSL_decay_200"][:2]).any()
+    runTask = runner.runTask
+    calls = []
+    monkeypatch.setattr(runner, "runTask", lambda task: calls.append(task) or runTask(task))
+    resumed, resumedStd = runner.runSortSweep(**params)
+    assert len(calls) == 7
+    for expID in mean:
+        assert np.array_equal(resumed[expID], mean[expID]) and np.array_equal(resumedStd[expID], std[expID])
+    # All the results are now logged
+    logged, loggedStd = uploadFromFile("data_decay_200.json")
+    for expID in mean:
+        assert np.allclose(logged[expID], mean[expID])
+
+
+def test_sweep_only_resumes_with_the_same_parameters(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("data")
+    store = ResultsStore("x.json")
+    store.addSweep("OSL", [{'c': 0}, {'c': 10}], seed=0, niters=2)
+    store.add("OSL", 1, 0, 2.5)
+    store = ResultsStore("x.json")
+    store.addSweep("OSL", [{'c': 0}, {'c': 10}], seed=0, niters=2)
+    assert store.has("OSL", 1, 0) and store.get("OSL", 1, 0) == 2.5
+    for grid, seed, niters in [([{'c': 0}, {'c': 20}], 0, 2), ([{'c': 0}, {'c': 10}], 1, 2), ([{'c': 0}, {'c': 10}], 0, 3)]:
+        with pytest.raises(ValueError):
+            ResultsStore("x.json").addSweep("OSL", grid, seed=seed, niters=niters)
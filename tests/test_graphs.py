@@ -0,0 +1,42 @@
+import numpy as np
+from graphs import generateGraph, graphGenerators, toCSR
+from dijkstra import dijkstraPQ
+
+
+def test_generators_have_exactly_n_nodes():
+    for kind in graphGenerators:
+        for n in [1000, 1234, 10**4]:
+            graph, graphType = generateGraph(kind, n)
+            assert graphType == "csr"
+            assert graph.number_of_nodes() == n
+            assert len(graph.x) == len(graph.y) == n
+            assert graph.indices.max() < n
+
+
+def test_generators_are_seeded_two_way_roads():
+    for kind in graphGenerators:
+        graph = generateGraph(kind, 2000, seed=1)[0]
+        again = generateGraph(kind, 2000, seed=1)[0]
+        other = generateGraph(kind, 2000, seed=2)[0]
+        assert np.array_equal(graph.indptr, again.indptr) and np.array_equal(graph.lengths, again.lengths)
+        assert not np.array_equal(graph.x, other.x)
+        src, dst, lengths = graph.edgeArrays()
+        assert (src != dst).all()
+        # Every road is two-way with the same length, at least the straight-line distance
+        edges = dict(zip(zip(src.tolist(), dst.tolist()), lengths.tolist()))
+        assert all(edges[(v, u)] == length for (u, v), length in edges.items())
+        straight = np.hypot(graph.x[src] - graph.x[dst], graph.y[src] - graph.y[dst])
+        assert (lengths >= straight * (1 - 1e-6)).all()
+
+
+def test_csr_and_networkx_graphs_give_the_same_distances():
+    graph, graphType = generateGraph("highway", 900)
+    nxGraph, nxType = generateGraph("highway", 900, csr=False)
+    assert nxGraph.number_of_nodes() == 900
+    distances, pq = dijkstraPQ(graph, 0, graphType=graphType)
+    nxDistances, pq = dijkstraPQ(nxGraph, 0, graphType=nxType)
+    assert distances == nxDistances
+    # Converting back gives the same CSR graph
+    csr, nodes = toCSR(nxGraph)
+    assert nodes == list(range(900))
+    assert np.array_equal(csr.indices, graph.indices) and np.array_equal(csr.lengths, graph.lengths)
@@ -0,0 +1,80 @@
+import heapq
+import random
+import pytest
+from heaps import BinaryHeap, FibonacciHeap, RadixHeap, DialQueue, PairingHeap, RankPairingHeap
+
+
+def test_monotone_queues_match_heapq():
+    # Dijkstra-like workload: the inserted keys are at least the last extracted key
+    random.seed(0)
+    for pq in [RadixHeap(), DialQueue(), DialQueue(scale=0.1)]:
+        ref = []
+        last = 0
+        for step in range(5000):
+            if ref and random.random() < 0.45:
+                last = pq.extractMin()
+                assert last == heapq.heappop(ref)
+            else:
+                key = last + random.choice([0, random.uniform(0, 50), float(random.randint(0, 5))])
+                pq.insert(key)
+                heapq.heappush(ref, key)
+        while ref:
+            assert pq.extractMin() == heapq.heappop(ref)
+        assert pq.isEmpty()
+
+
+def test_monotone_queues_reject_smaller_keys():
+    for pq in [RadixHeap(), DialQueue()]:
+        pq.insert(5.0)
+        pq.insert(7.5)
+        assert pq.extractMin() == 5.0
+        with pytest.raises(ValueError):
+            pq.insert(1.0)
+        assert pq.extractMin() == 7.5
+        with pytest.raises(ValueError):
+            pq.extractMin()
+
+
+def test_decrease_key_heaps_match_a_sorted_reference():
+    random.seed(1)
+    for cls in [PairingHeap, RankPairingHeap]:
+        pq = cls()
+        # Live handles, and the multiset of their values
+        handles = []
+        for step in range(6000):
+            r = random.random()
+            if handles and r < 0.3:
+                value = pq.extractMin()
+                assert value == min(handle.value for handle in handles)
+                handles.remove(next(handle for handle in handles if handle.value == value))
+            elif handles and r < 0.6:
+                handle = random.choice(handles)
+                pq.decrease_key(handle, handle.value - random.uniform(0, 100))
+            else:
+                handles.append(pq.insert(random.uniform(0, 1000)))
+        values = sorted(handle.value for handle in handles)
+        assert [pq.extractMin() for i in range(len(values))] == values
+        assert pq.isEmpty()
+        handle = pq.insert(5)
+        with pytest.raises(ValueError):
+            pq.decrease_key(handle, 6)
+
+
+def test_pushpop_matches_heapq():
+    random.seed(2)
+    for pq in [BinaryHeap(), FibonacciHeap()]:
+        # An empty queue returns the value without comparing it
+        assert pq.pushpop(5) == 5 and pq.countComps == 0 and pq.isEmpty()
+        ref = []
+        for i in range(300):
+            v = random.randint(0, 1000)
+            pq.insert(v)
+            heapq.heappush(ref, v)
+        for i in range(3000):
+            v = random.randint(0, 2000)
+            before, smallest = pq.countComps, ref[0]
+            assert pq.pushpop(v) == heapq.heappushpop(ref, v)
+            # A value not above the minimum costs one comparison
+            if v <= smallest:
+                assert pq.countComps == before + 1
+        assert [pq.extractMin() for i in range(len(ref))] == sorted(ref)
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from benchmarks import coreModules, heavyModules
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_core_works_without_the_heavy_modules():
+    # The heavy modules are made unimportable, then the core sorts and runs Dijkstra on a CSR graph
+    code = (f"import sys\n"
+            f"for m in {heavyModules!r}: sys.modules[m] = None\n"
+            f"import {', '.join(coreModules)}\n"
+            "from sorting import sortOSL\n"
+            "from predictions import classPredictions\n"
+            "assert sortOSL(classPredictions(200, 20)).countComps > 0\n"
+            "graph, graphType = graphs.generateGraph('grid', 400)\n"
+            "distances, pq = dijkstra.dijkstraPQ(graph, 0, pqID='BH', graphType=graphType)\n"
+            "assert len(distances) == 400\n")
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+
+def test_core_does_not_load_the_heavy_modules():
+    code = (f"import sys\n"
+            f"import {', '.join(coreModules)}\n"
+            f"print(*[m for m in {heavyModules!r} if m in sys.modules])")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=root, check=True).stdout
+    assert output.split() == []
@@ -0,0 +1,56 @@
+import random
+import threading
+import pytest
+from multiqueue import MultiQueue, rankErrors
+
+
+def test_one_shard_is_an_exact_priority_queue():
+    random.seed(0)
+    pq = MultiQueue(numShards=1, record=True)
+    values = random.sample(range(1000), 1000)
+    for v in values:
+        pq.insert(v, v)
+    assert [pq.extractMin() for i in range(1000)] == sorted(values)
+    assert pq.extractMin() is None and pq.isEmpty()
+    assert (rankErrors(pq.log) == 0).all()
+
+
+def test_concurrent_producers_and_consumers():
+    random.seed(1)
+    for pqID, routing in [("OSL", "random"), ("OSL", "rank"), ("SL", "random")]:
+        n = 4000
+        pq = MultiQueue(numShards=4, pqID=pqID, routing=routing, maxRank=n-1, record=True)
+        values = random.sample(range(n), n)
+        popped = [[] for c in range(4)]
+        def produce(p):
+            for v in values[p::4]:
+                pq.insert(v, v)
+        def consume(c):
+            for i in range(n // 8):
+                val = pq.extractMin()
+                if val is not None:
+                    popped[c].append(val)
+        threads = [threading.Thread(target=produce, args=(p,)) for p in range(4)]
+        threads += [threading.Thread(target=consume, args=(c,)) for c in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        while not pq.isEmpty():
+            popped[0].append(pq.extractMin())
+        # Every value is extracted exactly once, and the log replays all the operations
+        assert sorted(sum(popped, [])) == list(range(n))
+        errors = rankErrors(pq.log)
+        assert len(errors) == n and (errors >= 0).all()
+
+
+def test_rank_routing():
+    pq = MultiQueue(numShards=4, routing="rank", maxRank=99)
+    for v in range(100):
+        pq.insert(v, v)
+    # Shard i holds the predicted ranks [25i, 25i+25)
+    assert [shard.sl.head.getNext(0).value for shard in pq.shards] == [0, 25, 50, 75]
+    with pytest.raises(ValueError):
+        MultiQueue(routing="rank")
+    with pytest.raises(ValueError):
+        MultiQueue(routing="shortest")
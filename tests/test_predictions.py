@@ -0,0 +1,30 @@
+import numpy as np
+from sortedcontainers import SortedList
+from predictions import KeyCDFModel
+
+
+def test_key_cdf_model_approximates_the_sorted_keys():
+    rng = np.random.default_rng(0)
+    keys = rng.lognormal(size=100000)
+    exact = SortedList(keys)
+    model = KeyCDFModel(keys, numBins=256)
+    queries = np.concatenate([rng.lognormal(size=2000), [-1, keys.min(), keys.max(), keys.max() + 1]])
+    predicted = model.predictRanks(queries)
+    assert predicted.tolist() == [model.bisect_left(q) for q in queries]
+    # Exact at the ends, and off by at most the number of keys of the bin of the query
+    assert model.bisect_left(-1) == 0 and model.bisect_left(keys.max() + 1) == len(keys)
+    counts = np.diff(np.frombuffer(model.cumulative, dtype=np.int64))
+    bins = np.clip(((queries - model.low) * model.scale).astype(int), 0, 255)
+    errors = np.abs(predicted - np.array([exact.bisect_left(q) for q in queries]))
+    assert (errors <= counts[bins] + 1).all()
+    # Non-decreasing in the key
+    order = np.argsort(queries)
+    assert (np.diff(predicted[order]) >= 0).all()
+    # numBins+1 integers, plus the header of the array
+    assert model.nbytes < 257 * 8 + 512
+
+
+def test_key_cdf_model_with_equal_keys():
+    model = KeyCDFModel([3.0] * 10, numBins=8)
+    assert [model.bisect_left(k) for k in [2, 3, 4]] == [0, 0, 10]
+    assert model.predictRanks([2, 3, 4]).tolist() == [0, 0, 10]
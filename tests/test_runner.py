@@ -0,0 +1,30 @@
+import os
+import numpy as np
+from runner import runSortSweep, taskSeed, runTask, sortParamGrid
+
+
+def test_task_seeds_depend_on_the_task_only():
+    assert np.array_equal(taskSeed(0, "OSL", 3, 1), taskSeed(0, "OSL", 3, 1))
+    seeds = {tuple(taskSeed(seed, algoID, i, it)) for seed in [0, 1] for algoID in ["OSL", "DC"]
+             for i in range(3) for it in range(3)}
+    assert len(seeds) == 36
+    # A task gives the same result whatever ran before it in the worker
+    task = ("sort", None, "OSL", {'n': 300, 'c': 30}, "class", taskSeed(0, "OSL", 1, 0))
+    first = runTask(task)
+    np.random.seed(12345)
+    np.random.rand(100)
+    assert runTask(task) == first
+
+
+def test_sort_sweep_does_not_depend_on_the_workers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("data")
+    params = dict(n=200, predGenID="class", algosToTest=["OSL", "DC", "BH"], niters=3, m=2, seed=7)
+    mean1, std1 = runSortSweep(workers=1, **params)
+    os.remove("data/data_class_200.json")
+    os.remove("data/data_class_200.jsonl")
+    mean2, std2 = runSortSweep(workers=2, **params)
+    assert mean1.keys() == mean2.keys() == {"OSL_class_200", "DC_class_200", "BH_class_200"}
+    for expID in mean1:
+        assert np.array_equal(mean1[expID], mean2[expID]) and np.array_equal(std1[expID], std2[expID])
+        assert len(mean1[expID]) == len(sortParamGrid(200, "class", 2))
@@ -0,0 +1,295 @@
+import heapq
+import json
+import random
+import numpy as np
+import pytest
+from heaps import BinaryHeap, FibonacciHeap
+from skiplist import SkipList, IndexableSkipList, InstrumentedSkipList, OnlineSL, PredictionErrorEstimator
+
+
+def reversedCompare(val1, val2):
+    return val2 - val1
+
+
+def test_split_keeps_comparator():
+    # With a reversed comparator the list is in decreasing order, and split keeps the values
+    # before the key (>= key)
+    for cls in [SkipList, IndexableSkipList]:
+        sl = cls(comparator=reversedCompare)
+        for v in [3, 1, 4, 5, 2]:
+            sl.insert(v)
+        right = sl.split(3)
+        assert sl.getValsHeights()[0] == [5, 4, 3]
+        assert right.getValsHeights()[0] == [2, 1]
+        assert right.comparator is reversedCompare
+        right.insert(0)
+        right.insert(1.5)
+        assert right.getValsHeights()[0] == [2, 1.5, 1, 0]
+
+
+def test_pushpop_matches_heapq():
+    random.seed(0)
+    for pq in [SkipList(), SkipList(recycleNodes=True), OnlineSL()]:
+        isOSL = isinstance(pq, OnlineSL)
+        ref = []
+        for v in [random.randint(0, 100) for i in range(200)]:
+            pq.insert(v, v) if isOSL else pq.insert(v)
+            heapq.heappush(ref, v)
+        for i in range(2000):
+            v = random.randint(0, 300)
+            result = pq.pushpop(v, v + random.randint(-20, 20)) if isOSL else pq.pushpop(v)
+            assert result == heapq.heappushpop(ref, v)
+        out = []
+        while not pq.isEmpty():
+            out.append(pq.extractMin())
+        assert out == sorted(ref)
+
+
+def insertBatchAndSequential(initial, initialRanks, vals, ranks):
+    # (comparisons, values, heights) of insert_batch and of one insert per value in increasing
+    # order of predicted rank, with the same node heights drawn in both runs
+    order = sorted(range(len(vals)), key=ranks.__getitem__)
+    results = []
+    for batch in [True, False]:
+        np.random.seed(1)
+        pq = OnlineSL()
+        for v, r in zip(initial, initialRanks):
+            pq.insert(v, r)
+        start = pq.countComps
+        if batch:
+            pq.insert_batch(vals, ranks)
+        else:
+            for i in order:
+                pq.insert(vals[i], ranks[i])
+        results.append((pq.countComps - start,) + pq.sl.getValsHeights())
+    return results
+
+
+def test_insert_batch_duplicate_ranks():
+    # The second value of rank 7 starts from the batch value of rank 5, not from the rank 3 of the
+    # queue
+    batch, sequential = insertBatchAndSequential([1, 20], [3, 9], [6, 8, 7.5], [5, 7, 7])
+    assert batch == sequential
+    assert batch[1] == [1, 6, 7.5, 8, 20]
+    # Queues with sparse ranks, and batches with new ranks, ranks of the queue and duplicates
+    rng = np.random.default_rng(0)
+    for trial in range(20):
+        initial = [float(v) for v in rng.permutation(200)]
+        initialRanks = [int(v) // 10 * 3 for v in initial]
+        vals = [v + 0.5 for v in rng.choice(200, 60, replace=False)]
+        ranks = [int(v) // 10 * 3 + int(rng.integers(-2, 3)) for v in vals]
+        batch, sequential = insertBatchAndSequential(initial, initialRanks, vals, ranks)
+        assert batch == sequential
+        assert batch[1] == sorted(initial + vals)
+
+
+def test_instrumented_skip_list_records_the_searches():
+    values = [int(v) for v in np.random.default_rng(0).permutation(500)]
+    counts = []
+    for cls in [SkipList, InstrumentedSkipList]:
+        np.random.seed(0)
+        sl = cls()
+        for v in values[:250]:
+            sl.insert(v)
+        for v in values[250:]:
+            sl.insertES(sl.nodes[v - 1] if v - 1 in sl.nodes else sl.head, v)
+        counts.append(sl.countComps)
+    # Same comparisons, and the uninstrumented searches do not count hops
+    assert counts[0] == counts[1]
+    assert not hasattr(SkipList(), "searchHops")
+    stats = sl.getStats()
+    json.dumps(stats)
+    assert stats["findPredecessor.cleanComps"]["calls"] == 250
+    assert stats["exponentialSearch.cleanComps"]["calls"] == 250
+    searched = sum(stats[key]["calls"] for key in ["findPredecessor.cleanComps", "exponentialSearch.cleanComps"])
+    comps = sum(stats[key]["mean"] * stats[key]["calls"] for key in ["findPredecessor.cleanComps", "exponentialSearch.cleanComps"])
+    assert searched == 500 and round(comps) == sl.countComps
+    # Distance between the source and the result, in positions
+    sl = InstrumentedSkipList()
+    for v in range(0, 100, 2):
+        sl.insert(v)
+    sl.resetStats()
+    sl.exponentialSearch(sl.nodes[10], 50.5)
+    sl.exponentialSearch(sl.nodes[60], 41)
+    assert sl.getStats()["rightExponentialSearch.distance"]["histogram"] == {20: 1}
+    assert sl.getStats()["leftExponentialSearch.distance"]["histogram"] == {10: 1}
+
+
+def test_error_estimator_buckets():
+    errors = PredictionErrorEstimator()
+    for displacement, comps in [(0, 2), (0, 2), (1, 3), (5, 7), (6, 9), (100, 15)]:
+        errors.record(displacement, comps)
+    assert errors.count == 6 and errors.mean() == 112 / 6 and errors.meanComps() == 38 / 6
+    assert errors.curve() == [(0, 2, 2.0), (1, 1, 3.0), (4, 2, 8.0), (64, 1, 15.0)]
+    assert errors.quantile(0.3) == 0
+    assert 4 <= errors.quantile(0.6) < 8 and 64 <= errors.quantile(1) <= 128
+    errors.reset()
+    assert errors.count == 0 and errors.quantile(0.5) == 0
+
+
+def test_online_sl_tracks_the_displacement_of_its_predictions():
+    assert OnlineSL().errors is None
+    means = []
+    for error in [0, 30, 300]:
+        np.random.seed(0)
+        pq = OnlineSL(trackErrors=True)
+        values = np.random.permutation(2000)
+        for v in values:
+            pq.insert(int(v), int(v + error*np.random.randn()))
+        assert pq.errors.count == 2000
+        means.append((pq.errors.mean(), pq.errors.meanComps()))
+    assert means[0][0] < 1
+    assert means[0] < means[1] < means[2]
+    # The displacement is approximated from the hops: the right order of magnitude
+    assert 10 < means[1][0] < 100 and 100 < means[2][0] < 1000
+
+
+def test_indexable_skip_list_ranks():
+    random.seed(1)
+    sl = IndexableSkipList()
+    ref = []
+    for step in range(3000):
+        r = random.random()
+        if ref and r < 0.2:
+            value = random.choice(ref)
+            ref.remove(value)
+            sl.delete(sl.nodes[value])
+        elif ref and r < 0.3:
+            assert sl.extractMin() == ref.pop(0)
+        else:
+            value = random.random()
+            sl.insert(value)
+            ref.append(value)
+            ref.sort()
+        if ref and step % 50 == 0:
+            for k in range(len(ref)):
+                assert sl.select(k).value == ref[k]
+                assert sl.rank(sl.nodes[ref[k]]) == k
+    # Inserting at a rank needs no comparisons
+    comps = sl.countComps
+    for k in [0, len(ref), len(ref)//2]:
+        value = (ref[k-1] if k > 0 else -1) + 1e-9
+        sl.insertAtRank(value, k)
+        ref.insert(k, value)
+    assert sl.countComps == comps and sl.getValsHeights()[0] == ref
+    with pytest.raises(IndexError):
+        sl.select(len(ref))
+    pq = OnlineSL(indexable=True)
+    for v in [4, 1, 3]:
+        pq.insert(v, v)
+    assert pq.select(1) == 3 and pq.rank(pq.sl.nodes[4]) == 2
+    with pytest.raises(ValueError):
+        OnlineSL().select(0)
+    with pytest.raises(ValueError):
+        OnlineSL(instrumented=True, indexable=True)
+
+
+def checkSkipList(sl, values):
+    assert sl.getValsHeights()[0] == values and len(sl) == len(values)
+    assert set(sl.nodes) == set(values) and all(sl.nodes[v].value == v for v in values)
+    if isinstance(sl, IndexableSkipList):
+        assert [sl.select(k).value for k in range(len(values))] == values
+        node = sl.head.getNext(0)
+        for k in range(len(values)):
+            assert sl.rank(node) == k
+            node = node.getNext(0)
+
+
+def test_split_and_join():
+    random.seed(2)
+    for cls in [SkipList, IndexableSkipList]:
+        for trial in range(30):
+            values = sorted(random.randint(0, 100) for i in range(random.randint(0, 60)))
+            sl = cls()
+            for v in random.sample(values, len(values)):
+                sl.insert(v)
+            key = random.randint(-5, 105)
+            right = sl.split(key)
+            checkSkipList(sl, [v for v in values if v <= key])
+            checkSkipList(right, [v for v in values if v > key])
+            # Disjoint: concatenated after at most 2 comparisons, in either order
+            comps = sl.countComps
+            if trial % 2:
+                sl.join(right)
+            else:
+                right.join(sl)
+                sl = right
+            assert sl.countComps - comps <= 2
+            checkSkipList(sl, values)
+            # Overlapping
+            other = cls()
+            extra = [random.randint(0, 100) + 0.5 for i in range(random.randint(0, 30))]
+            for v in extra:
+                other.insert(v)
+            sl.join(other)
+            checkSkipList(sl, sorted(values + extra))
+            assert other.isEmpty() and len(other) == 0
+
+
+def test_online_sl_merge():
+    random.seed(3)
+    for sizes in [(200, 20), (20, 200), (100, 0)]:
+        pqs = [OnlineSL(), OnlineSL()]
+        values = random.sample(range(10000), sum(sizes))
+        for v in values[:sizes[0]]:
+            pqs[0].insert(v, v // 10)
+        for v in values[sizes[0]:]:
+            pqs[1].insert(v, v // 10)
+        pqs[0].merge(pqs[1])
+        assert pqs[1].isEmpty()
+        # The predicted ranks of both queues are indexed
+        assert all(pqs[0].valRank[v] == [v // 10] for v in values)
+        pqs[0].insert(5000.5, 500)
+        assert [pqs[0].extractMin() for i in range(len(values)+1)] == sorted(values + [5000.5])
+
+
+def test_insert_many_matches_sequential_insertion():
+    random.seed(4)
+    initial = random.sample(range(0, 100000, 2), 500)
+    batch = random.sample(range(1, 100000, 2), 300)
+    predictions = [v // 100 + random.randint(-3, 3) for v in batch]
+    for pq in [BinaryHeap(), FibonacciHeap(), SkipList(), SkipList()]:
+        for v in initial:
+            pq.insert(v)
+        comps = pq.countComps
+        if isinstance(pq, SkipList) and predictions is not None:
+            nodes = pq.insert_many(batch, predictions)
+            assert [node.value for node in nodes] == batch
+            predictions = None
+        else:
+            pq.insert_many(batch)
+        assert pq.countComps > comps
+        assert [pq.extractMin() for i in range(800)] == sorted(initial + batch)
+        assert pq.isEmpty()
+    # Swept in the order of accurate predictions, the batch costs less than one search per value
+    sl = SkipList()
+    for v in initial:
+        sl.insert(v)
+    comps = sl.countComps
+    sl.insert_many(sorted(batch), list(range(len(batch))))
+    assert sl.countComps - comps < len(batch) * 2 * np.log2(len(initial)) / 2
+
+
+def test_insert_batch_keeps_the_queue_consistent():
+    random.seed(5)
+    pq = OnlineSL()
+    assert pq.insert_batch([], []) == []
+    # Into an empty queue, then into a queue with the ranks of the first batch
+    ref = []
+    for size in [100, 300]:
+        vals = random.sample(range(10**5), size)
+        ranks = [v // 1000 + random.randint(-2, 2) for v in vals]
+        nodes = pq.insert_many(vals, ranks) if size == 300 else pq.insert_batch(vals, ranks)
+        assert [node.value for node in nodes] == vals
+        ref.extend(vals)
+    heapq.heapify(ref)
+    # The rank index of the batch values is kept up to date by the extractions and insertions
+    for i in range(2000):
+        if random.random() < 0.5 and ref:
+            assert pq.extractMin() == heapq.heappop(ref)
+        else:
+            v = random.randint(0, 10**5) + 0.5
+            pq.insert(v, int(v) // 1000)
+            heapq.heappush(ref, v)
+    assert [pq.extractMin() for i in range(len(ref))] == sorted(ref)
+    assert pq.isEmpty()
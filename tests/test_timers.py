@@ -0,0 +1,70 @@
+import asyncio
+import random
+from timers import TimerQueue, OnlineSLEventLoop
+
+
+def test_loop_fires_timers_in_order():
+    random.seed(0)
+    loop = OnlineSLEventLoop()
+    try:
+        fired = []
+        delays = [random.uniform(0, 0.05) for i in range(200)]
+        start = loop.time()
+        handles = [loop.call_at(start + delay, fired.append, i) for i, delay in enumerate(delays)]
+        cancelled = set(range(0, 200, 7))
+        for i in cancelled:
+            handles[i].cancel()
+        done = loop.create_future()
+        loop.call_at(start + 0.06, done.set_result, None)
+        loop.run_until_complete(done)
+        expected = sorted(set(range(200)) - cancelled, key=delays.__getitem__)
+        assert fired == expected
+        assert len(loop.timers) == 0 and not loop.timers.cancelled
+    finally:
+        loop.close()
+
+
+def test_coroutines_sleep_and_time_out():
+    async def main():
+        order = []
+        async def sleeper(delay):
+            await asyncio.sleep(delay)
+            order.append(delay)
+        await asyncio.gather(*(sleeper(delay) for delay in [0.03, 0.01, 0.02]))
+        try:
+            await asyncio.wait_for(asyncio.sleep(10), 0.01)
+        except asyncio.TimeoutError:
+            order.append("timeout")
+        return order
+    loop = OnlineSLEventLoop()
+    try:
+        assert loop.run_until_complete(main()) == [0.01, 0.02, 0.03, "timeout"]
+        # The 10 s sleep was cancelled by the timeout: it stays in the queue until compaction
+        assert len(loop.timers) == len(loop.timers.cancelled) == 1
+    finally:
+        loop.close()
+
+
+def test_cancelled_timers_are_compacted():
+    loop = OnlineSLEventLoop()
+    try:
+        queue = TimerQueue(bucketWidth=1, minCancelled=10, cancelledFraction=0.5)
+        handles = [asyncio.TimerHandle(float(i % 50), print, (), loop) for i in range(100)]
+        for handle in handles:
+            queue.push(handle)
+        for handle in handles[:40]:
+            handle._cancelled = True
+            assert queue.cancel(handle)
+        # 40 cancelled timers out of 100 are below the fraction
+        assert queue.compactions == 0 and len(queue) == 100
+        # The 51st cancelled timer is more than half of the queue
+        for handle in handles[40:51]:
+            handle._cancelled = True
+            queue.cancel(handle)
+        assert queue.compactions == 1 and len(queue) == 49 and not queue.cancelled
+        assert not queue.cancel(handles[0])
+        due = queue.popDue(24.5)
+        assert [handle.when() for handle in due] == sorted(h.when() for h in handles[51:] if h.when() <= 24.5)
+        assert queue.nextDeadline() == 25.0
+    finally:
+        loop.close()
@@ -0,0 +1,128 @@
+import asyncio
+from time import get_clock_info
+from skiplist import OnlineSL
+
+######################################################################
+# Timer queue for asyncio
+######################################################################
+# asyncio keeps the pending timers (call_at, call_later, sleep, timeouts) in a binary heap. Here
+# they are kept in an OnlineSL keyed on their deadline, whose predicted rank is the index of the
+# deadline bucket (deadline // bucketWidth) by default, or given by predictor(deadline): the
+# exponential search of a new timer starts from the last timer of the previous non-empty bucket,
+# which is close when the deadlines are predictable (periodic retries, timeouts, ...).
+#
+# Cancellation is lazy, as in asyncio: a cancelled timer stays in the queue and is skipped when it
+# reaches the front. When there are more than minCancelled cancelled timers in the queue, forming
+# more than cancelledFraction of it, they are all removed by OnlineSL.delete (no comparisons).
+
+class TimerQueue:
+
+    def __init__(self, bucketWidth=1e-3, predictor=None, minCancelled=100, cancelledFraction=0.5):
+        self.pq = OnlineSL()
+        self.predictor = predictor or (lambda when: int(when // bucketWidth))
+        self.minCancelled = minCancelled
+        self.cancelledFraction = cancelledFraction
+        # Node of each pending timer (by id, as TimerHandle compares by value), timer of each node,
+        # and cancelled timers still in the queue (by id)
+        self.nodeOf = {}
+        self.handleOf = {}
+        self.cancelled = {}
+        self.compactions = 0
+
+    def __len__(self):
+        return len(self.nodeOf)
+
+    @property
+    def countComps(self):
+        return self.pq.countComps
+
+    def push(self, handle):
+        node = self.pq.insert(handle.when(), self.predictor(handle.when()))
+        self.nodeOf[id(handle)] = node
+        self.handleOf[node] = handle
+
+    def remove(self, node):
+        handle = self.handleOf.pop(node)
+        del self.nodeOf[id(handle)]
+        self.cancelled.pop(id(handle), None)
+        self.pq.delete(node)
+        return handle
+
+    def cancel(self, handle):
+        # Returns False if the handle is not pending in this queue
+        if id(handle) not in self.nodeOf:
+            return False
+        self.cancelled[id(handle)] = handle
+        if len(self.cancelled) > self.minCancelled and len(self.cancelled) > self.cancelledFraction * len(self):
+            self.compact()
+        return True
+
+    def compact(self):
+        for handle in list(self.cancelled.values()):
+            self.remove(self.nodeOf[id(handle)])
+        self.compactions += 1
+
+    def front(self):
+        # Earliest pending timer, after removing the cancelled ones in front (None if empty)
+        first = self.pq.sl.head.getNext(0)
+        while first is not None and self.handleOf[first].cancelled():
+            self.remove(first)
+            first = self.pq.sl.head.getNext(0)
+        return first
+
+    def nextDeadline(self):
+        first = self.front()
+        return None if first is None else first.value
+
+    def popDue(self, end):
+        # Removes and returns the pending timers with a deadline <= end, in order
+        due = []
+        first = self.front()
+        while first is not None and first.value <= end:
+            due.append(self.remove(first))
+            first = self.front()
+        return due
+
+
+# Event loop
+#---------------------------------------------------------------------
+# A selector event loop whose timers are in a TimerQueue. The loop's own heap only holds one
+# wake-up timer, at the earliest deadline of the queue, which moves the due timers to the ready
+# queue; they run at the next iteration, as the timers popped from the heap.
+
+class OnlineSLEventLoop(asyncio.SelectorEventLoop):
+
+    def __init__(self, selector=None, **timerParams):
+        super().__init__(selector)
+        self.timers = TimerQueue(**timerParams)
+        self.wakeup = None
+        self.clockResolution = get_clock_info('monotonic').resolution
+
+    def call_at(self, when, callback, *args, context=None):
+        if self.is_closed():
+            raise RuntimeError('Event loop is closed')
+        handle = asyncio.TimerHandle(when, callback, args, self, context)
+        self.timers.push(handle)
+        if self.wakeup is None or when < self.wakeup.when():
+            self.scheduleWakeup(when)
+        return handle
+
+    def scheduleWakeup(self, when):
+        if self.wakeup is not None:
+            self.wakeup.cancel()
+        self.wakeup = None if when is None else super().call_at(when, self.fireTimers)
+
+    def fireTimers(self):
+        self.wakeup = None
+        self._ready.extend(self.timers.popDue(self.time() + self.clockResolution))
+        self.scheduleWakeup(self.timers.nextDeadline())
+
+    def _timer_handle_cancelled(self, handle):
+        # Called by TimerHandle.cancel, the wake-up timers are in the heap of the base loop
+        if not self.timers.cancel(handle):
+            super()._timer_handle_cancelled(handle)
+
+
+class OnlineSLEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    # asyncio.set_event_loop_policy(OnlineSLEventLoopPolicy()) makes asyncio.run use the loop above
+    _loop_factory = OnlineSLEventLoop
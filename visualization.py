@@ -0,0 +1,54 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+######################################################################
+# Skip list drawing
+######################################################################
+# Kept apart from skiplist.py so that the priority queues can be imported without matplotlib
+
+def constructLinks(heights):
+    H = np.max(heights)
+    levels = [[] for l in range(H)]
+    for l in range(0,H):
+        level = l+1
+        for x in range(len(heights)):
+            if heights[x] >= level:
+                levels[l].append(x)
+    return levels
+
+def showSkipList(vals, heights, u=1, r=0.5, arrow_head=0.3, scale=1):
+    # u = space between two elements
+    H = np.max(heights)
+    heights = [H] + list(heights) + [H]
+    fig = plt.figure(figsize=(scale*len(heights)*(1+u),scale*(H+r+1))) 
+    plt.axis('off')
+    levels = constructLinks(heights)
+    # Head/tail
+    #plt.fill_between([0,1],0,H,color="gold")
+    xnil = (len(heights)-1) * (1+u)
+    plt.fill_between([xnil,xnil+1],0,H,color="lightgrey")
+    plt.text(-0.1, -0.7, "HEAD", color="black", fontsize=scale*25)
+    plt.text(xnil+0.15, H/2-0.2, "NIL", color="black", fontsize=scale*25)
+    # heights
+    for i in range(len(heights)):
+        h = heights[i]
+        x = i*(1+u)
+        plt.plot([x,x,x+1,x+1,x], [0,h,h,0,0], c="black")
+        if i<len(heights)-1:
+            for j in range(1,h):
+                plt.plot([x,x+1],[j,j], c="black")
+        if i>0 and i<len(heights)-1:
+            plt.plot([x+0.5,x+0.5], [0,-r], c="black")
+            plt.plot([x,x,x+1,x+1,x], [-r,-r-1,-r-1,-r,-r], c="black")
+            plt.fill_between([x,x+1],-r-1,-r,color="gold")
+            plt.text(x+0.15 + 0.15*(vals[i-1]<10), -r-1/2-0.1, vals[i-1], color="black", fontsize=scale*30)
+    # arrows
+    for i in range(len(levels)):
+        h = i+0.5
+        level = levels[i]
+        for j in range(len(level)-1):
+            x1 = level[j]*(1+u)+0.5
+            x2 = level[j+1]*(1+u) - arrow_head
+            #plt.plot([x1,x2],[h,h], c="black")
+            plt.arrow(x1, h, x2-x1, 0.0, color='black', head_length=arrow_head, head_width=0.2)
+            plt.scatter([x1],[h], s=scale*100, color="black")